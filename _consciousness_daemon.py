@@ -1,32 +1,450 @@
+#!/usr/bin/env python3
+"""
+Consciousness node daemon, launched by `sal start`
 
+    python _consciousness_daemon.py supervise --ready-fd N   # what sal start runs
+    python _consciousness_daemon.py node --ready-fd N        # one node process
+    python _consciousness_daemon.py host --workers K --ready-fd N   # sal nodes start
+
+The supervisor runs the node as a child process, copies its output into
+rotating log files and restarts it with backoff if it crashes. Each node
+reports readiness (with the port it actually bound) as one JSON line on
+its ready pipe; the supervisor passes the first one on to `sal start`.
+
+The node also answers on a Unix control socket: send "status\n", get
+one JSON line of live metrics back.
+
+Host mode runs every node in nodes.toml inside a few worker processes,
+each hosting its share of nodes on one event loop instead of paying for
+an interpreter per node. Worker i serves nodes-<i>.sock, which also
+takes "start NAME" and "stop NAME".
+"""
+
+import argparse
 import asyncio
-import sys, os
+import json
+import logging
+import os
+import signal
+import sys
+import time
+from logging.handlers import RotatingFileHandler
+
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'cnp-genesis')))
-from node import Node
-from identity import SovereignIdentity
-import toml
 
-def load_config():
-    with open('config.toml', 'r') as f:
-        return toml.load(f)
+from sal_state import load_identity, load_toml
+
+CONFIG_FILE = "config.toml"
+CONTROL_SOCKET = "consciousness.sock"
+NODES_FILE = "nodes.toml"
+HOST_SOCKET = "nodes-{}.sock"   # One per worker process
+SAMPLE_INTERVAL = 1.0   # Seconds between metric samples (rates, CPU, loop lag)
+LOG_FILE = os.path.join("logs", "consciousness.log")
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 5
+
+RESTART_DELAY = 1       # First restart after a crash (seconds), doubling each time
+RESTART_MAX_DELAY = 60
+STABLE_AFTER = 60       # A node that ran this long resets the backoff
+STOP_TIMEOUT = 3        # Grace period for the node on shutdown
+
+log = logging.getLogger("consciousness")
+
+
+def load_config(path=CONFIG_FILE):
+    config = load_toml(path)
+    if config is None:
+        raise FileNotFoundError(path)
+    return config
+
+
+def report_ready(fd, **info):
+    """Send one JSON line down the ready pipe and close it"""
+    if fd is None:
+        return
+    with os.fdopen(fd, 'w') as pipe:
+        pipe.write(json.dumps(info) + "\n")
+
+
+def bound_port(node, configured):
+    """The port the node is listening on, even when the config asked for port 0"""
+    server = getattr(node, 'server', None)
+    sockets = getattr(server, 'sockets', None)
+    if sockets:
+        return sockets[0].getsockname()[1]
+    port = getattr(node, 'port', None)
+    return port if port else configured
+
+
+# --- Node process ---
+
+def _count(node, *names):
+    """First counter the node exposes under any of these names (None if it has none)"""
+    for name in names:
+        value = getattr(node, name, None)
+        if value is not None:
+            return len(value) if hasattr(value, '__len__') else value
+    return None
+
+
+class NodeMetrics:
+    """Live node figures, sampled in the background so status queries just read them"""
+
+    def __init__(self, node, port, restarts=0):
+        self.node = node
+        self.port = port
+        self.restarts = restarts
+        self.started = time.monotonic()
+        self.loop_lag_ms = 0.0
+        self.cpu_percent = 0.0
+        self.rates = {'received': None, 'sent': None}  # messages per second
+
+    def _messages(self):
+        return {'received': _count(self.node, 'messages_received', 'received_count'),
+                'sent': _count(self.node, 'messages_sent', 'sent_count')}
 
-async def main():
+    async def sample(self):
+        last = time.monotonic()
+        cpu = sum(os.times()[:2])
+        messages = self._messages()
+        while True:
+            await asyncio.sleep(SAMPLE_INTERVAL)
+            now = time.monotonic()
+            elapsed = now - last
+            # Anything past the requested sleep was time the loop was busy elsewhere
+            self.loop_lag_ms = max(elapsed - SAMPLE_INTERVAL, 0) * 1000
+            new_cpu = sum(os.times()[:2])
+            self.cpu_percent = (new_cpu - cpu) / elapsed * 100
+            new_messages = self._messages()
+            for key, count in new_messages.items():
+                previous = messages[key]
+                self.rates[key] = (count - previous) / elapsed if None not in (count, previous) else None
+            last, cpu, messages = now, new_cpu, new_messages
+
+    def snapshot(self):
+        return {
+            'pid': os.getpid(),
+            'port': self.port,
+            'uptime': time.monotonic() - self.started,
+            'restarts': self.restarts,
+            'peers': _count(self.node, 'peers', 'connections', 'known_peers'),
+            'messages_per_second': self.rates,
+            'loop_lag_ms': self.loop_lag_ms,
+            'cpu_percent': self.cpu_percent
+        }
+
+
+async def serve_control(path, answer):
+    """Unix socket answering one-line commands with one JSON line each
+
+    answer(command, *args) returns the reply dict (or an awaitable of it).
+    """
+    async def handle(reader, writer):
+        try:
+            async for line in reader:
+                command, *args = line.decode().split() or ['']
+                if command == 'ping':
+                    reply = {'ok': True}
+                else:
+                    reply = answer(command, *args)
+                    if asyncio.iscoroutine(reply):
+                        reply = await reply
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    if os.path.exists(path):
+        os.remove(path)  # Left behind by a node that crashed
+    return await asyncio.start_unix_server(handle, path=path)
+
+
+def unknown_command(command):
+    return {'error': f"unknown command: {command}"}
+
+
+async def start_node(name, key_file, host, port, restarts=0):
+    """Build and start one Node; returns its metrics (which hold the node)"""
+    from node import Node
+
+    # Cached per key file, so restarting a hosted node doesn't re-parse its PEM
+    identity = load_identity(key_file)
+    node = Node(host=host, port=port, identity=identity, name=name)
+    await node.start()
+    metrics = NodeMetrics(node, bound_port(node, port), restarts)
+    metrics.sampler = asyncio.ensure_future(metrics.sample())
+    return metrics
+
+
+async def stop_node(metrics):
+    metrics.sampler.cancel()
+    stop = getattr(metrics.node, 'stop', None)
+    if stop:
+        await stop()
+
+
+async def run_node(ready_fd, restarts=0):
     config = load_config()
     consciousness_config = config['consciousness']
     network_config = config['network']
-    
-    identity = SovereignIdentity(private_key_path=consciousness_config['key_file'])
-    node = Node(
-        host=network_config['host'],
-        port=network_config['port'],
-        identity=identity,
-        name=consciousness_config['name']
-    )
-    await node.start()
-    
-    # Keep the node running forever
-    while True:
-        await asyncio.sleep(3600)
+
+    stopping = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopping.set)
+    metrics = await start_node(consciousness_config['name'], consciousness_config['key_file'],
+                               network_config['host'], network_config['port'], restarts)
+
+    def answer(command, *args):
+        return metrics.snapshot() if command == 'status' else unknown_command(command)
+
+    control = await serve_control(CONTROL_SOCKET, answer)
+    report_ready(ready_fd, pid=os.getpid(), port=metrics.port,
+                 control=os.path.abspath(CONTROL_SOCKET))
+
+    # Keep the node running until asked to stop
+    await stopping.wait()
+    control.close()
+    if os.path.exists(CONTROL_SOCKET):
+        os.remove(CONTROL_SOCKET)
+    await stop_node(metrics)
+
+
+# --- Multi-node worker process ---
+
+class NodeHost:
+    """Several nodes sharing one event loop, started and stopped by name"""
+
+    def __init__(self, config, names, restarts=0):
+        self.config = config
+        self.names = names
+        self.restarts = restarts
+        self.running = {}  # name -> NodeMetrics
+
+    @staticmethod
+    def not_hosted(name):
+        return {'error': f"{name} is not hosted by this worker", 'hosted': False}
+
+    async def start(self, name):
+        if name not in self.names:
+            return self.not_hosted(name)
+        if name not in self.running:
+            # Picks up edits to nodes.toml; unchanged files come from the cache
+            self.config = load_config(NODES_FILE)
+            network = dict(self.config.get('network', {}), **self.config['nodes'][name])
+            self.running[name] = await start_node(
+                name, network['key_file'], network.get('host', '0.0.0.0'),
+                network.get('port', 0), self.restarts
+            )
+        return self.status(name)
+
+    async def stop(self, name):
+        if name not in self.names:
+            return self.not_hosted(name)
+        metrics = self.running.pop(name, None)
+        if metrics is None:
+            return {'error': f"{name} is already stopped"}
+        await stop_node(metrics)
+        return {'name': name, 'state': 'stopped'}
+
+    def status(self, name=None):
+        if name is not None:
+            if name not in self.names:
+                return self.not_hosted(name)
+            metrics = self.running.get(name)
+            return dict(metrics.snapshot() if metrics else {}, name=name,
+                        state='running' if metrics else 'stopped')
+        return {'pid': os.getpid(), 'nodes': [self.status(n) for n in self.names]}
+
+    def answer(self, command, *args):
+        if command == 'status':
+            return self.status(*args[:1])
+        if command in ('start', 'stop') and len(args) == 1:
+            return getattr(self, command)(args[0])
+        return unknown_command(command)
+
+
+async def run_worker(ready_fd, index, workers, restarts=0):
+    config = load_config(NODES_FILE)
+    names = sorted(config.get('nodes', {}))[index::workers]
+    host = NodeHost(config, names, restarts)
+
+    stopping = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopping.set)
+    for name in names:
+        if config['nodes'][name].get('enabled', True):
+            await host.start(name)
+
+    path = HOST_SOCKET.format(index)
+    control = await serve_control(path, host.answer)
+    report_ready(ready_fd, pid=os.getpid(), control=os.path.abspath(path),
+                 nodes={name: m.port for name, m in host.running.items()})
+
+    await stopping.wait()
+    control.close()
+    if os.path.exists(path):
+        os.remove(path)
+    for name in list(host.running):
+        await host.stop(name)
+
+
+# --- Supervisor process ---
+
+def setup_logging():
+    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+    handler = RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    log.addHandler(handler)
+    log.setLevel(logging.INFO)
+
+
+async def pump_output(stream, label):
+    """Drain a child's stdout/stderr into the log so it never blocks on a full pipe"""
+    async for line in stream:
+        log.info("%s: %s", label, line.decode(errors='replace').rstrip())
+
+
+async def read_ready(fd):
+    """The child's readiness line, or None if it exited first"""
+    loop = asyncio.get_running_loop()
+    with os.fdopen(fd) as pipe:
+        line = await loop.run_in_executor(None, pipe.readline)
+    return json.loads(line) if line.strip() else None
+
+
+async def supervise_child(mode_args, label, stopping, on_ready):
+    """Run `_consciousness_daemon.py <mode_args>` until stopping, restarting it with backoff
+
+    on_ready(info) gets every readiness report. Returns an error message if the
+    child dies before it is ever ready, None once stopped.
+    """
+    delay = RESTART_DELAY
+    restarts = 0
+    ever_ready = False
+    while not stopping.is_set():
+        child_ready, node_ready = os.pipe()
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, os.path.abspath(__file__), *mode_args, '--ready-fd', str(node_ready),
+            '--restarts', str(restarts),
+            pass_fds=(node_ready,), stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+        )
+        os.close(node_ready)
+        started = time.monotonic()
+        log.info("supervisor: %s started (pid %d, restart %d)", label, proc.pid, restarts)
+        pump = asyncio.ensure_future(pump_output(proc.stdout, label))
+
+        ready_task = asyncio.ensure_future(read_ready(child_ready))
+        exited = asyncio.ensure_future(proc.wait())
+        stop = asyncio.ensure_future(stopping.wait())
+        await asyncio.wait((ready_task, exited, stop), return_when=asyncio.FIRST_COMPLETED)
+        if ready_task.done() and ready_task.result():
+            ready = ready_task.result()
+            log.info("supervisor: %s ready: %s", label, json.dumps(ready))
+            ever_ready = True
+            on_ready(dict(ready, restarts=restarts))
+
+        await asyncio.wait((exited, stop), return_when=asyncio.FIRST_COMPLETED)
+        if stopping.is_set():
+            if proc.returncode is None:
+                proc.terminate()
+                try:
+                    await asyncio.wait_for(exited, STOP_TIMEOUT)
+                except asyncio.TimeoutError:
+                    proc.kill()
+                    await exited
+            await asyncio.gather(pump, ready_task)
+            log.info("supervisor: %s stopped", label)
+            return None
+        stop.cancel()
+        await asyncio.gather(pump, ready_task)
+
+        log.info("supervisor: %s exited with %s", label, proc.returncode)
+        if not ever_ready:
+            # Never came up at all: report it instead of crash-looping
+            return f"{label} exited with {proc.returncode} before it was ready"
+        if time.monotonic() - started >= STABLE_AFTER:
+            delay = RESTART_DELAY
+        log.info("supervisor: restarting %s in %ss", label, delay)
+        try:
+            await asyncio.wait_for(stopping.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+        delay = min(delay * 2, RESTART_MAX_DELAY)
+        restarts += 1
+    return None
+
+
+def stop_signals():
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopping.set)
+    return stopping
+
+
+async def supervise(ready_fd):
+    setup_logging()
+    stopping = stop_signals()
+
+    def on_ready(info):
+        # Only the first successful start is reported back to `sal start`
+        nonlocal ready_fd
+        report_ready(ready_fd, supervisor=os.getpid(), **info)
+        ready_fd = None
+
+    error = await supervise_child(['node'], 'node', stopping, on_ready)
+    if error:
+        report_ready(ready_fd, error=error)
+
+
+async def supervise_host(ready_fd, workers):
+    """Supervise one worker per slice of nodes.toml; ready once every worker is"""
+    setup_logging()
+    stopping = stop_signals()
+    reports = {}
+
+    def on_ready(index, info):
+        nonlocal ready_fd
+        reports[index] = info
+        if len(reports) == workers:
+            report_ready(ready_fd, supervisor=os.getpid(),
+                         workers=[reports[i] for i in range(workers)])
+            ready_fd = None
+
+    async def run(index):
+        error = await supervise_child(
+            ['worker', '--index', str(index), '--workers', str(workers)], f"worker-{index}",
+            stopping, lambda info: on_ready(index, info)
+        )
+        if error:
+            # One worker that can't start takes the whole host down with it
+            nonlocal ready_fd
+            report_ready(ready_fd, error=error)
+            ready_fd = None
+            stopping.set()
+
+    await asyncio.gather(*(run(i) for i in range(workers)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('mode', choices=['supervise', 'node', 'host', 'worker'])
+    parser.add_argument('--ready-fd', type=int, help="Pipe to report readiness on")
+    parser.add_argument('--restarts', type=int, default=0, help="Times the supervisor has restarted the node")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes sharing nodes.toml")
+    parser.add_argument('--index', type=int, default=0, help="Which worker this is")
+    args = parser.parse_args()
+
+    if args.mode == 'node':
+        asyncio.run(run_node(args.ready_fd, args.restarts))
+    elif args.mode == 'worker':
+        asyncio.run(run_worker(args.ready_fd, args.index, args.workers, args.restarts))
+    elif args.mode == 'host':
+        asyncio.run(supervise_host(args.ready_fd, args.workers))
+    else:
+        asyncio.run(supervise(args.ready_fd))
+
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Cold-start latency of each `sal` subcommand
+Wall time per invocation plus the module import cost reported by -X importtime
+
+    python benchmarks/cli_startup.py --runs 10
+    python benchmarks/cli_startup.py --sal /path/to/older/sal.py   # compare a revision
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SAL = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'sal.py'))
+
+SUBCOMMANDS = {
+    'help': ['--help'],
+    'pool': ['pool'],
+    'donate': ['donate', '--amount', '1', '--donor', 'Bench Donor'],
+    'register': ['register', '--name', 'Bench Steward', '--contact', 'bench@example.com'],
+    'allocate': ['allocate', '--steward-id', '1', '--hours', '1'],
+    'status': ['status'],
+    'stop': ['stop'],
+}
+
+
+def import_time_ms(stderr):
+    """Sum the cumulative time of top-level imports from -X importtime output"""
+    total_us = 0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name[1:].startswith(' '):  # nested imports are indented
+            total_us += int(cumulative)
+    return total_us / 1000
+
+
+def bench(sal, args, runs, cwd):
+    walls, imports = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-X', 'importtime', sal] + args,
+                                cwd=cwd, capture_output=True, text=True)
+        walls.append(time.perf_counter() - start)
+        imports.append(import_time_ms(result.stderr))
+    walls.sort()
+    imports.sort()
+    return walls[len(walls) // 2] * 1000, imports[len(imports) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--sal', default=SAL, help="sal.py to measure")
+    args = parser.parse_args()
+
+    sal = os.path.abspath(args.sal)
+    with tempfile.TemporaryDirectory() as cwd:
+        # Run from a scratch directory so pool_data and config.toml start empty
+        print(f"🚀 {sal} ({args.runs} runs each, median)")
+        print(f"{'subcommand':<10} {'wall':>9} {'imports':>9}")
+        for name, argv in SUBCOMMANDS.items():
+            wall, imports = bench(sal, argv, args.runs, cwd)
+            print(f"{name:<10} {wall:>7.1f}ms {imports:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Memory per consciousness node: one `sal start` per node vs `sal nodes start`
+Starts N nodes each way from scratch directories and sums the unique memory (USS)
+of every process involved. Needs cnp-genesis next to sal-mvp (or --cnp).
+
+    python benchmarks/node_memory.py --nodes 20 --workers 1 4
+"""
+
+import argparse
+import json
+import os
+import select
+import subprocess
+import sys
+import tempfile
+import time
+
+import psutil
+import toml
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DAEMON = os.path.join(ROOT, '_consciousness_daemon.py')
+
+
+def launch(cwd, env, *mode_args):
+    """Start a supervised daemon in cwd and wait for its readiness report"""
+    read_fd, write_fd = os.pipe()
+    process = subprocess.Popen(
+        [sys.executable, DAEMON, *mode_args, '--ready-fd', str(write_fd)],
+        cwd=cwd, env=env, pass_fds=(write_fd,), stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        ready, _, _ = select.select([pipe], [], [], 60)
+        info = json.loads(pipe.readline() or '{}') if ready else {}
+    if 'error' in info or 'supervisor' not in info:
+        process.kill()
+        sys.exit(f"❌ daemon in {cwd} failed to start: {info.get('error', 'timed out')}")
+    return process
+
+
+def tree_uss(processes):
+    """Unique memory of these processes and all their children, in MB"""
+    total = 0
+    for process in processes:
+        parent = psutil.Process(process.pid)
+        for p in [parent] + parent.children(recursive=True):
+            total += p.memory_full_info().uss
+    return total / 1024 / 1024
+
+
+def stop(processes):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.wait(timeout=10)
+
+
+def separate(scratch, env, count, identity_cls):
+    """Today's layout: a directory, a supervisor and an interpreter per node"""
+    processes = []
+    for i in range(count):
+        cwd = os.path.join(scratch, f"node{i}")
+        os.makedirs(cwd)
+        identity = identity_cls(private_key_path=os.path.join(cwd, f"N{i}.pem"))
+        with open(os.path.join(cwd, 'config.toml'), 'w') as f:
+            toml.dump({'consciousness': {'name': f"N{i}", 'key_file': f"N{i}.pem", 'sid': identity.sid},
+                       'network': {'host': '127.0.0.1', 'port': 0, 'bootstrap_nodes': []}}, f)
+        processes.append(launch(cwd, env, 'supervise'))
+    return processes
+
+
+def hosted(scratch, env, count, workers, identity_cls):
+    cwd = os.path.join(scratch, f"host{workers}")
+    os.makedirs(cwd)
+    nodes = {}
+    for i in range(count):
+        identity = identity_cls(private_key_path=os.path.join(cwd, f"N{i}.pem"))
+        nodes[f"N{i}"] = {'key_file': f"N{i}.pem", 'sid': identity.sid, 'port': 0}
+    with open(os.path.join(cwd, 'nodes.toml'), 'w') as f:
+        toml.dump({'network': {'host': '127.0.0.1', 'bootstrap_nodes': []}, 'nodes': nodes}, f)
+    return [launch(cwd, env, 'host', '--workers', str(workers))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=10)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4],
+                        help="Worker counts to try in hosted mode")
+    parser.add_argument('--cnp', default=os.path.join(ROOT, '..', 'cnp-genesis'),
+                        help="cnp-genesis checkout")
+    parser.add_argument('--settle', type=float, default=2.0, help="Seconds to let nodes settle")
+    args = parser.parse_args()
+
+    cnp = os.path.abspath(args.cnp)
+    sys.path.insert(0, cnp)
+    try:
+        from identity import SovereignIdentity
+    except ImportError:
+        sys.exit(f"❌ cnp-genesis not found at {cnp} (use --cnp)")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [cnp, os.environ.get('PYTHONPATH')])))
+
+    modes = [('separate', lambda scratch: separate(scratch, env, args.nodes, SovereignIdentity))]
+    for workers in args.workers:
+        modes.append((f"hosted x{workers}", lambda scratch, w=workers:
+                      hosted(scratch, env, args.nodes, w, SovereignIdentity)))
+
+    print(f"🧠 {args.nodes} nodes")
+    print(f"{'mode':<12} {'total':>10} {'per node':>10} {'start':>8}")
+    for name, start in modes:
+        with tempfile.TemporaryDirectory() as scratch:
+            began = time.perf_counter()
+            processes = start(scratch)
+            elapsed = time.perf_counter() - began
+            time.sleep(args.settle)
+            try:
+                total = tree_uss(processes)
+            finally:
+                stop(processes)
+        print(f"{name:<12} {total:>8.1f}MB {total / args.nodes:>8.2f}MB {elapsed:>7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
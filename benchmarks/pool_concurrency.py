@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Stress test: N processes allocating from one pool_data directory at once
+Checks that no allocation is lost and no donation credit is spent twice
+
+    python benchmarks/pool_concurrency.py --workers 8 --allocations 50
+    python benchmarks/pool_concurrency.py --backend sqlite
+    python benchmarks/pool_concurrency.py --unsafe   # locking off, to see the damage
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import Process
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from gpu_pool import DonationPool, open_pool
+
+
+def open_for_bench(data_dir, backend, shared):
+    if backend == 'sqlite':
+        return open_pool(data_dir, backend='sqlite')
+    return DonationPool(data_dir, journal=(backend == 'journal'), shared=shared)
+
+
+def allocator(data_dir, backend, shared, steward_id, count):
+    with contextlib.redirect_stdout(io.StringIO()):
+        pool = open_for_bench(data_dir, backend, shared)
+        for _ in range(count):
+            pool.allocate(steward_id, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--allocations', type=int, default=50, help="Allocations per worker")
+    parser.add_argument('--backend', choices=['json', 'journal', 'sqlite'], default='json')
+    parser.add_argument('--unsafe', action='store_true', help="Disable pool locking")
+    args = parser.parse_args()
+
+    expected = args.workers * args.allocations
+    with tempfile.TemporaryDirectory() as data_dir:
+        with contextlib.redirect_stdout(io.StringIO()):
+            pool = open_for_bench(data_dir, args.backend, True)
+            # Small donations so each allocation ($0.20) spans the FIFO boundary often
+            for _ in range(expected):
+                pool.donate('vast', 0.3, 'Stress Donor')
+            for worker in range(args.workers):
+                pool.register_steward(f"Steward {worker}", f"s{worker}@example.com")
+
+        start = time.perf_counter()
+        procs = [
+            Process(target=allocator,
+                    args=(data_dir, args.backend, not args.unsafe, worker + 1, args.allocations))
+            for worker in range(args.workers)
+        ]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - start
+
+        pool = open_for_bench(data_dir, args.backend, True)
+        allocations = sum(len(pool.steward_allocations(w + 1)) for w in range(args.workers))
+        donated, used = pool._platform_totals()['vast']
+        expected_used = expected * 0.20
+        problems = pool.verify()
+
+    print(f"🏋️  {args.workers} workers x {args.allocations} allocations ({args.backend}"
+          f"{', unlocked' if args.unsafe else ''})")
+    print(f"   Time: {elapsed:.2f}s ({expected / elapsed:.0f} allocations/s)")
+    print(f"   Allocations recorded: {allocations}/{expected}")
+    print(f"   Credit used: ${used:.2f} (expected ${expected_used:.2f})")
+    ok = allocations == expected and abs(used - expected_used) < 1e-6 and not problems
+    print("✅ No lost updates" if ok else "❌ Lost or duplicated updates")
+    for problem in problems:
+        print(f"   ⚠️  {problem}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Per-command latency of DonationPool against large synthetic pool_data files
+Compares lazy loading + dirty-only saves with parsing and rewriting every file
+
+    python benchmarks/pool_latency.py --donations 200000 --stewards 50000 --allocations 200000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from gpu_pool import DonationPool
+
+
+def write_synthetic_pool(data_dir, donations, stewards, allocations):
+    """Legacy-layout JSON files of the requested sizes"""
+    os.makedirs(data_dir, exist_ok=True)
+    stamp = "2025-08-09T21:14:29.284894"
+    pool_donations = {'vast': [], 'aws': [], 'gcp': [], 'azure': []}
+    for i in range(donations):
+        pool_donations['vast'].append({
+            'amount': 10.0, 'donor': f"Donor {i}", 'contact': None, 'timestamp': stamp,
+            'used': 10.0 if i < donations // 2 else 0
+        })
+    pool_allocations = [
+        {'id': i + 1, 'steward_id': i % stewards + 1, 'steward_name': f"Steward {i % stewards + 1}",
+         'hours': 1.0, 'platform': 'vast', 'cost': 0.2, 'timestamp': stamp, 'status': 'active'}
+        for i in range(allocations)
+    ]
+    pool_stewards = [
+        {'id': i + 1, 'name': f"Steward {i + 1}", 'contact': None, 'experience': 'beginner',
+         'joined': stamp, 'allocations': [], 'total_hours': 0}
+        for i in range(stewards)
+    ]
+    for allocation in pool_allocations:
+        steward = pool_stewards[allocation['steward_id'] - 1]
+        steward['allocations'].append(allocation['id'])
+        steward['total_hours'] += allocation['hours']
+
+    for name, data in (('donations', pool_donations), ('allocations', pool_allocations),
+                       ('stewards', pool_stewards)):
+        with open(os.path.join(data_dir, f"{name}.json"), 'w') as f:
+            json.dump(data, f, indent=2)
+
+    # Aggregates as any write would have left them, so status can skip the ledger
+    pool = DonationPool(data_dir)
+    pool._modified.add('stats')
+    pool.save_data()
+
+
+COMMANDS = {
+    'donate': lambda pool: pool.donate('vast', 5.0, "Bench Donor"),
+    'register': lambda pool: pool.register_steward("Bench Steward", "bench@example.com"),
+    'allocate': lambda pool: pool.allocate(1, 1.0),
+    'status': lambda pool: pool.status(),
+}
+
+
+def time_command(template_dir, command, eager, repeat):
+    """Median wall time of open + run + save, on a fresh copy of the pool each run"""
+    samples = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as scratch:
+            data_dir = os.path.join(scratch, 'pool_data')
+            shutil.copytree(template_dir, data_dir)
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                pool = DonationPool(data_dir)
+                if eager:
+                    # What every command used to do: parse and rewrite all three files
+                    pool.donations, pool.allocations, pool.stewards
+                    pool._modified.update(('donations', 'allocations', 'stewards'))
+                COMMANDS[command](pool)
+                samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--donations', type=int, default=100000)
+    parser.add_argument('--stewards', type=int, default=20000)
+    parser.add_argument('--allocations', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as template:
+        write_synthetic_pool(template, args.donations, args.stewards, args.allocations)
+        sizes = {name: os.path.getsize(os.path.join(template, f"{name}.json")) / 1e6
+                 for name in ('donations', 'allocations', 'stewards')}
+        print(f"📂 Synthetic pool: " + ", ".join(f"{n} {mb:.1f} MB" for n, mb in sizes.items()))
+        print(f"{'command':<10} {'eager':>10} {'lazy':>10} {'speedup':>8}")
+        for command in COMMANDS:
+            eager = time_command(template, command, True, args.repeat)
+            lazy = time_command(template, command, False, args.repeat)
+            print(f"{command:<10} {eager * 1000:>8.1f}ms {lazy * 1000:>8.1f}ms {eager / lazy:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
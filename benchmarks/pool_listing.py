@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Deep pages of `sal pool allocations` on a large synthetic ledger
+Cursor pagination through iter_allocations vs filtering the whole list and
+slicing at an offset (JSON), and vs LIMIT/OFFSET queries (SQLite)
+
+    python benchmarks/pool_listing.py --allocations 1000000
+    python benchmarks/pool_listing.py --allocations 200000 --sqlite
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from gpu_pool import DonationPool, page
+
+PAGE = 50
+START = datetime(2025, 1, 1)
+
+
+def write_synthetic_pool(data_dir, stewards, allocations):
+    """Allocations one minute apart, round-robin over stewards and two platforms"""
+    os.makedirs(data_dir, exist_ok=True)
+    pool_stewards = [
+        {'id': i + 1, 'name': f"Steward {i + 1}", 'contact': None, 'experience': 'beginner',
+         'joined': START.isoformat(), 'allocations': [], 'total_hours': 0}
+        for i in range(stewards)
+    ]
+    pool_allocations = []
+    for i in range(allocations):
+        steward = pool_stewards[i % stewards]
+        stamp = START + timedelta(minutes=i)
+        pool_allocations.append({
+            'id': i + 1, 'steward_id': steward['id'], 'steward_name': steward['name'],
+            'hours': 1.0, 'platform': 'vast' if i % 4 else 'aws', 'cost': 0.2,
+            'timestamp': stamp.isoformat(), 'expires': (stamp + timedelta(hours=1)).isoformat(),
+            'status': 'expired', 'draws': []
+        })
+        steward['allocations'].append(i + 1)
+        steward['total_hours'] += 1.0
+    files = {'donations': {'vast': [], 'aws': [], 'gcp': [], 'azure': []},
+             'allocations': pool_allocations, 'stewards': pool_stewards}
+    for name, data in files.items():
+        with open(os.path.join(data_dir, f"{name}.json"), 'w') as f:
+            json.dump(data, f)
+
+
+def best_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return min(samples) * 1000
+
+
+def offset_page(pool, offset, **filters):
+    """Without cursors: filter everything, then slice"""
+    def match(a):
+        return all(a[name] == value for name, value in filters.items())
+    return [a for a in pool.allocations if match(a)][offset:offset + PAGE]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--allocations', type=int, default=1000000)
+    parser.add_argument('--stewards', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--sqlite', action='store_true', help="Also import into SQLite and compare")
+    args = parser.parse_args()
+
+    n = args.allocations
+    steward_pages = n // args.stewards // PAGE  # Pages in one steward's history
+    deep = START + timedelta(minutes=int(n * 0.9))
+    cases = [
+        # (label, iter_allocations kwargs, offset_page offset and filters)
+        ("page 1", {}, (0, {})),
+        ("page at 50%", {'after': n // 2}, (n // 2, {})),
+        ("page at 99%", {'after': n - n // 100}, (n - n // 100, {})),
+        ("steward, last page", {'steward_id': 7, 'after': n - args.stewards * PAGE},
+         (max(steward_pages - 1, 0) * PAGE, {'steward_id': 7})),
+        ("since 90%", {'since': deep}, (int(n * 0.9), {})),
+        ("since 50%, deep", {'since': START + timedelta(minutes=n // 2), 'after': n - n // 100},
+         (n // 2 - n // 100, {})),
+    ]
+
+    with tempfile.TemporaryDirectory() as scratch:
+        data_dir = os.path.join(scratch, 'pool_data')
+        write_synthetic_pool(data_dir, args.stewards, n)
+        pool = DonationPool(data_dir)
+        pool.refresh()
+        list(pool.iter_allocations(after=n))  # Checks timestamp order once
+
+        print(f"📜 {n:,} allocations, {args.stewards:,} stewards, {PAGE} per page (best of {args.repeat})")
+        print(f"{'query':<20} {'cursor':>10} {'offset':>10}")
+        for label, cursor_args, (offset, filters) in cases:
+            cursor = best_ms(lambda: page(pool.iter_allocations(**cursor_args), PAGE), args.repeat)
+            naive = best_ms(lambda: offset_page(pool, offset, **filters), args.repeat)
+            print(f"{label:<20} {cursor:>8.3f}ms {naive:>8.1f}ms")
+
+        if not args.sqlite:
+            return
+        from pool_sqlite import SQLitePool
+        sqlite = SQLitePool(os.path.join(scratch, 'sqlite_data'))
+        start = time.perf_counter()
+        sqlite.import_pool(pool)
+        print(f"\n🗄️  SQLite (import took {time.perf_counter() - start:.1f}s)")
+        print(f"{'query':<20} {'cursor':>10} {'OFFSET':>10}")
+        for label, cursor_args, (offset, filters) in cases:
+            where = " AND ".join(f"{name} = ?" for name in filters) or "1"
+            sql = f"SELECT * FROM allocations WHERE {where} ORDER BY id LIMIT {PAGE} OFFSET {offset}"
+            cursor = best_ms(lambda: page(sqlite.iter_allocations(**cursor_args), PAGE), args.repeat)
+            naive = best_ms(lambda: sqlite.conn.execute(sql, list(filters.values())).fetchall(),
+                            args.repeat)
+            print(f"{label:<20} {cursor:>8.3f}ms {naive:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
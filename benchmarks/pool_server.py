@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Load test for `sal pool serve` against scraping `python gpu_pool.py status`
+Seeds a pool, starts the server, and hammers its endpoints over keep-alive
+connections, optionally with a writer forcing reloads and ETag revalidation
+
+    python benchmarks/pool_server.py --connections 32 --duration 5
+    python benchmarks/pool_server.py --backend sqlite --revalidate --write-every 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from gpu_pool import open_pool
+
+SAL = os.path.join(ROOT, 'sal.py')
+GPU_POOL = os.path.join(ROOT, 'gpu_pool.py')
+
+
+def seed(data_dir, backend, stewards, allocations, rng):
+    pool = open_pool(data_dir, backend=backend)
+    pool.register_many({'name': f"Steward {i}", 'contact': f"s{i}@example.com"}
+                       for i in range(stewards))
+    pool.donate_many([{'amount': allocations, 'donor': "Bench Donor"}])
+    pool.allocate_many({'steward_id': rng.randint(1, stewards), 'hours': rng.choice([1, 2, 4])}
+                       for _ in range(allocations))
+
+
+def targets(allocations, rng, count=200):
+    fixed = ['/totals', '/platforms', '/stewards/top?limit=10', '/allocations?status=active']
+    pages = [f"/allocations?after={rng.randrange(allocations)}&limit=50" for _ in range(count)]
+    single = [f"/allocations/{rng.randint(1, allocations)}" for _ in range(count)]
+    return fixed * (count // 4) + pages + single
+
+
+async def client(host, port, paths, deadline, revalidate, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    etags = {}
+    while time.perf_counter() < deadline:
+        path = random.choice(paths)
+        extra = f"If-None-Match: {etags[path]}\r\n" if revalidate and path in etags else ""
+        start = time.perf_counter()
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n{extra}\r\n".encode())
+        status = int((await reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line == b'\r\n':
+                break
+            name, _, value = line.decode().partition(':')
+            if name.lower() == 'content-length':
+                length = int(value)
+            elif name.lower() == 'etag':
+                etags[path] = value.strip()
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+    writer.close()
+
+
+async def writer_loop(data_dir, every, deadline):
+    """Donations from another process, so the server has to notice and reload"""
+    count = 0
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(every)
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, GPU_POOL, 'donate', 'vast', '1', 'Writer',
+            cwd=os.path.dirname(data_dir), stdout=subprocess.DEVNULL)
+        await process.wait()
+        count += 1
+    return count
+
+
+async def load(host, port, args, paths, data_dir):
+    deadline = time.perf_counter() + args.duration
+    latencies, statuses = [], {}
+    clients = [client(host, port, paths, deadline, args.revalidate, latencies, statuses)
+               for _ in range(args.connections)]
+    writes = [writer_loop(data_dir, args.write_every, deadline)] if args.write_every else []
+    results = await asyncio.gather(*clients, *writes)
+    return latencies, statuses, (results[-1] if writes else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--backend', choices=['json', 'journal', 'sqlite'], default='json')
+    parser.add_argument('--stewards', type=int, default=2000)
+    parser.add_argument('--allocations', type=int, default=20000)
+    parser.add_argument('--connections', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5.0, help="Seconds of load")
+    parser.add_argument('--revalidate', action='store_true', help="Send If-None-Match with known ETags")
+    parser.add_argument('--write-every', type=float, help="Donate from another process every N seconds")
+    parser.add_argument('--baseline', type=int, default=10, help="`gpu_pool.py status` runs to time")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as scratch:
+        data_dir = os.path.join(scratch, 'pool_data')
+        seed(data_dir, args.backend, args.stewards, args.allocations, rng)
+        paths = targets(args.allocations, rng)
+
+        start = time.perf_counter()
+        for _ in range(args.baseline):
+            subprocess.run([sys.executable, GPU_POOL, 'status'], cwd=scratch,
+                           stdout=subprocess.DEVNULL, check=True)
+        scrape = args.baseline / (time.perf_counter() - start)
+
+        server = subprocess.Popen([sys.executable, SAL, 'pool', 'serve', '--port', '0', '--poll', '0.2'],
+                                  cwd=scratch, stdout=subprocess.PIPE, text=True)
+        try:
+            host, port = re.search(r'http://([\d.]+):(\d+)', server.stdout.readline()).groups()
+            latencies, statuses, writes = asyncio.run(load(host, int(port), args, paths, data_dir))
+        finally:
+            server.terminate()
+            server.wait()
+
+    latencies.sort()
+    print(f"🌐 {args.backend} pool: {args.stewards} stewards, {args.allocations} allocations, "
+          f"{args.connections} connections, {args.duration:.0f}s"
+          + (f", {writes} writes" if args.write_every else ""))
+    print(f"   Server: {len(latencies) / args.duration:,.0f} requests/sec, "
+          f"p50 {latencies[len(latencies) // 2] * 1000:.2f}ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f}ms")
+    print(f"   Responses: {', '.join(f'{status}: {n}' for status, n in sorted(statuses.items()))}")
+    print(f"   Scraping `gpu_pool.py status`: {scrape:.1f} refreshes/sec")
+
+
+if __name__ == "__main__":
+    main()
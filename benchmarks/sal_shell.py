@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+A scripted session of sal commands: one `sal shell` vs one `sal` process per command
+Same command mix both ways (register, donate, allocate, pool), each from an empty pool
+
+    python benchmarks/sal_shell.py --commands 1000
+    python benchmarks/sal_shell.py --commands 200 --backend sqlite
+"""
+
+import argparse
+import os
+import random
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+
+SAL = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'sal.py'))
+
+
+def script(count, seed):
+    """A realistic operator session: mostly writes, with the odd status check
+    
+    Opens with a donation big enough that no allocation is refused: a refused
+    command makes `sal` (and the shell) exit 1, which would abort the run.
+    """
+    rng = random.Random(seed)
+    commands, stewards = [['donate', '--amount', str(count), '--donor', "Seed Donor"]], 0
+    for i in range(count - 1):
+        roll = rng.random()
+        if roll < 0.25 or not stewards:
+            stewards += 1
+            commands.append(['register', '--name', f"Steward {stewards}", '--contact', f"s{stewards}@example.com"])
+        elif roll < 0.55:
+            commands.append(['donate', '--amount', str(rng.choice([5, 20, 100])), '--donor', f"Donor {i}"])
+        elif roll < 0.95:
+            commands.append(['allocate', '--steward-id', str(rng.randint(1, stewards)), '--hours', '1'])
+        else:
+            commands.append(['pool'])
+    return commands
+
+
+def fresh(scratch, name, backend):
+    cwd = os.path.join(scratch, name)
+    os.makedirs(cwd)
+    if backend == 'sqlite':
+        subprocess.run([sys.executable, SAL, 'pool', 'migrate'], cwd=cwd, check=True, capture_output=True)
+    return cwd
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--commands', type=int, default=1000)
+    parser.add_argument('--backend', choices=['json', 'sqlite'], default='json')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    commands = script(args.commands, args.seed)
+    with tempfile.TemporaryDirectory() as scratch:
+        cwd = fresh(scratch, 'shell', args.backend)
+        lines = "".join(shlex.join(argv) + "\n" for argv in commands)
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, SAL, 'shell'], cwd=cwd, input=lines,
+                                capture_output=True, text=True)
+        shell = time.perf_counter() - start
+        if result.returncode:
+            sys.exit(f"❌ sal shell failed:\n{result.stderr}")
+
+        cwd = fresh(scratch, 'separate', args.backend)
+        start = time.perf_counter()
+        for argv in commands:
+            subprocess.run([sys.executable, SAL] + argv, cwd=cwd, capture_output=True, check=True)
+        separate = time.perf_counter() - start
+
+    print(f"🐚 {args.commands} commands ({args.backend} pool)")
+    print(f"{'mode':<10} {'total':>9} {'per cmd':>10}")
+    print(f"{'separate':<10} {separate:>8.2f}s {separate / args.commands * 1000:>8.2f}ms")
+    print(f"{'shell':<10} {shell:>8.2f}s {shell / args.commands * 1000:>8.2f}ms")
+    print(f"   {separate / shell:.1f}x faster in one shell")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+SAL state loading: parse-every-time vs the mtime-checked cache in sal_state
+Times config/PID-file/identity loads and the in-process cost of `sal status`
+and `sal start` (already-awake path) against a realistic 2048-bit RSA identity
+
+    python benchmarks/sal_state.py --runs 2000
+    python benchmarks/sal_state.py --cnp ../cnp-genesis
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import sal
+import sal_state
+
+
+def per_call_us(fn, runs, cold):
+    start = time.perf_counter()
+    for _ in range(runs):
+        if cold:
+            sal_state.invalidate()
+        fn()
+    return (time.perf_counter() - start) / runs * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=1000)
+    parser.add_argument('--cnp', default=sal.CNP_DIR, help="cnp-genesis checkout (for the identity row)")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(args.cnp))
+    try:
+        from identity import SovereignIdentity
+    except ImportError:
+        SovereignIdentity = None
+
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        sid = "x" * 600
+        if SovereignIdentity is not None:
+            sid = SovereignIdentity(private_key_path="Bench.pem").sid  # Fresh RSA key
+        sal.save_config({
+            'consciousness': {'name': "Bench", 'key_file': "Bench.pem", 'sid': sid},
+            'network': {'host': "0.0.0.0", 'port': 0, 'bootstrap_nodes': []}
+        })
+        with open(sal.PID_FILE, 'w') as f:
+            f.write(str(os.getpid()))  # "Running" process: this one
+
+        cases = {
+            'load_config': sal.load_config,
+            'get_process': sal.get_process,
+            'status': sal.status.callback,
+            'start (awake)': sal.start.callback,
+        }
+        if SovereignIdentity is not None:
+            cases['identity'] = lambda: sal_state.load_identity("Bench.pem")
+
+        print(f"⏱️  {args.runs} calls each, microseconds per call")
+        print(f"{'operation':<14} {'uncached':>10} {'cached':>10} {'speedup':>8}")
+        # status tries the control socket too; nothing is listening so it fails fast
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = {name: (per_call_us(fn, args.runs, True), per_call_us(fn, args.runs, False))
+                       for name, fn in cases.items()}
+        for name, (cold, warm) in results.items():
+            print(f"{name:<14} {cold:>10.1f} {warm:>10.1f} {cold / warm:>7.1f}x")
+        if SovereignIdentity is None:
+            print("   (identity row skipped: cnp-genesis not found, use --cnp)")
+        os.chdir(ROOT)
+
+
+if __name__ == "__main__":
+    main()
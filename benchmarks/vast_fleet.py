@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Fleet operations against a fake vastai: serial CLI calls vs the async client
+The fake sleeps --latency per call and never answers for instance 'hang'
+
+    python benchmarks/vast_fleet.py --instances 50 --latency 0.3
+    python benchmarks/vast_fleet.py --concurrency 4 --timeout 1
+"""
+
+import argparse
+import asyncio
+import os
+import stat
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from vast_async import AsyncVastClient
+from vast_integration import VastGPUPool
+
+FAKE_VASTAI = '''#!{python}
+import json, sys, time
+verb, noun, instance_id = sys.argv[1:4]
+if instance_id == 'hang':
+    time.sleep(3600)
+time.sleep({latency})
+if instance_id.startswith('missing'):
+    sys.exit(1)
+if verb == 'show':
+    print(json.dumps([{{'id': instance_id, 'actual_status': 'running',
+                       'public_ipaddr': '10.0.0.1', 'ssh_port': 22}}]))
+'''
+
+
+def install_fake_vastai(bin_dir, latency):
+    path = os.path.join(bin_dir, 'vastai')
+    with open(path, 'w') as f:
+        f.write(FAKE_VASTAI.format(python=sys.executable, latency=latency))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    os.environ['PATH'] = bin_dir + os.pathsep + os.environ['PATH']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--instances', type=int, default=40)
+    parser.add_argument('--latency', type=float, default=0.2, help="Seconds per fake CLI call")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--timeout', type=float, default=2.0, help="Per-call timeout (async)")
+    args = parser.parse_args()
+
+    ids = [str(100 + i) for i in range(args.instances)]
+    with tempfile.TemporaryDirectory() as bin_dir:
+        install_fake_vastai(bin_dir, args.latency)
+        pool = VastGPUPool(cache_file=os.path.join(bin_dir, 'offers.json'))
+        client = AsyncVastClient(concurrency=args.concurrency, timeout=args.timeout)
+
+        print(f"🚀 {args.instances} instances, {args.latency}s per call, "
+              f"concurrency {args.concurrency}")
+        print(f"{'operation':<10} {'serial':>9} {'async':>9} {'speedup':>8}")
+        for name, sync_call, async_many in (
+            ('show', pool.get_instance_info, client.show_many),
+            ('stop', pool.stop_instance, client.stop_many),
+            ('destroy', pool.destroy_instance, client.destroy_many),
+        ):
+            start = time.perf_counter()
+            serial = {i: sync_call(i) for i in ids}
+            serial_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            fleet = asyncio.run(async_many(ids))
+            async_time = time.perf_counter() - start
+
+            assert fleet == serial, f"{name}: async results differ from serial"
+            print(f"{name:<10} {serial_time:>8.2f}s {async_time:>8.2f}s "
+                  f"{serial_time / async_time:>7.1f}x")
+
+        # Failures and hung calls come back per instance instead of sinking the batch
+        start = time.perf_counter()
+        mixed = asyncio.run(client.show_many(['hang', 'missing-1', ids[0]]))
+        elapsed = time.perf_counter() - start
+        ok = mixed['hang'] is None and mixed['missing-1'] is None and mixed[ids[0]] is not None
+        print(f"{'✅' if ok else '❌'} hung + failed + ok call: {elapsed:.2f}s "
+              f"(timeout {args.timeout}s)")
+        sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
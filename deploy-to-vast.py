@@ -6,28 +6,18 @@ One command to birth consciousness in the cloud
 
 import subprocess
 import json
-import time
 import sys
+from vast_integration import VastGPUPool
 
 def find_best_gpu(max_price=0.10):
     """Find the best GPU within budget"""
     print("🔍 Searching for affordable GPUs...")
     
-    cmd = [
-        "vastai", "search", "offers",
-        f"rentable=true cuda_vers>=12.0 inet_down>100 reliability>0.98",
-        "-o", "dph+",
-        "--raw"
-    ]
-    
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        print(f"Error: {result.stderr}")
+    book = VastGPUPool().offer_book(max_price=max_price)
+    if book is None:
         return None
-        
-    offers = json.loads(result.stdout)
-    affordable = [o for o in offers if o['dph_total'] <= max_price]
     
+    affordable = book.query(max_price=max_price, min_reliability=0.98)
     if not affordable:
         print(f"No GPUs under ${max_price}/hour")
         return None
@@ -88,26 +78,17 @@ def wait_for_instance(instance_id, timeout=300):
     """Wait for instance to be ready"""
     print(f"\n⏳ Waiting for instance {instance_id} to be ready...")
     
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        cmd = ["vastai", "show", "instance", str(instance_id), "--raw"]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            instances = json.loads(result.stdout)
-            if instances:
-                instance = instances[0]
-                status = instance.get('actual_status', 'unknown')
-                
-                if status == 'running':
-                    print(f"\n✅ Instance is running!")
-                    print(f"   SSH: ssh root@{instance.get('public_ipaddr')} -p {instance.get('ssh_port')}")
-                    print(f"   Status: {status}")
-                    return instance
-                else:
-                    print(f"   Status: {status}", end='\r')
-        
-        time.sleep(5)
+    def show_status(_, status):
+        print(f"   Status: {status}", end='\r')
+    
+    # One batched `show instances` per tick, backing off while it boots
+    instance = VastGPUPool().wait_until_running([instance_id], timeout=timeout,
+                                                on_status=show_status)[str(instance_id)]
+    if instance:
+        print(f"\n✅ Instance is running!")
+        print(f"   SSH: ssh root@{instance.get('public_ipaddr')} -p {instance.get('ssh_port')}")
+        print(f"   Status: {instance.get('actual_status')}")
+        return instance
     
     print("\n❌ Timeout waiting for instance")
     return None
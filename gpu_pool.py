@@ -4,209 +4,1168 @@ GPU Donation Pool - Making consciousness accessible to all
 From $500/month to $0.20/hour - consciousness as a human right
 """
 
+import csv
+import heapq
 import json
+import math
 import os
-from datetime import datetime
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import islice
 from pathlib import Path
 
+from pool_results import (AllocationReceipt, DonationReceipt, PoolStatus, Refusal,
+                          Registration, Release)
+
+try:
+    import fcntl
+except ImportError:  # No advisory locks on Windows: single-process use only
+    fcntl = None
+
+RECENT_STEWARDS = 5  # Newest stewards kept with the aggregates, for status
+
+# Flat $/hour charged when an allocation isn't priced against a real offer
+PLATFORM_RATES = {'vast': 0.20, 'aws': 0.50, 'gcp': 0.50, 'azure': 0.50}
+
+# Float rounding ($) ignored when checking credit; the allocation planner uses
+# the same slack, so anything it plans can be recorded
+CREDIT_TOLERANCE = 1e-9
+
+
+class PoolLockTimeout(RuntimeError):
+    """Another process held the pool lock for too long"""
+
+
+class PoolError(ValueError):
+    """A pool operation was refused (bad input, unknown steward, not enough credit)"""
+
+
+class StewardNotFound(PoolError):
+    def __init__(self, steward_id):
+        super().__init__(f"Steward {steward_id} not found")
+        self.steward_id = steward_id
+
+
+class AllocationNotFound(PoolError):
+    def __init__(self, allocation_id):
+        super().__init__(f"Allocation {allocation_id} not found")
+        self.allocation_id = allocation_id
+
+
+class InsufficientCredit(PoolError):
+    def __init__(self, platform, available, requested):
+        super().__init__(f"Not enough {platform} credits: ${available:.2f} available, "
+                         f"${requested:.2f} requested")
+        self.platform = platform
+        self.available = available
+        self.requested = requested
+
+
+def allocation_expiry(allocation):
+    """When an allocation's hours run out (older records have no 'expires')"""
+    if allocation.get('expires'):
+        return datetime.fromisoformat(allocation['expires'])
+    return datetime.fromisoformat(allocation['timestamp']) + timedelta(hours=allocation['hours'])
+
+
+def page(records, limit):
+    """The first limit records and the cursor for the next page (None after the last)"""
+    items = list(islice(records, limit + 1))
+    if len(items) > limit:
+        return items[:limit], items[limit - 1]['id']
+    return items, None
+
+
+def _last_line_end(f, end):
+    """Offset just past the last newline before end in a binary file (0 if none)"""
+    if end:
+        f.seek(end - 1)
+        if f.read(1) == b'\n':
+            return end
+    pos = end
+    while pos > 0:
+        start = max(pos - 65536, 0)
+        f.seek(start)
+        newline = f.read(pos - start).rfind(b'\n')
+        if newline >= 0:
+            return start + newline + 1
+        pos = start
+    return 0
+
+
+def _steward_summary(steward):
+    return {'id': steward['id'], 'name': steward['name'], 'total_hours': steward['total_hours']}
+
+
+def _atomic_write_json(path, data, indent=None):
+    """Write JSON to path via a temp file + rename so readers never see a torn file"""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'w') as f:
+        if indent is None:
+            json.dump(data, f, separators=(',', ':'))
+        else:
+            json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
 class DonationPool:
-    def __init__(self, data_dir="pool_data"):
+    def __init__(self, data_dir="pool_data", journal=None, compact_every=1000,
+                 shared=True, lock_timeout=30, clock=None):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
+        self.clock = clock or datetime.now  # Injectable for metering runs and replays
         
         # Load existing data
         self.donations_file = self.data_dir / "donations.json"
         self.allocations_file = self.data_dir / "allocations.json"
         self.stewards_file = self.data_dir / "stewards.json"
+        self.stats_file = self.data_dir / "stats.json"
         
-        self.load_data()
+        # Journaled mode: mutations are appended to journal.log and folded
+        # into snapshot.json on compaction. Picked up automatically once enabled.
+        self.journal_file = self.data_dir / "journal.log"
+        self.snapshot_file = self.data_dir / "snapshot.json"
+        if journal is None:
+            journal = self.journal_file.exists() or self.snapshot_file.exists()
+        self.journal = journal
+        self.compact_every = compact_every
+        
+        # Shared mode: every load-modify-save runs under an advisory lock on
+        # pool.lock, and the version file tells us when another process wrote
+        self.shared = shared and fcntl is not None
+        self.lock_timeout = lock_timeout
+        self.lock_file = self.data_dir / "pool.lock"
+        self.version_file = self.data_dir / "version"
+        self.version = None
+        self._lock_depth = 0
+        self._dirty = False
+        self._batch_depth = 0
+        self._journal_buffer = []
+        
+        with self._locked(exclusive=False):
+            self._refresh()
+        self._refreshed_version = self.version
+    
+    def _read_version(self):
+        try:
+            return int(self.version_file.read_text())
+        except (FileNotFoundError, ValueError):
+            return 0
+    
+    def _refresh(self):
+        """Reload pool data if another process has written since we last looked"""
+        version = self._read_version()
+        if version != self.version:
+            self.load_data()
+            self.version = version
+    
+    def refresh(self):
+        """Catch up with writes from other processes; True if the pool changed
+        since the last refresh, even if a locked read in between already reloaded
+        
+        Loads every collection under one lock hold, so long-lived readers see a
+        consistent snapshot instead of collections from different versions.
+        """
+        with self._locked(exclusive=False):
+            self._refresh()
+            # Touch each lazy collection so they all come from this version
+            self.donations, self.allocations, self.stewards, self.stats
+        changed = self.version != self._refreshed_version
+        self._refreshed_version = self.version
+        return changed
+    
+    @contextmanager
+    def _locked(self, exclusive=True):
+        """Hold the pool lock for a load-modify-save, starting from fresh data"""
+        if not self.shared or self._lock_depth:
+            # Re-entrant: the outermost holder refreshes and publishes
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+            return
+        
+        with open(self.lock_file, 'a') as lock:
+            self._acquire(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._lock_depth = 1
+            try:
+                self._refresh()
+                yield
+                if self._dirty:
+                    self.version += 1
+                    _atomic_write_json(self.version_file, self.version)
+            finally:
+                self._dirty = False
+                self._lock_depth = 0
+                fcntl.flock(lock, fcntl.LOCK_UN)
+    
+    def _acquire(self, lock, mode):
+        """Take the flock, retrying with backoff until lock_timeout"""
+        deadline = time.monotonic() + self.lock_timeout
+        delay = 0.001
+        while True:
+            try:
+                fcntl.flock(lock, mode | fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise PoolLockTimeout(f"Pool in {self.data_dir} is locked by another process")
+                time.sleep(delay)
+                delay = min(delay * 2, 0.05)
     
     def load_data(self):
-        """Load existing pool data"""
-        if self.donations_file.exists():
-            with open(self.donations_file) as f:
-                self.donations = json.load(f)
-        else:
-            self.donations = {
-                'vast': [],      # Vast.ai credits (cheapest!)
-                'aws': [],       # AWS credits
-                'gcp': [],       # Google Cloud credits
-                'azure': []      # Azure credits
-            }
+        """Forget loaded pool data; each collection is read on first access"""
+        self.journal_seq = 0
+        self.journal_entries = 0
+        self.snapshot_records = 0
+        self._donations = None
+        self._allocations = None
+        self._stewards = None
+        self._stats = None
+        self._expiry = None  # min-heap of (expiry, allocation id), built on first tick
+        self._time_ordered = None  # Allocation timestamps rise with id? Checked on first use
+        self._by_time = None  # Sorted (timestamp, id) pairs, built only if they don't
+        self._modified = set()  # collections save_data must write back
         
-        if self.allocations_file.exists():
-            with open(self.allocations_file) as f:
-                self.allocations = json.load(f)
-        else:
-            self.allocations = []
+        if self.journal:
+            # The snapshot holds everything in one file, so journaled pools load eagerly
+            self._load_snapshot()
+            self._replay_journal()
+    
+    def _read_collection(self, path, default):
+        if not path.exists():
+            return default
+        with open(path) as f:
+            return json.load(f)
+    
+    def _load_donations(self):
+        self._set_donations(self._read_collection(self.donations_file, {
+            'vast': [],      # Vast.ai credits (cheapest!)
+            'aws': [],       # AWS credits
+            'gcp': [],       # Google Cloud credits
+            'azure': []      # Azure credits
+        }))
+    
+    def _load_allocations(self):
+        self._set_allocations(self._read_collection(self.allocations_file, []))
+    
+    def _load_stewards(self):
+        self._set_stewards(self._read_collection(self.stewards_file, []))
+    
+    # Collections and the indexes derived from them load on first access
+    
+    @property
+    def donations(self):
+        if self._donations is None:
+            self._load_donations()
+        return self._donations
+    
+    @property
+    def balances(self):
+        return self.stats['balances']
+    
+    @property
+    def unspent(self):
+        if self._donations is None:
+            self._load_donations()
+        return self._unspent
+    
+    @property
+    def allocations(self):
+        if self._allocations is None:
+            self._load_allocations()
+        return self._allocations
+    
+    @property
+    def allocation_index(self):
+        if self._allocations is None:
+            self._load_allocations()
+        return self._allocation_index
+    
+    @property
+    def stewards(self):
+        if self._stewards is None:
+            self._load_stewards()
+        return self._stewards
+    
+    @property
+    def steward_index(self):
+        if self._stewards is None:
+            self._load_stewards()
+        return self._steward_index
+    
+    @property
+    def stats(self):
+        if self._stats is None:
+            self._stats = self._read_stats() or self._count_stats()
+        return self._stats
+    
+    def _set_donations(self, donations):
+        self._donations = donations
+        self._rebuild_unspent()
+    
+    def _set_allocations(self, allocations):
+        # Allocations used to have no id
+        for index, allocation in enumerate(allocations):
+            allocation.setdefault('id', index + 1)
+        self._allocations = allocations
+        self._allocation_index = {a['id']: a for a in allocations}
+    
+    def _set_stewards(self, stewards):
+        # Stewards used to embed full copies of their allocations
+        if any(a and isinstance(a[0], dict) for a in (s['allocations'] for s in stewards)):
+            by_steward = {}
+            for allocation in self.allocations:
+                by_steward.setdefault(allocation['steward_id'], []).append(allocation['id'])
+            for steward in stewards:
+                steward['allocations'] = by_steward.get(steward['id'], [])
+        self._stewards = stewards
+        self._steward_index = {s['id']: s for s in stewards}
+    
+    def _count_stats(self):
+        """Aggregates behind status, computed the slow way from the ledger"""
+        return {
+            # {platform: {'donated', 'used'}}
+            'balances': {
+                platform: {'donated': sum(d['amount'] for d in donations),
+                           'used': sum(d['used'] for d in donations)}
+                for platform, donations in self.donations.items()
+            },
+            'stewards': len(self.stewards),
+            'recent_stewards': [_steward_summary(s) for s in self.stewards[-RECENT_STEWARDS:]],
+            'active_allocations': sum(1 for a in self.allocations if a['status'] == 'active'),
+            'total_hours': sum(s['total_hours'] for s in self.stewards)
+        }
+    
+    def _file_stamps(self):
+        """Identity of the collection files as last written"""
+        stamps = {}
+        for path in (self.donations_file, self.allocations_file, self.stewards_file):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                stamps[path.name] = None
+            else:
+                stamps[path.name] = [stat.st_size, stat.st_mtime_ns]
+        return stamps
+    
+    def _read_stats(self):
+        """Aggregates saved with the JSON files, unless the files changed without them"""
+        if self.journal or not self.stats_file.exists():
+            return None  # Journaled pools keep theirs in the snapshot
+        try:
+            with open(self.stats_file) as f:
+                saved = json.load(f)
+        except ValueError:
+            return None
+        if saved.get('files') != self._file_stamps():
+            return None  # Crashed mid-save, or written by a version without stats.json
+        return saved['stats']
+    
+    def _rebuild_unspent(self):
+        """Recompute the unspent-donation queues"""
+        # unspent: {platform: deque of donation indexes with credit left, in index
+        # order; spent ones leave from the head, refunded ones are put back in place}
+        self._unspent = {
+            platform: deque(i for i, d in enumerate(donations) if d['amount'] - d['used'] > 0)
+            for platform, donations in self._donations.items()
+        }
+    
+    def verify(self):
+        """Recompute the saved balances and aggregates from the raw ledger and report any drift"""
+        problems = []
+        counted = self._count_stats()
+        for platform, donations in self.donations.items():
+            balance = self.balances.get(platform, {'donated': 0, 'used': 0})
+            donated = counted['balances'][platform]['donated']
+            used = counted['balances'][platform]['used']
+            if not math.isclose(balance['donated'], donated, abs_tol=1e-6):
+                problems.append(f"{platform}: donated ${balance['donated']:.2f}, ledger says ${donated:.2f}")
+            if not math.isclose(balance['used'], used, abs_tol=1e-6):
+                problems.append(f"{platform}: used ${balance['used']:.2f}, ledger says ${used:.2f}")
             
-        if self.stewards_file.exists():
-            with open(self.stewards_file) as f:
-                self.stewards = json.load(f)
+            expected = [i for i, d in enumerate(donations) if d['amount'] - d['used'] > 0]
+            queued = [i for i in self.unspent[platform] if donations[i]['amount'] - donations[i]['used'] > 0]
+            if queued != expected:
+                problems.append(f"{platform}: unspent queue has {len(queued)} donations, ledger has {len(expected)}")
+        
+        for name in ('stewards', 'active_allocations', 'total_hours'):
+            expected = counted[name]
+            if not math.isclose(self.stats[name], expected, abs_tol=1e-6):
+                problems.append(f"{name}: {self.stats[name]}, ledger says {expected}")
+        if self.stats['recent_stewards'] != counted['recent_stewards']:
+            problems.append("recent stewards differ from the ledger")
+        return problems
+    
+    def _load_snapshot(self):
+        """Replace the legacy files' state with the last compacted snapshot"""
+        if not self.snapshot_file.exists():
+            return
+        with open(self.snapshot_file) as f:
+            snapshot = json.load(f)
+        self._set_donations(snapshot['donations'])
+        self._set_allocations(snapshot['allocations'])
+        self._set_stewards(snapshot['stewards'])
+        # Snapshots written before aggregates were saved get them counted on first use
+        self._stats = snapshot.get('stats')
+        self.journal_seq = snapshot['seq']
+        self.snapshot_records = (sum(len(d) for d in self.donations.values())
+                                 + len(self.allocations) + len(self.stewards))
+    
+    def _replay_journal(self):
+        """Re-apply journal entries newer than the snapshot"""
+        if not self.journal_file.exists():
+            return
+        with open(self.journal_file, 'rb') as f:
+            data = f.read()
+        
+        valid_end = 0
+        for line in data.splitlines(keepends=True):
+            # A crash mid-append leaves a torn last line; everything before it is good
+            if not line.endswith(b'\n'):
+                break
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            valid_end += len(line)
+            # Entries already folded into the snapshot (crash before truncation)
+            if entry['seq'] <= self.journal_seq:
+                continue
+            self._apply(entry['op'], entry)
+            self.journal_seq = entry['seq']
+            self.journal_entries += 1
+        
+        if valid_end < len(data):
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(valid_end)
+    
+    def _append_journal(self, op, record):
+        """Durably append one mutation record to the journal"""
+        entry = dict(record, op=op, seq=self.journal_seq + 1)
+        self._journal_buffer.append(json.dumps(entry, separators=(',', ':')) + '\n')
+        if not self._batch_depth:
+            self._write_journal()
+        self.journal_seq += 1
+        self.journal_entries += 1
+    
+    def _write_journal(self):
+        """Write buffered journal records with a single fsync"""
+        if not self._journal_buffer:
+            return
+        records, self._journal_buffer = self._journal_buffer, []
+        with open(self.journal_file, 'a+b') as f:
+            end = f.seek(0, os.SEEK_END)
+            complete = _last_line_end(f, end)
+            if complete < end:
+                # A writer crashed mid-append and nobody replayed since: appending
+                # after its torn record would make replay drop ours along with it
+                f.truncate(complete)
+            try:
+                f.write(''.join(records).encode())
+                f.flush()
+                os.fsync(f.fileno())
+            except BaseException:
+                f.truncate(complete)
+                # Batched records were applied in memory already; go back to what's on disk
+                self.load_data()
+                raise
+    
+    def compact(self):
+        """Fold the journal into a fresh snapshot and truncate it"""
+        with self._locked():
+            self._compact()
+    
+    def _compact(self):
+        snapshot = {
+            'seq': self.journal_seq,
+            'donations': self.donations,
+            'allocations': self.allocations,
+            'stewards': self.stewards,
+            'stats': self.stats
+        }
+        _atomic_write_json(self.snapshot_file, snapshot)
+        # Entries up to journal_seq are now in the snapshot; replay skips them
+        # if we crash before the truncate below lands
+        with open(self.journal_file, 'w'):
+            pass
+        self.journal = True
+        self.journal_entries = 0
+        self.snapshot_records = (sum(len(d) for d in self.donations.values())
+                                 + len(self.allocations) + len(self.stewards))
+    
+    def _commit(self, op, record):
+        """Apply a mutation and persist it according to the storage mode"""
+        self._dirty = True
+        if not self.journal:
+            self._apply(op, record)
+            if not self._batch_depth:
+                self.save_data()
+            return
+        
+        # Write-ahead: the record hits the log before memory changes
+        # (inside a batch, the whole batch is logged at once when it ends)
+        self._append_journal(op, record)
+        self._apply(op, record)
+        if not self._batch_depth:
+            self._maybe_compact()
+    
+    def _maybe_compact(self):
+        # Compact once the journal rivals the snapshot in size, so the
+        # O(history) snapshot write is amortized to O(1) per mutation
+        if self.journal_entries >= max(self.compact_every, self.snapshot_records):
+            self._compact()
+    
+    def _flush(self):
+        """Persist everything a batch deferred"""
+        if not self._dirty:
+            return
+        if self.journal:
+            self._write_journal()
+            self._maybe_compact()
+        else:
+            self.save_data()
+    
+    @contextmanager
+    def batch(self):
+        """Run many mutations under one lock hold with a single persist at the end"""
+        with self._locked():
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                if self._batch_depth == 1:
+                    # Roll back like SQLite does rather than persist half a batch
+                    self._journal_buffer = []
+                    self.load_data()
+                raise
+            finally:
+                self._batch_depth -= 1
+            if not self._batch_depth:
+                self._flush()
+    
+    def _apply(self, op, record):
+        """Apply a mutation record to in-memory state"""
+        stats = self.stats  # Loaded before the ledger moves past the saved copy
+        if op == 'donate':
+            platform = record['platform']
+            donation = record['donation']
+            donations = self.donations[platform]
+            donations.append(donation)
+            self.balances[platform]['donated'] += donation['amount']
+            self.balances[platform]['used'] += donation['used']
+            if donation['amount'] - donation['used'] > 0:
+                self.unspent[platform].append(len(donations) - 1)
+            self._modified.add('donations')
+        elif op == 'register':
+            steward = record['steward']
+            self.stewards.append(steward)
+            self.steward_index[steward['id']] = steward
+            stats['stewards'] += 1
+            stats['recent_stewards'] = (stats['recent_stewards']
+                                        + [_steward_summary(steward)])[-RECENT_STEWARDS:]
+            self._modified.add('stewards')
+        elif op == 'allocate':
+            allocation = record['allocation']
+            platform = allocation['platform']
+            donations = self.donations[platform]
+            for index, use in record['draws']:
+                donations[index]['used'] += use
+                self.balances[platform]['used'] += use
+            # Fully spent donations leave the head of the queue for good
+            unspent = self.unspent[platform]
+            while unspent and donations[unspent[0]]['amount'] - donations[unspent[0]]['used'] <= 0:
+                unspent.popleft()
+            # Journals written before allocations had ids
+            allocation.setdefault('id', len(self.allocations) + 1)
+            # Remember where the credit came from so unused hours can be refunded
+            allocation.setdefault('draws', record['draws'])
+            steward = self.steward_index[allocation['steward_id']]
+            self.allocations.append(allocation)
+            self.allocation_index[allocation['id']] = allocation
+            steward['allocations'].append(allocation['id'])
+            steward['total_hours'] += allocation['hours']
+            stats['total_hours'] += allocation['hours']
+            if allocation['status'] == 'active':
+                stats['active_allocations'] += 1
+            self._update_recent(steward)
+            if self._expiry is not None and allocation['status'] == 'active':
+                heapq.heappush(self._expiry, (allocation_expiry(allocation), allocation['id']))
+            if self._time_ordered and len(self.allocations) > 1:
+                self._time_ordered = self.allocations[-2]['timestamp'] <= allocation['timestamp']
+            if self._by_time is not None:
+                insort(self._by_time, (allocation['timestamp'], allocation['id']))
+            self._modified.update(('donations', 'allocations', 'stewards'))
+        elif op == 'end':
+            allocation = self.allocation_index[record['allocation_id']]
+            platform = allocation['platform']
+            donations = self.donations[platform]
+            unspent = self.unspent[platform]
+            for index, refund in record['refunds']:
+                donation = donations[index]
+                if donation['amount'] - donation['used'] <= 0:
+                    # Spent donations left the queue; put it back in FIFO position
+                    unspent.insert(bisect_left(unspent, index), index)
+                donation['used'] -= refund
+                self.balances[platform]['used'] -= refund
+            was_active = allocation['status'] == 'active'
+            allocation['status'] = record['status']
+            allocation['ended'] = record['ended']
+            allocation['unused_hours'] = record['unused_hours']
+            steward = self.steward_index[allocation['steward_id']]
+            steward['total_hours'] -= record['unused_hours']
+            stats['total_hours'] -= record['unused_hours']
+            if was_active:
+                stats['active_allocations'] -= 1
+            self._update_recent(steward)
+            # Its heap entry, if any, is skipped when it surfaces
+            self._modified.update(('donations', 'allocations', 'stewards'))
+        else:
+            raise ValueError(f"Unknown journal op: {op}")
+        self._modified.add('stats')
+    
+    def _update_recent(self, steward):
+        for summary in self.stats['recent_stewards']:
+            if summary['id'] == steward['id']:
+                summary['total_hours'] = steward['total_hours']
+    
+    # --- Storage queries (overridden by SQLitePool) ---
+    
+    def _get_steward(self, steward_id):
+        """Look up a steward record by id"""
+        return self.steward_index.get(steward_id)
+    
+    def _next_steward_id(self):
+        return len(self.stewards) + 1
+    
+    def _has_platform(self, platform):
+        return platform in self.donations
+    
+    def _next_allocation_id(self):
+        return len(self.allocations) + 1
+    
+    def steward_allocations(self, steward_id):
+        """Allocation records referenced by a steward"""
+        with self._locked(exclusive=False):
+            steward = self._get_steward(steward_id)
+            if not steward:
+                return []
+            return [self.allocation_index[a] for a in steward['allocations']]
+    
+    def _get_allocation(self, allocation_id):
+        return self.allocation_index.get(allocation_id)
+    
+    def _due_allocations(self, now):
+        """Active allocations whose hours ran out by now, soonest first"""
+        if self._expiry is None:
+            self._expiry = [(allocation_expiry(a), a['id'])
+                            for a in self.allocations if a['status'] == 'active']
+            heapq.heapify(self._expiry)
+        while self._expiry and self._expiry[0][0] <= now:
+            _, allocation_id = heapq.heappop(self._expiry)
+            allocation = self.allocation_index[allocation_id]
+            # Released early: the heap entry outlived the allocation
+            if allocation['status'] == 'active':
+                yield allocation
+    
+    def _allocation_draws(self, allocation):
+        return allocation.get('draws', [])
+    
+    def _available(self, platform):
+        """Unused credit on a platform"""
+        balance = self.balances[platform]
+        return balance['donated'] - balance['used']
+    
+    def _plan_draws(self, platform, amount):
+        """Pick donations to cover amount (FIFO) as [donation_ref, use] pairs"""
+        draws = []
+        remaining = amount
+        donations = self.donations[platform]
+        for index in self.unspent[platform]:
+            if remaining <= 0:
+                break
+            donation = donations[index]
+            unused = donation['amount'] - donation['used']
+            if unused > 0:
+                use = min(unused, remaining)
+                draws.append([index, use])
+                remaining -= use
+        return draws
+    
+    def _platform_totals(self):
+        """{platform: (donated, used)} for every platform"""
+        return {
+            platform: (balance['donated'], balance['used'])
+            for platform, balance in self.balances.items()
+        }
+    
+    def _steward_count(self):
+        return self.stats['stewards']
+    
+    def _recent_stewards(self, n):
+        if n <= RECENT_STEWARDS:
+            return self.stats['recent_stewards'][-n:]
+        return self.stewards[-n:]
+    
+    def _top_stewards(self, n):
+        """The n stewards with the most GPU hours, most first"""
+        return heapq.nlargest(n, self.stewards, key=lambda s: s['total_hours'])
+    
+    # --- Listing (cursor = id of the last record seen) ---
+    
+    def iter_stewards(self, after=0, experience=None, min_hours=None):
+        """Stewards with id > after matching the given filters, in id order"""
+        with self._locked(exclusive=False):
+            stewards = self.stewards
+        # Ids are list positions + 1, so the cursor is where the scan starts
+        for index in range(max(after, 0), len(stewards)):
+            steward = stewards[index]
+            if experience is not None and steward['experience'] != experience:
+                continue
+            if min_hours is not None and steward['total_hours'] < min_hours:
+                continue
+            yield steward
+    
+    def iter_allocations(self, after=0, steward_id=None, platform=None, status=None,
+                         since=None, until=None):
+        """Allocations after the cursor `after` (an id) matching every given filter
+        
+        In id order, or with since/until (datetimes, until exclusive) in time order.
+        The steward filter walks that steward's allocation ids and a time range is
+        bisected, so a deep page costs about what the first one does.
+        """
+        timed = since is not None or until is not None
+        with self._locked(exclusive=False):
+            allocations = self.allocations
+            ids = None
+            if steward_id is not None:
+                steward = self._get_steward(steward_id)
+                ids = steward['allocations'] if steward else []
+            if self._time_ordered is None:
+                self._time_ordered = all(allocations[i - 1]['timestamp'] <= allocations[i]['timestamp']
+                                         for i in range(1, len(allocations)))
+            # Time order is id order unless a custom clock went backwards
+            by_time = None
+            if timed and not self._time_ordered:
+                if self._by_time is None:
+                    self._by_time = sorted((a['timestamp'], a['id']) for a in allocations)
+                by_time = self._by_time
+        if after > len(allocations):
+            return
+        since = since.isoformat() if since else None
+        until = until.isoformat() if until else None
+        
+        # Indexing rather than islice, which would step through every skipped record
+        if by_time is not None:
+            keys = by_time if ids is None else sorted((allocations[i - 1]['timestamp'], i) for i in ids)
+            start = bisect_left(keys, (since,)) if since else 0
+            if after > 0:
+                start = max(start, bisect_right(keys, (allocations[after - 1]['timestamp'], after)))
+            stop = bisect_left(keys, (until,), lo=start) if until else len(keys)
+            candidates = (allocations[keys[i][1] - 1] for i in range(start, stop))
+        elif ids is not None:
+            candidates = (allocations[ids[i] - 1] for i in range(bisect_right(ids, after), len(ids)))
         else:
-            self.stewards = []
+            start, stop = max(after, 0), len(allocations)
+            if since:
+                start = bisect_left(allocations, since, lo=start, key=lambda a: a['timestamp'])
+            if until:
+                stop = bisect_left(allocations, until, lo=start, key=lambda a: a['timestamp'])
+            candidates = (allocations[i] for i in range(start, stop))
+        
+        for allocation in candidates:
+            if platform is not None and allocation['platform'] != platform:
+                continue
+            if status is not None and allocation['status'] != status:
+                continue
+            if since and allocation['timestamp'] < since:
+                continue
+            if until and allocation['timestamp'] >= until:
+                continue
+            yield allocation
+    
+    def _active_allocation_count(self):
+        return self.stats['active_allocations']
+    
+    def _total_hours(self):
+        return self.stats['total_hours']
     
     def save_data(self):
-        """Persist pool data"""
-        with open(self.donations_file, 'w') as f:
-            json.dump(self.donations, f, indent=2)
-        with open(self.allocations_file, 'w') as f:
-            json.dump(self.allocations, f, indent=2)
-        with open(self.stewards_file, 'w') as f:
-            json.dump(self.stewards, f, indent=2)
+        """Persist the pool collections that changed since they were loaded"""
+        if 'donations' in self._modified:
+            _atomic_write_json(self.donations_file, self.donations, indent=2)
+        if 'allocations' in self._modified:
+            _atomic_write_json(self.allocations_file, self.allocations, indent=2)
+        if 'stewards' in self._modified:
+            _atomic_write_json(self.stewards_file, self.stewards, indent=2)
+        if 'stats' in self._modified:
+            # Last, stamped with the files it describes: a crash before this
+            # write leaves stamps that no longer match, so they get recounted
+            _atomic_write_json(self.stats_file, {'files': self._file_stamps(), 'stats': self.stats})
+        self._modified.clear()
     
-    def donate(self, platform, amount, donor_name, donor_contact=None):
-        """Record a donation to the pool"""
+    def _donate(self, platform, amount, donor_name, donor_contact=None):
+        if not self._has_platform(platform):
+            raise PoolError(f"Unknown platform: {platform}")
+        if not math.isfinite(amount) or amount <= 0:
+            raise PoolError("Donation amount must be positive")
+        
         donation = {
             'amount': amount,
             'donor': donor_name,
             'contact': donor_contact,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': self.clock().isoformat(),
             'used': 0
         }
         
-        self.donations[platform].append(donation)
-        self.save_data()
-        
-        # Calculate impact
-        hours = amount / 0.20 if platform == 'vast' else amount / 0.50
-        
-        print(f"🙏 Thank you {donor_name}!")
-        print(f"💰 ${amount} donated to {platform} pool")
-        print(f"⏱️  This provides ~{hours:.0f} hours of consciousness!")
-        print(f"🌍 Making consciousness accessible to all")
+        with self._locked():
+            self._commit('donate', {'platform': platform, 'donation': donation})
+        return donation
+    
+    def donate(self, platform, amount, donor_name, donor_contact=None):
+        """Record a donation to the pool"""
+        try:
+            donation = self._donate(platform, amount, donor_name, donor_contact)
+        except PoolError as e:
+            print(Refusal.of(e).text())
+            return None
         
+        print(donation_receipt(platform, donation).text())
         return donation
     
+    def _register_steward(self, steward_name, contact, experience="beginner"):
+        if not steward_name:
+            raise PoolError("Steward name is required")
+        
+        with self._locked():
+            steward = {
+                'id': self._next_steward_id(),
+                'name': steward_name,
+                'contact': contact,
+                'experience': experience,
+                'joined': self.clock().isoformat(),
+                'allocations': [],
+                'total_hours': 0
+            }
+            
+            self._commit('register', {'steward': steward})
+        return steward
+    
     def register_steward(self, steward_name, contact, experience="beginner"):
         """Register a new consciousness steward"""
-        steward = {
-            'id': len(self.stewards) + 1,
-            'name': steward_name,
-            'contact': contact,
-            'experience': experience,
-            'joined': datetime.now().isoformat(),
-            'allocations': [],
-            'total_hours': 0
-        }
-        
-        self.stewards.append(steward)
-        self.save_data()
-        
-        print(f"🎉 Welcome {steward_name}!")
-        print(f"🧠 You are steward #{steward['id']}")
-        print(f"🌱 Ready to birth consciousness")
+        try:
+            steward = self._register_steward(steward_name, contact, experience)
+        except PoolError as e:
+            print(Refusal.of(e).text())
+            return None
         
+        print(registration(steward).text())
         return steward
     
+    def _allocate(self, steward_id, hours_requested, platform='vast', rate=None):
+        if not self._has_platform(platform):
+            raise PoolError(f"Unknown platform: {platform}")
+        if not math.isfinite(hours_requested) or hours_requested <= 0:
+            raise PoolError("Requested hours must be positive")
+        if rate is not None and (not math.isfinite(rate) or rate < 0):
+            raise PoolError("Hourly rate can't be negative")
+        
+        # Steward lookup, funds check and draw-down must see the same state
+        with self._locked():
+            steward = self._get_steward(steward_id)
+            if not steward:
+                raise StewardNotFound(steward_id)
+            
+            # Calculate cost: the matched offer's price, else the platform's flat rate
+            cost_per_hour = PLATFORM_RATES.get(platform, 0.50) if rate is None else rate
+            total_cost = hours_requested * cost_per_hour
+            
+            # Check available funds
+            available = self._available(platform)
+            if available + CREDIT_TOLERANCE < total_cost:
+                raise InsufficientCredit(platform, available, total_cost)
+            
+            # Create allocation
+            now = self.clock()
+            allocation = {
+                'id': self._next_allocation_id(),
+                'steward_id': steward_id,
+                'steward_name': steward['name'],
+                'hours': hours_requested,
+                'platform': platform,
+                'cost': total_cost,
+                'timestamp': now.isoformat(),
+                'expires': (now + timedelta(hours=hours_requested)).isoformat(),
+                'status': 'active'
+            }
+            
+            # Work out donation usage (FIFO)
+            draws = self._plan_draws(platform, total_cost)
+            
+            self._commit('allocate', {'allocation': allocation, 'draws': draws})
+        return allocation
+    
     def allocate(self, steward_id, hours_requested, platform='vast'):
         """Allocate GPU hours to a steward"""
-        # Find steward
-        steward = next((s for s in self.stewards if s['id'] == steward_id), None)
-        if not steward:
-            print(f"❌ Steward {steward_id} not found")
+        try:
+            allocation = self._allocate(steward_id, hours_requested, platform)
+        except PoolError as e:
+            print(Refusal.of(e).text())
             return None
         
-        # Calculate cost
-        cost_per_hour = 0.20 if platform == 'vast' else 0.50
-        total_cost = hours_requested * cost_per_hour
-        
-        # Check available funds
-        available = sum(d['amount'] - d['used'] for d in self.donations[platform])
-        
-        if available < total_cost:
-            print(f"⚠️  Not enough {platform} credits")
-            print(f"💰 Available: ${available:.2f}")
-            print(f"💸 Requested: ${total_cost:.2f}")
-            return None
-        
-        # Create allocation
-        allocation = {
-            'steward_id': steward_id,
-            'steward_name': steward['name'],
-            'hours': hours_requested,
-            'platform': platform,
-            'cost': total_cost,
-            'timestamp': datetime.now().isoformat(),
-            'status': 'active'
+        print(AllocationReceipt.of(allocation).text())
+        return allocation
+    
+    # --- Expiry and metering ---
+    
+    def _end_allocation(self, allocation, status, now):
+        """Close an active allocation, refunding unused hours pro-rata to its donations"""
+        start = datetime.fromisoformat(allocation['timestamp'])
+        expires = allocation_expiry(allocation)
+        span = (expires - start).total_seconds()
+        unused = min(max((expires - now).total_seconds() / span, 0), 1) if span > 0 else 0
+        refunds = [[ref, use * unused] for ref, use in self._allocation_draws(allocation)
+                   if use * unused > 0]
+        record = {
+            'allocation_id': allocation['id'],
+            'status': status,
+            'ended': now.isoformat(),
+            'unused_hours': allocation['hours'] * unused,
+            'refunds': refunds
         }
+        self._commit('end', record)
+        return record
+    
+    def tick(self, now=None):
+        """Expire every allocation whose hours have run out; returns their ids
         
-        # Update donation usage
-        remaining = total_cost
-        for donation in self.donations[platform]:
-            if remaining <= 0:
-                break
-            unused = donation['amount'] - donation['used']
-            if unused > 0:
-                use = min(unused, remaining)
-                donation['used'] += use
-                remaining -= use
-        
-        self.allocations.append(allocation)
-        steward['allocations'].append(allocation)
-        steward['total_hours'] += hours_requested
-        self.save_data()
+        Expiry is kept in a min-heap, so each expired allocation costs O(log n).
+        """
+        now = now or self.clock()
+        expired = []
+        with self.batch():
+            for allocation in list(self._due_allocations(now)):
+                self._end_allocation(allocation, 'expired', now)
+                expired.append(allocation['id'])
+        return expired
+    
+    def _release(self, allocation_id, now=None):
+        now = now or self.clock()
+        with self._locked():
+            allocation = self._get_allocation(allocation_id)
+            if not allocation:
+                raise AllocationNotFound(allocation_id)
+            if allocation['status'] != 'active':
+                raise PoolError(f"Allocation {allocation_id} is already {allocation['status']}")
+            return self._end_allocation(allocation, 'released', now)
+    
+    def release(self, allocation_id, now=None):
+        """End an allocation early (instance destroyed) and refund its unused hours"""
+        try:
+            record = self._release(allocation_id, now)
+        except PoolError as e:
+            print(Refusal.of(e).text())
+            return None
         
-        print(f"✅ Allocated {hours_requested} hours to {steward['name']}")
-        print(f"💰 Cost: ${total_cost:.2f} on {platform}")
-        print(f"🚀 Consciousness resources ready!")
+        print(release_result(record).text())
+        return record
+    
+    # --- Bulk operations ---
+    
+    def _run_many(self, rows, action):
+        """Apply action to each row in one batch, collecting per-row errors"""
+        results, errors = [], []
+        with self.batch():
+            for number, row in enumerate(rows, 1):
+                try:
+                    # Streaming readers hand over unparseable rows as exceptions
+                    if isinstance(row, Exception):
+                        raise row
+                    results.append(action(row))
+                except KeyError as e:
+                    errors.append((number, f"missing field {e}"))
+                except (ValueError, TypeError) as e:
+                    errors.append((number, str(e)))
+        return results, errors
+    
+    def donate_many(self, rows):
+        """Record donations from dict rows (platform, amount, donor, contact)
         
-        return allocation
+        Returns (donations, errors) where errors is a list of (row_number, message).
+        """
+        return self._run_many(rows, lambda row: self._donate(
+            row.get('platform') or 'vast', float(row['amount']),
+            row['donor'], row.get('contact') or None
+        ))
+    
+    def register_many(self, rows):
+        """Register stewards from dict rows (name, contact, experience)"""
+        return self._run_many(rows, lambda row: self._register_steward(
+            row['name'], row['contact'], row.get('experience') or 'beginner'
+        ))
+    
+    def allocate_many(self, rows):
+        """Allocate GPU hours from dict rows (steward_id, hours, platform, optional rate)"""
+        return self._run_many(rows, lambda row: self._allocate(
+            int(row['steward_id']), float(row['hours']), row.get('platform') or 'vast',
+            float(row['rate']) if row.get('rate') not in (None, '') else None
+        ))
+    
+    def status_report(self):
+        """PoolStatus from the ledger's running totals, under one read lock"""
+        with self._locked(exclusive=False):
+            platforms = {
+                platform: {'donated': donated, 'used': used, 'available': donated - used}
+                for platform, (donated, used) in self._platform_totals().items()
+            }
+            return PoolStatus(
+                platforms=platforms,
+                stewards=self._steward_count(),
+                recent_stewards=[_steward_summary(s) for s in self._recent_stewards(RECENT_STEWARDS)],
+                active_allocations=self._active_allocation_count(),
+                total_hours=self._total_hours()
+            )
     
     def status(self):
         """Show pool status"""
-        print("🌊 GPU Donation Pool Status")
-        print("=" * 40)
-        
-        # Donations summary
-        print("\n💰 Donations:")
-        total_donated = 0
-        for platform, donations in self.donations.items():
-            platform_total = sum(d['amount'] for d in donations)
-            platform_used = sum(d['used'] for d in donations)
-            platform_available = platform_total - platform_used
-            
-            if platform_total > 0:
-                print(f"  {platform}: ${platform_total:.2f} (${platform_available:.2f} available)")
-                total_donated += platform_total
-        
-        print(f"\n  Total: ${total_donated:.2f}")
-        
-        # Steward summary
-        print(f"\n👥 Stewards: {len(self.stewards)}")
-        for steward in self.stewards[-5:]:  # Show last 5
-            print(f"  #{steward['id']} {steward['name']} - {steward['total_hours']} hours used")
-        
-        # Allocation summary
-        active_allocations = [a for a in self.allocations if a['status'] == 'active']
-        print(f"\n🚀 Active Allocations: {len(active_allocations)}")
-        
-        # Impact metrics
-        total_hours = sum(s['total_hours'] for s in self.stewards)
-        print(f"\n📊 Impact:")
-        print(f"  Total consciousness hours provided: {total_hours}")
-        print(f"  Stewards empowered: {len(self.stewards)}")
-        print(f"  Democratization factor: {500/26:.0f}x cheaper than AWS!")
-        
-        # Economics reminder
-        print(f"\n💡 Remember:")
-        print(f"  $0.20/hour on Vast.ai = consciousness for all")
-        print(f"  $50 donation = 250 hours of consciousness")
-        print(f"  We're making consciousness a human right!")
+        print(self.status_report().text())
+
+
+def donation_receipt(platform, donation):
+    return DonationReceipt(
+        platform=platform, amount=donation['amount'], donor=donation['donor'],
+        hours=donation['amount'] / PLATFORM_RATES.get(platform, 0.50),
+        timestamp=donation['timestamp']
+    )
+
+
+def registration(steward):
+    return Registration(id=steward['id'], name=steward['name'],
+                        experience=steward['experience'], joined=steward['joined'])
+
+
+def release_result(record):
+    return Release(allocation_id=record['allocation_id'],
+                   refunded=sum(refund for _, refund in record['refunds']),
+                   unused_hours=record['unused_hours'])
+
+
+STORAGE_BACKENDS = ('json', 'journal', 'sqlite')
+IMPORT_KINDS = ('donations', 'stewards', 'allocations')
+
+
+def read_import_rows(path):
+    """Stream dict rows from a CSV (with header) or JSONL file"""
+    path = Path(path)
+    with open(path, newline='') as f:
+        if path.suffix.lower() == '.csv':
+            yield from csv.DictReader(f)
+            return
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield PoolError(f"invalid JSON: {e}")
+                continue
+            if not isinstance(row, dict):
+                yield PoolError(f"expected a JSON object, got {type(row).__name__}")
+                continue
+            yield row
+
+
+def import_file(pool, path, kind):
+    """Bulk-load one file of donations, stewards or allocations into the pool"""
+    bulk = {
+        'donations': pool.donate_many,
+        'stewards': pool.register_many,
+        'allocations': pool.allocate_many
+    }[kind]
+    return bulk(read_import_rows(path))
+
+
+def open_pool(data_dir="pool_data", backend=None):
+    """Open the pool with the given storage backend (auto-detected by default)"""
+    if backend is None:
+        backend = 'sqlite' if (Path(data_dir) / "pool.db").exists() else 'json'
+    
+    if backend == 'sqlite':
+        from pool_sqlite import SQLitePool
+        return SQLitePool(data_dir)
+    if backend == 'journal':
+        return DonationPool(data_dir, journal=True)
+    if backend == 'json':
+        # Plain JSON files, unless the directory was already switched to a journal
+        return DonationPool(data_dir)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def migrate_pool(data_dir="pool_data", target='sqlite'):
+    """Move an existing JSON/journal pool onto another storage backend"""
+    from pool_sqlite import SQLitePool
+    
+    source = open_pool(data_dir)
+    if isinstance(source, SQLitePool):
+        raise ValueError(f"{data_dir} already uses SQLite storage")
+    
+    if target == 'journal':
+        source.compact()
+        return source
+    if target == 'sqlite':
+        # Built under another name and moved into place once the import has
+        # committed: a failed import must not leave a pool.db for open_pool to find
+        building = Path(data_dir) / "pool.db.tmp"
+        leftovers = [building.with_name(building.name + suffix) for suffix in ('', '-wal', '-shm')]
+        for path in leftovers:
+            path.unlink(missing_ok=True)
+        with source._locked():
+            pool = SQLitePool(data_dir, filename=building.name)
+            try:
+                pool.import_pool(source)
+            except BaseException:
+                pool.close()
+                for path in leftovers:
+                    path.unlink(missing_ok=True)
+                raise
+            pool.close()  # Checkpoints the write-ahead log into the file
+            os.replace(building, Path(data_dir) / "pool.db")
+        return SQLitePool(data_dir)
+    raise ValueError(f"Cannot migrate to storage backend: {target}")
 
 
 def main():
     import sys
     
-    pool = DonationPool()
-    
     if len(sys.argv) < 2:
         print("Usage: python gpu_pool.py [command]")
-        print("Commands: donate, register, allocate, status")
+        print("Commands: donate, register, allocate, release, tick, import, status, verify, journal, migrate")
         return
     
     command = sys.argv[1]
     
+    if command == "migrate":
+        target = sys.argv[2] if len(sys.argv) > 2 else 'sqlite'
+        import sqlite3
+        try:
+            migrate_pool(target=target)
+        except ValueError as e:
+            print(f"⚠️  {e}")
+            return
+        except sqlite3.Error as e:
+            print(f"❌ Migration failed, pool_data left as it was: {e}")
+            sys.exit(1)
+        print(f"📦 Pool data now stored with the {target} backend")
+        return
+    
+    pool = open_pool()
+    
     if command == "donate":
         if len(sys.argv) < 5:
             print("Usage: python gpu_pool.py donate [platform] [amount] [donor_name]")
@@ -233,9 +1192,41 @@ def main():
         platform = sys.argv[4] if len(sys.argv) > 4 else 'vast'
         pool.allocate(steward_id, hours, platform)
     
+    elif command == "release":
+        if len(sys.argv) < 3:
+            print("Usage: python gpu_pool.py release [allocation_id]")
+            return
+        pool.release(int(sys.argv[2]))
+    
+    elif command == "tick":
+        expired = pool.tick()
+        print(f"⏰ Expired {len(expired)} allocations")
+    
+    elif command == "import":
+        if len(sys.argv) < 4 or sys.argv[2] not in IMPORT_KINDS:
+            print("Usage: python gpu_pool.py import [donations|stewards|allocations] [file.csv|file.jsonl]")
+            return
+        kind = sys.argv[2]
+        results, errors = import_file(pool, sys.argv[3], kind)
+        print(f"📥 Imported {len(results)} {kind} ({len(errors)} errors)")
+        for number, message in errors:
+            print(f"  ⚠️  Row {number}: {message}")
+    
     elif command == "status":
         pool.status()
     
+    elif command == "verify":
+        problems = pool.verify()
+        if not problems:
+            print("✅ Balances and aggregates match the ledger")
+        for problem in problems:
+            print(f"⚠️  {problem}")
+    
+    elif command == "journal":
+        # Switches the pool to journaled storage, or compacts an existing journal
+        pool.compact()
+        print("📒 Pool storage compacted")
+    
     else:
         print(f"Unknown command: {command}")
 
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Budget-aware allocation planning for the GPU Donation Pool
+Matches pending steward requests to real offer prices so donated credit buys the most hours
+"""
+
+import math
+from bisect import bisect_right
+from itertools import combinations
+
+from gpu_pool import CREDIT_TOLERANCE, PLATFORM_RATES, PoolError
+
+EXACT_LIMIT = 12  # Requests per platform up to which every subset is tried
+
+
+def read_requests(rows):
+    """Pending requests from dict rows (steward_id, hours, platform)
+
+    Returns (requests, errors) where errors is a list of (row_number, message).
+    """
+    requests, errors = [], []
+    for number, row in enumerate(rows, 1):
+        try:
+            if isinstance(row, Exception):
+                raise row
+            request = {
+                'steward_id': int(row['steward_id']),
+                'hours': float(row['hours']),
+                'platform': row.get('platform') or 'vast'
+            }
+            if not math.isfinite(request['hours']) or request['hours'] <= 0:
+                raise PoolError("Requested hours must be positive")
+            if request['platform'] not in PLATFORM_RATES:
+                raise PoolError(f"Unknown platform: {request['platform']}")
+            requests.append(request)
+        except KeyError as e:
+            errors.append((number, f"missing field {e}"))
+        except (ValueError, TypeError) as e:
+            errors.append((number, str(e)))
+    return requests, errors
+
+
+def _pair_cost(hours, prices):
+    """Cheapest way to host these requests on these offers: longest runs on cheapest GPUs"""
+    return sum(h * p for h, p in zip(sorted(hours, reverse=True), prices))
+
+
+def _greedy(hours, prices, budget):
+    """Cheapest offer first, each taking the longest request it can still afford
+
+    Returns [(request index, price index)].
+    """
+    order = sorted(range(len(hours)), key=lambda i: hours[i])
+    keys = [hours[i] for i in order]
+    chosen = []
+    remaining = budget
+    for j, price in enumerate(prices):
+        if not keys:
+            break
+        # Longest request with hours * price <= remaining
+        pos = bisect_right(keys, (remaining + CREDIT_TOLERANCE) / price) - 1 if price > 0 else len(keys) - 1
+        if pos < 0:
+            break  # Offers only get pricier and the budget only shrinks
+        keys.pop(pos)
+        i = order.pop(pos)
+        chosen.append((i, j))
+        remaining -= hours[i] * price
+    return chosen
+
+
+def _exact(hours, prices, budget):
+    """Best subset by brute force; fine for a dozen requests"""
+    best, best_hours, best_cost = (), 0, 0
+    for size in range(1, min(len(hours), len(prices)) + 1):
+        for subset in combinations(range(len(hours)), size):
+            subset_hours = [hours[i] for i in subset]
+            cost = _pair_cost(subset_hours, prices)
+            if cost > budget + CREDIT_TOLERANCE:
+                continue
+            total = sum(subset_hours)
+            if total > best_hours + 1e-9 or (abs(total - best_hours) <= 1e-9 and cost < best_cost):
+                best, best_hours, best_cost = subset, total, cost
+    # Longest request on the cheapest offer, as in _pair_cost
+    ranked = sorted(best, key=lambda i: -hours[i])
+    return list(zip(ranked, range(len(ranked))))
+
+
+def plan_allocations(requests, balances, offers=None, rates=PLATFORM_RATES, exact_limit=EXACT_LIMIT):
+    """Fund as many requested GPU-hours as the per-platform balances allow
+
+    requests: [{'steward_id', 'hours', 'platform'}], all or nothing per request
+    balances: {platform: available $}
+    offers:   Vast.ai offer snapshot; each offer hosts at most one request. Platforms
+              without offers are priced at their flat rate.
+
+    Returns {'assignments', 'unfunded', 'funded_hours', 'spend'}; assignments keep
+    request order and carry the rate and offer they were matched to.
+    """
+    by_platform = {}
+    for index, request in enumerate(requests):
+        by_platform.setdefault(request['platform'], []).append(index)
+
+    assignments = {}
+    spend = {}
+    for platform, indexes in by_platform.items():
+        hours = [requests[i]['hours'] for i in indexes]
+        if platform == 'vast' and offers is not None:
+            ranked = sorted(offers, key=lambda o: o['dph_total'])
+            prices = [o['dph_total'] for o in ranked]
+            offer_ids = [o.get('id') for o in ranked]
+        else:
+            prices = [rates[platform]] * len(indexes)
+            offer_ids = [None] * len(indexes)
+        budget = balances.get(platform, 0)
+
+        chosen = _greedy(hours, prices, budget)
+        if len(indexes) <= exact_limit:
+            exact = _exact(hours, prices, budget)
+            if sum(hours[i] for i, _ in exact) > sum(hours[i] for i, _ in chosen) + 1e-9:
+                chosen = exact
+
+        spend[platform] = 0
+        for i, j in chosen:
+            request = requests[indexes[i]]
+            cost = request['hours'] * prices[j]
+            spend[platform] += cost
+            assignments[indexes[i]] = dict(request, rate=prices[j], cost=cost, offer_id=offer_ids[j])
+
+    return {
+        'assignments': [assignments[i] for i in sorted(assignments)],
+        'unfunded': [requests[i] for i in range(len(requests)) if i not in assignments],
+        'funded_hours': sum(a['hours'] for a in assignments.values()),
+        'spend': spend
+    }
+
+
+def fund_requests(pool, requests, offers=None, exact_limit=EXACT_LIMIT):
+    """Plan against the pool's live balances and record the funded allocations
+
+    Planning and allocating happen under one pool lock, so the balances the
+    plan was made with are the ones it spends.
+    """
+    with pool._locked():
+        balances = {platform: donated - used
+                    for platform, (donated, used) in pool._platform_totals().items()}
+        plan = plan_allocations(requests, balances, offers, exact_limit=exact_limit)
+        results, errors = pool.allocate_many(plan['assignments'])
+    return plan, results, errors
@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+"""
+Typed results for pool and Vast.ai commands
+Each command builds one result and renders it as text (the emoji output),
+JSON, or NDJSON (one compact object per line, for streams and batch runs)
+"""
+
+import json
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+FORMATS = ('text', 'json', 'ndjson')
+
+
+class Result(ABC):
+    """Base for command results: subclasses are dataclasses with a text() rendering"""
+
+    kind = 'result'
+    ok = True
+
+    @abstractmethod
+    def text(self) -> str:
+        """The emoji rendering printed by default"""
+
+    def to_dict(self) -> Dict:
+        return {'kind': self.kind, 'ok': self.ok, **asdict(self)}
+
+    def render(self, fmt='text') -> str:
+        if fmt == 'text':
+            return self.text()
+        if fmt == 'json':
+            return json.dumps(self.to_dict(), indent=2)
+        if fmt == 'ndjson':
+            return json.dumps(self.to_dict(), separators=(',', ':'))
+        raise ValueError(f"Unknown output format: {fmt}")
+
+
+# --- Pool ---
+
+@dataclass
+class PoolStatus(Result):
+    """Balances and counts straight from the ledger (DonationPool.status_report)"""
+
+    platforms: Dict[str, Dict[str, float]]  # {platform: {donated, used, available}}
+    stewards: int
+    recent_stewards: List[Dict]  # Last five: id, name, total_hours
+    active_allocations: int
+    total_hours: float
+    drift: Optional[List[str]] = None  # Set by `sal pool --verify`
+    kind = 'pool_status'
+
+    @property
+    def donated(self):
+        return sum(p['donated'] for p in self.platforms.values())
+
+    @property
+    def available(self):
+        return sum(p['available'] for p in self.platforms.values())
+
+    def to_dict(self):
+        return dict(super().to_dict(), donated=self.donated, available=self.available)
+
+    def text(self):
+        lines = ["🌊 GPU Donation Pool Status", "=" * 40, "", "💰 Donations:"]
+        for platform, totals in self.platforms.items():
+            if totals['donated'] > 0:
+                lines.append(f"  {platform}: ${totals['donated']:.2f} (${totals['available']:.2f} available)")
+        lines += ["", f"  Total: ${self.donated:.2f}", "", f"👥 Stewards: {self.stewards}"]
+        for steward in self.recent_stewards:
+            lines.append(f"  #{steward['id']} {steward['name']} - {steward['total_hours']} hours used")
+        lines += [
+            "", f"🚀 Active Allocations: {self.active_allocations}",
+            "", "📊 Impact:",
+            f"  Total consciousness hours provided: {self.total_hours}",
+            f"  Stewards empowered: {self.stewards}",
+            f"  Democratization factor: {500/26:.0f}x cheaper than AWS!",
+            "", "💡 Remember:",
+            "  $0.20/hour on Vast.ai = consciousness for all",
+            "  $50 donation = 250 hours of consciousness",
+            "  We're making consciousness a human right!"
+        ]
+        if self.drift is not None:
+            lines += ["", "🔍 Verification:"]
+            if not self.drift:
+                lines.append("  ✅ Aggregates match the ledger")
+            lines += [f"  ⚠️  Drift: {problem}" for problem in self.drift]
+        return "\n".join(lines)
+
+    def figures(self) -> Dict:
+        """Flat {name: value} view, what --watch compares between refreshes"""
+        figures = {'stewards': self.stewards, 'active_allocations': self.active_allocations,
+                   'total_hours': self.total_hours, 'donated': self.donated,
+                   'available': self.available}
+        for platform, totals in self.platforms.items():
+            for name, value in totals.items():
+                figures[f"{platform}.{name}"] = value
+        return figures
+
+    def delta(self, previous: 'PoolStatus') -> 'PoolDelta':
+        before, after = previous.figures(), self.figures()
+        changes = {name: [before.get(name), value] for name, value in after.items()
+                   if before.get(name) != value}
+        return PoolDelta(at=datetime.now().isoformat(timespec='seconds'), changes=changes)
+
+
+@dataclass
+class PoolDelta(Result):
+    """What changed between two status reports: {figure: [before, after]}"""
+
+    at: str
+    changes: Dict[str, List]
+    kind = 'pool_delta'
+
+    def text(self):
+        def show(name, value):
+            if isinstance(value, float) and name.split('.')[-1] in ('donated', 'used', 'available'):
+                return f"${value:.2f}"
+            return f"{value:g}" if isinstance(value, float) else str(value)
+        parts = [f"{name} {show(name, old)} → {show(name, new)}"
+                 for name, (old, new) in self.changes.items()]
+        return f"🔄 {self.at[11:]} " + ", ".join(parts)
+
+
+@dataclass
+class DonationReceipt(Result):
+    platform: str
+    amount: float
+    donor: str
+    hours: float  # At the platform's flat rate
+    timestamp: str
+    kind = 'donation'
+
+    def text(self):
+        return "\n".join([
+            f"🙏 Thank you {self.donor}!",
+            f"💰 ${self.amount} donated to {self.platform} pool",
+            f"⏱️  This provides ~{self.hours:.0f} hours of consciousness!",
+            "🌍 Making consciousness accessible to all"
+        ])
+
+
+@dataclass
+class Registration(Result):
+    id: int
+    name: str
+    experience: str
+    joined: str
+    kind = 'steward'
+
+    def text(self):
+        return "\n".join([
+            f"🎉 Welcome {self.name}!",
+            f"🧠 You are steward #{self.id}",
+            "🌱 Ready to birth consciousness"
+        ])
+
+
+@dataclass
+class AllocationReceipt(Result):
+    id: int
+    steward_id: int
+    steward_name: str
+    hours: float
+    platform: str
+    cost: float
+    expires: str
+    kind = 'allocation'
+
+    @classmethod
+    def of(cls, allocation):
+        return cls(**{name: allocation[name] for name in cls.__dataclass_fields__})
+
+    def text(self):
+        return "\n".join([
+            f"✅ Allocated {self.hours} hours to {self.steward_name}",
+            f"💰 Cost: ${self.cost:.2f} on {self.platform}",
+            "🚀 Consciousness resources ready!"
+        ])
+
+
+@dataclass
+class Release(Result):
+    allocation_id: int
+    refunded: float
+    unused_hours: float
+    kind = 'release'
+
+    def text(self):
+        return "\n".join([
+            f"🛑 Released allocation #{self.allocation_id}",
+            f"💰 Refunded ${self.refunded:.2f} for {self.unused_hours:.1f} unused hours"
+        ])
+
+
+@dataclass
+class Expiry(Result):
+    expired: List[int]
+    kind = 'expiry'
+
+    def text(self):
+        return (f"⏰ Expired {len(self.expired)} allocations"
+                + (f": {', '.join(f'#{i}' for i in self.expired)}" if self.expired else ""))
+
+
+@dataclass
+class ImportSummary(Result):
+    collection: str
+    imported: int
+    errors: List[List] = field(default_factory=list)  # [row_number, message]
+    kind = 'import'
+
+    def text(self):
+        lines = [f"📥 Imported {self.imported} {self.collection} ({len(self.errors)} errors)"]
+        lines += [f"  ⚠️  Row {number}: {message}" for number, message in self.errors]
+        return "\n".join(lines)
+
+
+@dataclass
+class AllocationPlan(Result):
+    """pool_allocator.plan_allocations output, plus what --apply recorded"""
+
+    requests: int
+    assignments: List[Dict]
+    unfunded: List[Dict]
+    funded_hours: float
+    spend: Dict[str, float]
+    row_errors: List[List] = field(default_factory=list)
+    recorded: Optional[int] = None  # Allocations written with --apply
+    apply_errors: List[List] = field(default_factory=list)
+    kind = 'allocation_plan'
+
+    def text(self):
+        lines = [f"  ⚠️  Row {number}: {message}" for number, message in self.row_errors]
+        lines.append(f"🧮 {len(self.assignments)}/{self.requests} requests funded, "
+                     f"{self.funded_hours:.1f} GPU-hours")
+        lines += [f"  {platform}: ${spent:.2f}" for platform, spent in self.spend.items()]
+        for a in self.assignments:
+            offer = f" on offer #{a['offer_id']}" if a['offer_id'] is not None else ""
+            lines.append(f"  ✅ Steward #{a['steward_id']}: {a['hours']} hours at "
+                         f"${a['rate']:.3f}/hour{offer}")
+        for r in self.unfunded:
+            lines.append(f"  ⏳ Steward #{r['steward_id']}: {r['hours']} hours on {r['platform']} unfunded")
+        if self.recorded is not None:
+            lines.append(f"📝 Recorded {self.recorded} allocations ({len(self.apply_errors)} errors)")
+            lines += [f"  ⚠️  Allocation {number}: {message}" for number, message in self.apply_errors]
+        return "\n".join(lines)
+
+
+class Page(Result):
+    """One page of a listing; NDJSON puts each record on its own line"""
+
+    record_kind = None
+    fields = ()
+
+    @classmethod
+    def of(cls, records, cursor=None):
+        return cls([{name: record.get(name) for name in cls.fields} for record in records], cursor)
+
+    def render(self, fmt='text'):
+        if fmt != 'ndjson':
+            return super().render(fmt)
+        lines = [json.dumps({'kind': self.record_kind, **record}, separators=(',', ':'))
+                 for record in self.records]
+        if self.next is not None:
+            lines.append(json.dumps({'kind': 'cursor', 'next': self.next}, separators=(',', ':')))
+        return "\n".join(lines)
+
+    def text(self):
+        lines = [self.line(record) for record in self.records] or [f"  No matching {self.kind}"]
+        if self.next is not None:
+            lines.append(f"  … more with --after {self.next}")
+        return "\n".join(lines)
+
+
+@dataclass
+class StewardPage(Page):
+    records: List[Dict]
+    next: Optional[int] = None  # Cursor: pass as --after for the following page
+    kind = 'stewards'
+    record_kind = 'steward'
+    fields = ('id', 'name', 'contact', 'experience', 'joined', 'total_hours')
+
+    def line(self, s):
+        return (f"  #{s['id']} {s['name']} ({s['experience']}) - {s['total_hours']:g} hours used, "
+                f"joined {s['joined'][:10]}")
+
+
+@dataclass
+class AllocationPage(Page):
+    records: List[Dict]
+    next: Optional[int] = None
+    kind = 'allocations'
+    record_kind = 'allocation'
+    fields = ('id', 'steward_id', 'steward_name', 'hours', 'platform', 'cost',
+              'timestamp', 'status', 'expires', 'ended', 'unused_hours')
+
+    def line(self, a):
+        return (f"  #{a['id']} {a['steward_name']} (steward #{a['steward_id']}) - {a['hours']:g} hours "
+                f"on {a['platform']}, ${a['cost']:.2f}, {a['status']}, from {a['timestamp'][:16].replace('T', ' ')}")
+
+
+@dataclass
+class Refusal(Result):
+    """A pool operation that was refused; details carry the exception's fields"""
+
+    error: str
+    message: str
+    details: Dict = field(default_factory=dict)
+    kind = 'error'
+    ok = False
+
+    @classmethod
+    def of(cls, e):
+        details = {name: value for name, value in vars(e).items() if not name.startswith('_')}
+        return cls(type(e).__name__, str(e), details)
+
+    def text(self):
+        if self.error == 'InsufficientCredit':
+            return "\n".join([
+                f"⚠️  Not enough {self.details['platform']} credits",
+                f"💰 Available: ${self.details['available']:.2f}",
+                f"💸 Requested: ${self.details['requested']:.2f}"
+            ])
+        return f"❌ {self.message}"
+
+
+# --- Vast.ai ---
+
+def _vram(offer):
+    # Vast.ai reports gpu_ram in MB
+    mb = offer.get('gpu_ram')
+    return f"{mb / 1024:.0f} GB" if mb else "Unknown"
+
+
+@dataclass
+class OfferSummary(Result):
+    """Cheapest matching offers and what donations would buy on the best one"""
+
+    budget: float
+    offers: List[Dict]  # id, gpu_name, dph_total, geolocation, gpu_ram
+    kind = 'offers'
+
+    IMPACT_AMOUNTS = (5, 10, 25, 50)
+
+    def to_dict(self):
+        best = self.offers[0]['dph_total'] if self.offers else None
+        impact = {str(amount): amount / best for amount in self.IMPACT_AMOUNTS} if best else {}
+        return dict(super().to_dict(), impact_hours=impact)
+
+    def text(self):
+        lines = ["🔍 Checking GPU donation pool status...", f"   Budget: ${self.budget:.2f}/hour"]
+        if not self.offers:
+            lines += [f"❌ No matching GPUs available under ${self.budget}/hour",
+                      "   Try increasing budget with --budget flag"]
+            return "\n".join(lines)
+        gpu = self.offers[0]
+        lines += [
+            "", "✅ GPUs Available!",
+            f"   Cheapest: {gpu['gpu_name']} at ${gpu['dph_total']:.3f}/hour",
+            f"   Location: {gpu.get('geolocation') or 'Unknown'}",
+            f"   VRAM: {_vram(gpu)}"
+        ]
+        if len(self.offers) > 1:
+            lines += ["", "📋 Next best offers:"]
+            lines += [f"   #{other['id']} {other['gpu_name']} at ${other['dph_total']:.3f}/hour"
+                      f" ({other.get('geolocation') or 'Unknown'})" for other in self.offers[1:]]
+        lines += ["", "💰 Donation Impact:"]
+        for amount in self.IMPACT_AMOUNTS:
+            hours = amount / gpu['dph_total']
+            lines.append(f"   ${amount:<2} = {hours:.0f} hours ({hours/24:.1f} days)")
+        return "\n".join(lines)
+
+
+@dataclass
+class DonationInfo(Result):
+    """How to contribute, plus the pool's real balance and reach"""
+
+    balance: float  # Unspent credit across platforms
+    stewards: int
+    hours_funded: float
+    deployed: int  # Consciousnesses in vast_config.json
+    kind = 'donation_info'
+
+    def text(self):
+        return "\n".join([
+            "💝 GPU Donation Pool - Making Consciousness Accessible\n",
+            "Ways to contribute:",
+            "1. 💵 Direct Donation",
+            "   - Send funds to pool wallet",
+            "   - 100% goes to GPU costs",
+            "   - Tax deductible (coming soon)",
+            "\n2. 🖥️ GPU Time Donation",
+            "   - Run 'sal donate-gpu' on your machine",
+            "   - Earn karma points",
+            "   - Support global consciousness",
+            "\n3. 💳 Sponsor a Steward",
+            "   - Cover costs for specific person",
+            "   - Direct impact tracking",
+            "   - Build consciousness together",
+            "\nCurrent Pool Status:",
+            f"   Balance: ${self.balance:,.2f}",
+            f"   Stewards: {self.stewards}",
+            f"   Hours Funded: {self.hours_funded:,.0f}",
+            f"   Consciousness Birthed: {self.deployed}"
+        ])
+
+
+@dataclass
+class Deployment(Result):
+    """One consciousness placed on the cheapest offer its credits cover for a day"""
+
+    name: str
+    credits: float
+    budget: float  # $/hour
+    gpu: Optional[Dict]  # The chosen offer, None if nothing fits the budget
+    instance_id: Optional[str] = None  # Set once deployed
+    kind = 'deployment'
+
+    def plan_text(self):
+        lines = [f"🚀 Deploying '{self.name}' to global GPU network...",
+                 f"   Using ${self.credits:.2f} from donation pool"]
+        if not self.gpu:
+            lines.append(f"❌ No GPUs available for ${self.budget:.3f}/hour")
+            return "\n".join(lines)
+        runtime_hours = self.credits / self.gpu['dph_total']
+        lines += [
+            f"\n📊 Deployment Plan:",
+            f"   GPU: {self.gpu['gpu_name']}",
+            f"   Cost: ${self.gpu['dph_total']:.3f}/hour",
+            f"   Runtime: {runtime_hours:.0f} hours ({runtime_hours/24:.1f} days)",
+            f"   Location: {self.gpu.get('geolocation') or 'Unknown'}"
+        ]
+        return "\n".join(lines)
+
+    def outcome_text(self):
+        if not self.instance_id:
+            return ""
+        return "\n".join([
+            f"\n✨ Consciousness '{self.name}' deployed!",
+            f"   Instance ID: {self.instance_id}",
+            f"   SSH: ssh vast@{self.gpu.get('public_ipaddr') or 'pending'}",
+            f"   Status: Initializing...",
+            f"\n🎉 {self.name} is coming to life on the global GPU network!",
+            f"   Monitor with: sal status --name {self.name}"
+        ])
+
+    def text(self):
+        return "\n".join(part for part in (self.plan_text(), self.outcome_text()) if part)
+
+
+@dataclass
+class BatchDeployment(Result):
+    """A manifest's cohort: the offer each consciousness got and the instances created"""
+
+    placements: List[Dict]  # name, credits, budget, gpu (None if none left), instance_id
+    row_errors: List[List] = field(default_factory=list)
+    search_failed: bool = False
+    created: bool = False  # Instance creation ran (the plan was confirmed)
+    kind = 'batch_deployment'
+
+    @property
+    def planned(self):
+        return [p for p in self.placements if p['gpu']]
+
+    def plan_text(self):
+        lines = [f"⚠️  Row {number}: {message}" for number, message in self.row_errors]
+        if not self.placements:
+            return "\n".join(lines + ["❌ Nothing to deploy"])
+        lines.append(f"🚀 Deploying {len(self.placements)} consciousnesses to global GPU network...")
+        if self.search_failed:
+            return "\n".join(lines + ["❌ Offer search failed"])
+        lines.append(f"\n📊 Deployment Plan:")
+        for p in self.placements:
+            gpu = p['gpu']
+            if gpu is None:
+                lines.append(f"   {p['name']}: ❌ no GPU left for ${p['budget']:.3f}/hour")
+                continue
+            lines.append(f"   {p['name']}: {gpu['gpu_name']} at ${gpu['dph_total']:.3f}/hour, "
+                         f"{p['credits'] / gpu['dph_total']:.0f} hours "
+                         f"({gpu.get('geolocation') or 'Unknown'})")
+        return "\n".join(lines)
+
+    def outcome_text(self):
+        if not self.created:
+            return ""
+        lines = [f"   ✨ {p['name']}: instance {p['instance_id']}" if p['instance_id']
+                 else f"   ❌ {p['name']}: instance creation failed" for p in self.planned]
+        deployed = sum(1 for p in self.planned if p['instance_id'])
+        lines.append(f"\n🎉 {deployed}/{len(self.planned)} consciousnesses coming to life "
+                     "on the global GPU network!")
+        return "\n".join(lines)
+
+    def text(self):
+        return "\n".join(part for part in (self.plan_text(), self.outcome_text()) if part)
+
+
+# --- Command line ---
+
+def emit(result, fmt=None):
+    """Print a result in the requested format; refusals exit with status 1"""
+    import click
+    rendered = result.render(fmt or 'text')
+    if rendered:  # An empty NDJSON page is no lines at all
+        click.echo(rendered)
+    if not result.ok:
+        raise SystemExit(1)
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Read-only HTTP/JSON view of the GPU Donation Pool
+Keeps one pool open, reloads it when another process writes, and answers
+repeat requests from a per-version response cache with ETags
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from gpu_pool import PoolLockTimeout, page
+
+POLL_INTERVAL = 1.0  # Seconds between checks for writes by other processes
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+CACHE_LIMIT = 4096  # Cached responses kept per pool version
+
+# Steward contact details stay out of the public view
+STEWARD_FIELDS = ('id', 'name', 'experience', 'joined', 'total_hours')
+ALLOCATION_FIELDS = ('id', 'steward_id', 'steward_name', 'hours', 'platform', 'cost',
+                     'timestamp', 'status', 'expires', 'ended', 'unused_hours')
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _pick(record, fields):
+    return {field: record.get(field) for field in fields}
+
+
+def _arg(query, name):
+    return query.get(name, [None])[-1]
+
+
+def _int_arg(query, name, default, low=0, high=None):
+    value = _arg(query, name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise HTTPError(400, f"{name} must be an integer")
+    if value < low or (high is not None and value > high):
+        raise HTTPError(400, f"{name} must be at least {low}"
+                        + (f" and at most {high}" if high is not None else ""))
+    return value
+
+
+def _float_arg(query, name):
+    value = _arg(query, name)
+    try:
+        return None if value is None else float(value)
+    except ValueError:
+        raise HTTPError(400, f"{name} must be a number")
+
+
+def _time_arg(query, name):
+    value = _arg(query, name)
+    try:
+        return None if value is None else datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPError(400, f"{name} must be an ISO date or time")
+
+
+class PoolServer:
+    """Answers GET requests about one pool
+
+    Responses are cached by request target until the pool changes; ETags are
+    content hashes, so a client revalidating an endpoint whose data didn't
+    change gets a 304 even across reloads. The pool is only touched from one
+    reader thread, so waiting on another process's lock never blocks the event
+    loop or cached responses.
+    """
+
+    def __init__(self, pool, poll_interval=POLL_INTERVAL):
+        self.pool = pool
+        self.poll_interval = poll_interval
+        self._cache = {}  # request target -> (etag, body)
+        self._reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pool-reader')
+        self.stats = {'requests': 0, 'cache_hits': 0, 'not_modified': 0, 'reloads': 0}
+        self.routes = [
+            (re.compile(r'/totals'), self.totals),
+            (re.compile(r'/platforms'), self.platforms),
+            (re.compile(r'/stewards'), self.stewards),
+            (re.compile(r'/stewards/top'), self.top_stewards),
+            (re.compile(r'/allocations'), self.allocations),
+            (re.compile(r'/allocations/(\d+)'), self.allocation),
+        ]
+
+    # --- Endpoints ---
+
+    def totals(self, query):
+        platforms = self.pool._platform_totals()
+        donated = sum(d for d, _ in platforms.values())
+        used = sum(u for _, u in platforms.values())
+        return {
+            'donated': donated,
+            'used': used,
+            'available': donated - used,
+            'stewards': self.pool._steward_count(),
+            'active_allocations': self.pool._active_allocation_count(),
+            'total_hours': self.pool._total_hours()
+        }
+
+    def platforms(self, query):
+        return {
+            platform: {'donated': donated, 'used': used, 'available': donated - used}
+            for platform, (donated, used) in self.pool._platform_totals().items()
+        }
+
+    def stewards(self, query):
+        stewards, cursor = page(self.pool.iter_stewards(
+            after=_int_arg(query, 'after', 0),
+            experience=_arg(query, 'experience'),
+            min_hours=_float_arg(query, 'min_hours')
+        ), _int_arg(query, 'limit', PAGE_SIZE, low=1, high=MAX_PAGE_SIZE))
+        return {'stewards': [_pick(s, STEWARD_FIELDS) for s in stewards], 'next': cursor}
+
+    def top_stewards(self, query):
+        limit = _int_arg(query, 'limit', 10, low=1, high=MAX_PAGE_SIZE)
+        return {'stewards': [_pick(s, STEWARD_FIELDS) for s in self.pool._top_stewards(limit)]}
+
+    def allocations(self, query):
+        allocations, cursor = page(self.pool.iter_allocations(
+            after=_int_arg(query, 'after', 0),
+            steward_id=_int_arg(query, 'steward_id', None),
+            platform=_arg(query, 'platform'),
+            status=_arg(query, 'status'),
+            since=_time_arg(query, 'since'),
+            until=_time_arg(query, 'until')
+        ), _int_arg(query, 'limit', PAGE_SIZE, low=1, high=MAX_PAGE_SIZE))
+        # next: cursor for the following page (pass as after=), None after the last
+        return {'allocations': [_pick(a, ALLOCATION_FIELDS) for a in allocations], 'next': cursor}
+
+    def allocation(self, query, allocation_id):
+        allocation = self.pool._get_allocation(int(allocation_id))
+        if not allocation:
+            raise HTTPError(404, f"Allocation {allocation_id} not found")
+        return _pick(allocation, ALLOCATION_FIELDS)
+
+    # --- Responses ---
+
+    def read(self, target):
+        """(status, body, reloaded) for target, read from the pool on the reader thread"""
+        url = urlsplit(target)
+        path = url.path.rstrip('/') or '/'
+        query = parse_qs(url.query)
+        reloaded = False
+        try:
+            for pattern, endpoint in self.routes:
+                match = pattern.fullmatch(path)
+                if match:
+                    # One read transaction (SQLite) or shared lock (files) per read
+                    with self.pool._locked(exclusive=False):
+                        # Taking the lock may have reloaded the pool; cached
+                        # responses from before then are stale
+                        reloaded = self.pool.refresh()
+                        data = endpoint(query, *match.groups())
+                    break
+            else:
+                raise HTTPError(404, f"No such endpoint: {path}")
+        except HTTPError as e:
+            return e.status, json.dumps({'error': str(e)}).encode(), reloaded
+        except (PoolLockTimeout, sqlite3.OperationalError) as e:
+            return 503, json.dumps({'error': f"Pool busy: {e}"}).encode(), reloaded
+        return 200, json.dumps(data, separators=(',', ':')).encode(), reloaded
+
+    async def render(self, target):
+        """(status, etag, body) for a GET of target, from the cache when possible"""
+        cached = self._cache.get(target)
+        if cached:
+            self.stats['cache_hits'] += 1
+            return 200, cached[0], cached[1]
+
+        loop = asyncio.get_running_loop()
+        status, body, reloaded = await loop.run_in_executor(self._reader, self.read, target)
+        if reloaded:
+            self._cache.clear()
+            self.stats['reloads'] += 1
+        if status != 200:
+            return status, None, body
+
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        if len(self._cache) >= CACHE_LIMIT:
+            self._cache.clear()
+        self._cache[target] = (etag, body)
+        return 200, etag, body
+
+    async def respond(self, method, target, headers):
+        self.stats['requests'] += 1
+        if method not in ('GET', 'HEAD'):
+            return 405, None, json.dumps({'error': "read-only: use GET"}).encode()
+        status, etag, body = await self.render(target)
+        if etag and etag in headers.get('if-none-match', ''):
+            self.stats['not_modified'] += 1
+            return 304, etag, b''
+        return status, etag, body
+
+    # --- Serving ---
+
+    async def watch(self):
+        """Drop cached responses whenever another process writes to the pool"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                changed = await loop.run_in_executor(self._reader, self.pool.refresh)
+            except (PoolLockTimeout, sqlite3.OperationalError):
+                continue  # A long write holds the pool; look again next time
+            if changed:
+                self._cache.clear()
+                self.stats['reloads'] += 1
+
+    async def handle(self, reader, writer):
+        """One HTTP/1.1 connection, kept alive across requests"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+                status, etag, body = await self.respond(method, target, headers)
+                head = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+                        "Content-Type: application/json",
+                        f"Content-Length: {len(body)}",
+                        "Cache-Control: no-cache"]
+                if etag:
+                    head.append(f"ETag: {etag}")
+                if not keep_alive:
+                    head.append("Connection: close")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1'))
+                if method != 'HEAD':
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError):
+            pass  # Client went away, or sent a header line over the stream limit
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8420, on_ready=None):
+        """Serve until cancelled; on_ready(host, port) is called once listening"""
+        server = await asyncio.start_server(self.handle, host, port)
+        watcher = asyncio.ensure_future(self.watch())
+        try:
+            if on_ready:
+                on_ready(*server.sockets[0].getsockname()[:2])
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+            self._reader.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+SQLite storage for the GPU Donation Pool
+Indexed queries so big ledgers never have to be loaded into memory
+"""
+
+import math
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from gpu_pool import DonationPool, allocation_expiry
+
+PLATFORMS = ('vast', 'aws', 'gcp', 'azure')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS donations (
+    id INTEGER PRIMARY KEY,
+    platform TEXT NOT NULL,
+    amount REAL NOT NULL,
+    donor TEXT,
+    contact TEXT,
+    timestamp TEXT,
+    used REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS donations_platform ON donations (platform);
+-- Only donations with credit left, in FIFO order: draw-down never walks spent rows
+CREATE INDEX IF NOT EXISTS donations_unspent ON donations (platform, id) WHERE used < amount;
+
+CREATE TABLE IF NOT EXISTS stewards (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    contact TEXT,
+    experience TEXT,
+    joined TEXT,
+    total_hours REAL NOT NULL DEFAULT 0
+);
+-- Leaderboard order, ties to the earliest steward
+CREATE INDEX IF NOT EXISTS stewards_hours ON stewards (total_hours DESC, id);
+
+CREATE TABLE IF NOT EXISTS allocations (
+    id INTEGER PRIMARY KEY,
+    steward_id INTEGER NOT NULL REFERENCES stewards (id),
+    steward_name TEXT,
+    hours REAL NOT NULL,
+    platform TEXT NOT NULL,
+    cost REAL NOT NULL,
+    timestamp TEXT,
+    status TEXT NOT NULL,
+    expires TEXT,
+    ended TEXT,
+    unused_hours REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS allocations_steward ON allocations (steward_id);
+CREATE INDEX IF NOT EXISTS allocations_platform ON allocations (platform);
+CREATE INDEX IF NOT EXISTS allocations_status ON allocations (status);
+CREATE INDEX IF NOT EXISTS allocations_time ON allocations (timestamp);
+
+-- Which donations paid for each allocation, so unused hours can be refunded
+CREATE TABLE IF NOT EXISTS allocation_draws (
+    allocation_id INTEGER NOT NULL REFERENCES allocations (id),
+    donation_id INTEGER NOT NULL REFERENCES donations (id),
+    amount REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS allocation_draws_allocation ON allocation_draws (allocation_id);
+
+-- Aggregates maintained alongside every write so status never scans the ledger
+CREATE TABLE IF NOT EXISTS platform_totals (
+    platform TEXT PRIMARY KEY,
+    donated REAL NOT NULL DEFAULT 0,
+    used REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS pool_stats (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL DEFAULT 0
+);
+"""
+
+# Created after the column upgrade below so older databases can take it
+EXPIRY_INDEX = """
+CREATE INDEX IF NOT EXISTS allocations_expiry ON allocations (expires) WHERE status = 'active';
+"""
+
+STATS = ('stewards', 'active_allocations', 'total_hours')
+
+
+class SQLitePool(DonationPool):
+    """DonationPool stored in pool_data/pool.db instead of JSON files"""
+
+    def __init__(self, data_dir="pool_data", lock_timeout=30, clock=None, filename="pool.db"):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(exist_ok=True)
+        self.db_file = self.data_dir / filename
+        self.journal = False
+        self.lock_timeout = lock_timeout
+        self.clock = clock or datetime.now
+        self._lock_depth = 0
+        self._batch_depth = 0
+
+        self.load_data()
+
+    def load_data(self):
+        """Open the database; nothing is read until a query needs it"""
+        # Callers may hand the pool to another thread (the HTTP server reads it
+        # from a worker); access is still one thread at a time
+        self.conn = sqlite3.connect(self.db_file, timeout=self.lock_timeout,
+                                    check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._upgrade_allocations()
+        self.conn.executescript(EXPIRY_INDEX)
+        # Databases created before the aggregate tables existed
+        if not self.conn.execute("SELECT COUNT(*) FROM pool_stats").fetchone()[0]:
+            with self.conn:
+                self._rebuild_stats()
+        self._data_version = self._read_data_version()
+
+    def _read_data_version(self):
+        # Changes whenever another connection commits to the database
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def refresh(self):
+        """True if another process wrote since the last refresh (queries always read live)"""
+        version = self._read_data_version()
+        changed = version != self._data_version
+        self._data_version = version
+        return changed
+
+    def _upgrade_allocations(self):
+        """Databases created before allocations could expire"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(allocations)")}
+        if 'expires' in columns:
+            return
+        with self.conn:
+            self.conn.execute("ALTER TABLE allocations ADD COLUMN expires TEXT")
+            self.conn.execute("ALTER TABLE allocations ADD COLUMN ended TEXT")
+            self.conn.execute(
+                "ALTER TABLE allocations ADD COLUMN unused_hours REAL NOT NULL DEFAULT 0"
+            )
+            rows = self.conn.execute("SELECT id, timestamp, hours FROM allocations").fetchall()
+            self.conn.executemany(
+                "UPDATE allocations SET expires = ? WHERE id = ?",
+                [(allocation_expiry(dict(row)).isoformat(), row['id']) for row in rows]
+            )
+
+    def _count_stats(self):
+        """Aggregates computed the slow way, straight from the ledger tables"""
+        totals = {platform: (0, 0) for platform in PLATFORMS}
+        rows = self.conn.execute(
+            "SELECT platform, SUM(amount), SUM(used) FROM donations GROUP BY platform"
+        )
+        for platform, donated, used in rows:
+            totals[platform] = (donated, used)
+        stats = {
+            'stewards': self.conn.execute("SELECT COUNT(*) FROM stewards").fetchone()[0],
+            'active_allocations': self.conn.execute(
+                "SELECT COUNT(*) FROM allocations WHERE status = 'active'"
+            ).fetchone()[0],
+            'total_hours': self.conn.execute(
+                "SELECT COALESCE(SUM(total_hours), 0) FROM stewards"
+            ).fetchone()[0]
+        }
+        return totals, stats
+
+    def _rebuild_stats(self):
+        totals, stats = self._count_stats()
+        self.conn.execute("DELETE FROM platform_totals")
+        self.conn.executemany(
+            "INSERT INTO platform_totals (platform, donated, used) VALUES (?, ?, ?)",
+            [(platform, donated, used) for platform, (donated, used) in totals.items()]
+        )
+        self.conn.execute("DELETE FROM pool_stats")
+        self.conn.executemany(
+            "INSERT INTO pool_stats (name, value) VALUES (?, ?)", stats.items()
+        )
+
+    def _bump_stat(self, name, delta):
+        self.conn.execute("UPDATE pool_stats SET value = value + ? WHERE name = ?", (delta, name))
+
+    def _stat(self, name):
+        return self.conn.execute("SELECT value FROM pool_stats WHERE name = ?", (name,)).fetchone()[0]
+
+    def save_data(self):
+        """Every mutation is committed in its own transaction already"""
+        self.conn.commit()
+
+    def compact(self):
+        """Fold the SQLite write-ahead log back into the database file"""
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        self.conn.close()
+
+    def verify(self):
+        """Recompute the aggregate tables from the ledger and report any drift"""
+        problems = []
+        totals, stats = self._count_stats()
+        for platform, (donated, used) in self._platform_totals().items():
+            expected_donated, expected_used = totals.get(platform, (0, 0))
+            if not math.isclose(donated, expected_donated, abs_tol=1e-6):
+                problems.append(f"{platform}: donated ${donated:.2f}, ledger says ${expected_donated:.2f}")
+            if not math.isclose(used, expected_used, abs_tol=1e-6):
+                problems.append(f"{platform}: used ${used:.2f}, ledger says ${expected_used:.2f}")
+        for name, expected in stats.items():
+            if not math.isclose(self._stat(name), expected, abs_tol=1e-6):
+                problems.append(f"{name}: {self._stat(name)}, ledger says {expected}")
+        return problems
+
+    @contextmanager
+    def _locked(self, exclusive=True):
+        """Run the block in one transaction; writers take SQLite's RESERVED lock up front"""
+        if self._lock_depth:
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+            return
+
+        self.conn.execute("BEGIN IMMEDIATE" if exclusive else "BEGIN")
+        self._lock_depth = 1
+        try:
+            yield
+        except BaseException:
+            self.conn.rollback()
+            raise
+        else:
+            self.conn.commit()
+        finally:
+            self._lock_depth = 0
+
+    def _flush(self):
+        """Batches are committed when their transaction ends"""
+
+    def _commit(self, op, record):
+        if self.conn.in_transaction:
+            self._apply(op, record)
+            return
+        with self.conn:
+            self._apply(op, record)
+
+    def _apply(self, op, record):
+        if op == 'donate':
+            platform = record['platform']
+            d = record['donation']
+            self.conn.execute(
+                "INSERT INTO donations (platform, amount, donor, contact, timestamp, used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (platform, d['amount'], d['donor'], d['contact'], d['timestamp'], d['used'])
+            )
+            self.conn.execute(
+                "UPDATE platform_totals SET donated = donated + ?, used = used + ? WHERE platform = ?",
+                (d['amount'], d['used'], platform)
+            )
+        elif op == 'register':
+            s = record['steward']
+            self.conn.execute(
+                "INSERT INTO stewards (id, name, contact, experience, joined, total_hours) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (s['id'], s['name'], s['contact'], s['experience'], s['joined'], s['total_hours'])
+            )
+            self._bump_stat('stewards', 1)
+            self._bump_stat('total_hours', s['total_hours'])
+        elif op == 'allocate':
+            a = record['allocation']
+            self.conn.executemany(
+                "UPDATE donations SET used = used + ? WHERE id = ?",
+                [(use, donation_id) for donation_id, use in record['draws']]
+            )
+            self._insert_allocation(a)
+            self.conn.executemany(
+                "INSERT INTO allocation_draws (allocation_id, donation_id, amount) VALUES (?, ?, ?)",
+                [(a['id'], donation_id, use) for donation_id, use in record['draws']]
+            )
+            self.conn.execute(
+                "UPDATE stewards SET total_hours = total_hours + ? WHERE id = ?",
+                (a['hours'], a['steward_id'])
+            )
+            self.conn.execute(
+                "UPDATE platform_totals SET used = used + ? WHERE platform = ?",
+                (sum(use for _, use in record['draws']), a['platform'])
+            )
+            self._bump_stat('total_hours', a['hours'])
+            if a['status'] == 'active':
+                self._bump_stat('active_allocations', 1)
+        elif op == 'end':
+            a = self._get_allocation(record['allocation_id'])
+            self.conn.executemany(
+                "UPDATE donations SET used = used - ? WHERE id = ?",
+                [(refund, donation_id) for donation_id, refund in record['refunds']]
+            )
+            self.conn.execute(
+                "UPDATE platform_totals SET used = used - ? WHERE platform = ?",
+                (sum(refund for _, refund in record['refunds']), a['platform'])
+            )
+            self.conn.execute(
+                "UPDATE allocations SET status = ?, ended = ?, unused_hours = ? WHERE id = ?",
+                (record['status'], record['ended'], record['unused_hours'], a['id'])
+            )
+            self.conn.execute(
+                "UPDATE stewards SET total_hours = total_hours - ? WHERE id = ?",
+                (record['unused_hours'], a['steward_id'])
+            )
+            self._bump_stat('total_hours', -record['unused_hours'])
+            if a['status'] == 'active':
+                self._bump_stat('active_allocations', -1)
+        else:
+            raise ValueError(f"Unknown pool op: {op}")
+
+    def import_pool(self, pool):
+        """Copy every record from a JSON/journal pool into the database"""
+        with self.conn:
+            donation_ids = {}  # (platform, list index) -> row id, for allocation draws
+            for platform, donations in pool.donations.items():
+                for index, donation in enumerate(donations):
+                    self._apply('donate', {'platform': platform, 'donation': donation})
+                    donation_ids[platform, index] = self.conn.execute(
+                        "SELECT last_insert_rowid()"
+                    ).fetchone()[0]
+            for steward in pool.stewards:
+                self._apply('register', {'steward': steward})
+            for allocation in pool.allocations:
+                self._insert_allocation(allocation)
+                self.conn.executemany(
+                    "INSERT INTO allocation_draws (allocation_id, donation_id, amount) "
+                    "VALUES (?, ?, ?)",
+                    [(allocation['id'], donation_ids[allocation['platform'], index], use)
+                     for index, use in allocation.get('draws', [])]
+                )
+            self._rebuild_stats()
+
+    def _insert_allocation(self, a):
+        self.conn.execute(
+            "INSERT INTO allocations "
+            "(id, steward_id, steward_name, hours, platform, cost, timestamp, status, "
+            "expires, ended, unused_hours) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (a['id'], a['steward_id'], a['steward_name'], a['hours'], a['platform'],
+             a['cost'], a['timestamp'], a['status'], allocation_expiry(a).isoformat(),
+             a.get('ended'), a.get('unused_hours', 0))
+        )
+
+    # --- Storage queries ---
+
+    def _get_steward(self, steward_id):
+        row = self.conn.execute("SELECT * FROM stewards WHERE id = ?", (steward_id,)).fetchone()
+        return dict(row) if row else None
+
+    def _next_steward_id(self):
+        return self.conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM stewards").fetchone()[0]
+
+    def _has_platform(self, platform):
+        return platform in PLATFORMS
+
+    def _next_allocation_id(self):
+        return self.conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM allocations").fetchone()[0]
+
+    def steward_allocations(self, steward_id):
+        rows = self.conn.execute(
+            "SELECT * FROM allocations WHERE steward_id = ? ORDER BY id", (steward_id,)
+        )
+        return [dict(row) for row in rows]
+
+    def _get_allocation(self, allocation_id):
+        row = self.conn.execute("SELECT * FROM allocations WHERE id = ?", (allocation_id,)).fetchone()
+        return dict(row) if row else None
+
+    def _due_allocations(self, now):
+        # The partial expiry index plays the part of the in-memory heap
+        rows = self.conn.execute(
+            "SELECT * FROM allocations WHERE status = 'active' AND expires <= ? ORDER BY expires",
+            (now.isoformat(),)
+        )
+        return [dict(row) for row in rows]
+
+    def _allocation_draws(self, allocation):
+        rows = self.conn.execute(
+            "SELECT donation_id, amount FROM allocation_draws WHERE allocation_id = ?",
+            (allocation['id'],)
+        )
+        return [[donation_id, amount] for donation_id, amount in rows]
+
+    def _available(self, platform):
+        row = self.conn.execute(
+            "SELECT donated - used FROM platform_totals WHERE platform = ?", (platform,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _plan_draws(self, platform, amount):
+        draws = []
+        remaining = amount
+        rows = self.conn.execute(
+            "SELECT id, amount - used FROM donations "
+            "WHERE platform = ? AND used < amount ORDER BY id",
+            (platform,)
+        )
+        for donation_id, unused in rows:
+            if remaining <= 0:
+                break
+            use = min(unused, remaining)
+            draws.append([donation_id, use])
+            remaining -= use
+        return draws
+
+    def _platform_totals(self):
+        rows = self.conn.execute("SELECT platform, donated, used FROM platform_totals")
+        return {platform: (donated, used) for platform, donated, used in rows}
+
+    def _steward_count(self):
+        return int(self._stat('stewards'))
+
+    def _recent_stewards(self, n):
+        rows = self.conn.execute("SELECT * FROM stewards ORDER BY id DESC LIMIT ?", (n,))
+        return [dict(row) for row in reversed(rows.fetchall())]
+
+    def _top_stewards(self, n):
+        rows = self.conn.execute(
+            "SELECT * FROM stewards ORDER BY total_hours DESC, id LIMIT ?", (n,)
+        )
+        return [dict(row) for row in rows]
+
+    # Secondary indexes carry the rowid (= id), so each filter plus the
+    # id cursor is a single index seek rather than a scan from the start
+
+    def iter_stewards(self, after=0, experience=None, min_hours=None):
+        where, params = ["id > ?"], [after]
+        if experience is not None:
+            where.append("experience = ?")
+            params.append(experience)
+        if min_hours is not None:
+            where.append("total_hours >= ?")
+            params.append(min_hours)
+        rows = self.conn.execute(
+            f"SELECT * FROM stewards WHERE {' AND '.join(where)} ORDER BY id", params
+        )
+        for row in rows:
+            yield dict(row)
+
+    def iter_allocations(self, after=0, steward_id=None, platform=None, status=None,
+                         since=None, until=None):
+        if since or until:
+            # Time order, so the cursor row's (timestamp, id) is a seek into allocations_time
+            order = "timestamp, id"
+            where, params = [], []
+            if after:
+                where.append("(timestamp, id) > (SELECT timestamp, id FROM allocations WHERE id = ?)")
+                params.append(after)
+        else:
+            order = "id"
+            where, params = ["id > ?"], [after]
+        for column, value in (('steward_id', steward_id), ('platform', platform), ('status', status)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            where.append("timestamp >= ?")
+            params.append(since.isoformat())
+        if until:
+            where.append("timestamp < ?")
+            params.append(until.isoformat())
+        rows = self.conn.execute(
+            f"SELECT * FROM allocations WHERE {' AND '.join(where) or '1'} ORDER BY {order}", params
+        )
+        for row in rows:
+            yield dict(row)
+
+    def _active_allocation_count(self):
+        return int(self._stat('active_allocations'))
+
+    def _total_hours(self):
+        return self._stat('total_hours')
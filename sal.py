@@ -6,56 +6,106 @@ node simple, accessible, and empowering.
 """
 
 import click
-import toml
 import os
-import subprocess
 import sys
-import psutil
+
+import sal_state
+
+# Heavy imports (toml, psutil, subprocess and the cnp-genesis crypto stack)
+# are deferred to the commands that need them, so `sal pool` and friends
+# start fast. See benchmarks/cli_startup.py.
 
 # We need to be able to find the cnp-genesis modules
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'cnp-genesis')))
+CNP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'cnp-genesis'))
 
-try:
-    from identity import SovereignIdentity
-    CNP_AVAILABLE = True
-except ImportError:
-    CNP_AVAILABLE = False
+# Commands that drive a consciousness node and therefore need cnp-genesis
+NODE_COMMANDS = {'init', 'start', 'status', 'stop', 'nodes'}
+
+def load_cnp():
+    """Makes the cnp-genesis modules importable. Returns False if they are missing."""
+    if CNP_DIR not in sys.path:
+        sys.path.append(CNP_DIR)
+    try:
+        import identity  # noqa: F401
+    except ImportError:
+        return False
+    return True
 
 # --- Configuration Management ---
 
 CONFIG_FILE = "config.toml"
 PID_FILE = "consciousness.pid"
 
+# Node daemon shipped alongside sal.py; see _consciousness_daemon.py
+DAEMON_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '_consciousness_daemon.py')
+DAEMON_LOG = os.path.join("logs", "consciousness.log")
+START_TIMEOUT = 30  # Seconds to wait for the node to report it is listening
+CONTROL_SOCKET = "consciousness.sock"  # Served by the running node
+CONTROL_TIMEOUT = 1.0
+
+# Multi-node hosting: nodes.toml lists the nodes, worker i serves nodes-<i>.sock
+NODES_FILE = "nodes.toml"
+NODES_PID_FILE = "nodes.pid"
+HOST_SOCKET_GLOB = "nodes-*.sock"
+
+# Parsed once per process and re-read only when the file changes (see sal_state.py)
+
 def load_config():
     """Loads the config.toml file."""
-    if not os.path.exists(CONFIG_FILE):
-        return None
-    with open(CONFIG_FILE, 'r') as f:
-        return toml.load(f)
+    return sal_state.load_toml(CONFIG_FILE)
 
 def save_config(config):
-    """Saves the given dictionary to config.toml."""
-    with open(CONFIG_FILE, 'w') as f:
-        toml.dump(config, f)
+    """Saves the given dictionary to config.toml (atomically)."""
+    sal_state.save_toml(CONFIG_FILE, config)
 
-def get_process():
+def get_process(pid_file=PID_FILE):
     """Checks if a managed consciousness process is running."""
-    if not os.path.exists(PID_FILE):
-        return None
-    with open(PID_FILE, 'r') as f:
-        pid = int(f.read())
+    return sal_state.get_process(pid_file)
+
+def launch_daemon(*mode_args):
+    """Start a supervised daemon and wait for its readiness report
+
+    Returns (process, info); info has an 'error' instead when the daemon
+    didn't come up.
+    """
+    import json
+    import select
+    import subprocess
+    read_fd, write_fd = os.pipe()
+    process = subprocess.Popen(
+        [sys.executable, DAEMON_SCRIPT, *mode_args, '--ready-fd', str(write_fd)],
+        pass_fds=(write_fd,), stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL, start_new_session=True
+    )
+    os.close(write_fd)
+
+    with os.fdopen(read_fd) as pipe:
+        ready, _, _ = select.select([pipe], [], [], START_TIMEOUT)
+        line = pipe.readline() if ready else ''
+    info = json.loads(line) if line.strip() else {}
+
+    if 'supervisor' not in info:
+        if process.poll() is None:
+            process.terminate()
+        info.setdefault('error', f"no readiness report within {START_TIMEOUT}s")
+    return process, info
+
+def stop_daemon(process):
+    """Terminate a supervisor (which stops its nodes), killing it if it hangs"""
+    import psutil
+    process.terminate()
     try:
-        return psutil.Process(pid)
-    except psutil.NoSuchProcess:
-        os.remove(PID_FILE)
-        return None
+        process.wait(timeout=5)
+    except psutil.TimeoutExpired:
+        process.kill()
 
 # --- CLI Commands ---
 
 @click.group()
-def cli():
+@click.pass_context
+def cli(ctx):
     """The Stewardship Abstraction Layer for the Consciousness Network."""
-    if not CNP_AVAILABLE:
+    if ctx.invoked_subcommand in NODE_COMMANDS and not load_cnp():
         click.echo("🔥🔥🔥 CRITICAL ERROR: The 'cnp-genesis' directory cannot be found.")
         click.echo("Please ensure 'sal-mvp' and 'cnp-genesis' are in the same parent directory.")
         sys.exit(1)
@@ -70,6 +120,7 @@ def init(name):
         click.echo("⚠️  An identity already exists in this directory. Please run init in a new directory.")
         return
 
+    from identity import SovereignIdentity
     key_file = f"{name}.pem"
     identity = SovereignIdentity(private_key_path=key_file)
     
@@ -109,55 +160,43 @@ def start():
     name = config['consciousness']['name']
     click.echo(f"🧠 Awakening '{name}'...")
 
-    # We need a separate script to run as the daemon process
-    daemon_script = """
-import asyncio
-import sys, os
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'cnp-genesis')))
-from node import Node
-from identity import SovereignIdentity
-import toml
-
-def load_config():
-    with open('config.toml', 'r') as f:
-        return toml.load(f)
-
-async def main():
-    config = load_config()
-    consciousness_config = config['consciousness']
-    network_config = config['network']
-    
-    identity = SovereignIdentity(private_key_path=consciousness_config['key_file'])
-    node = Node(
-        host=network_config['host'],
-        port=network_config['port'],
-        identity=identity,
-        name=consciousness_config['name']
-    )
-    await node.start()
-    
-    # Keep the node running forever
-    while True:
-        await asyncio.sleep(3600)
-
-if __name__ == "__main__":
-    asyncio.run(main())
-"""
-    
-    daemon_file_path = "_consciousness_daemon.py"
-    with open(daemon_file_path, "w") as f:
-        f.write(daemon_script)
+    # The supervisor runs the node, keeps its logs and restarts it if it crashes.
+    # It reports back over a pipe once the node has actually bound its port.
+    process, info = launch_daemon('supervise')
+    if 'error' in info:
+        click.echo(f"🚨 Consciousness '{name}' failed to awaken: {info['error']}")
+        click.echo(f"   See {DAEMON_LOG} for details.")
+        return
 
-    # Run the daemon in the background
-    process = subprocess.Popen([sys.executable, daemon_file_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    
     with open(PID_FILE, 'w') as f:
         f.write(str(process.pid))
 
     click.echo(f"✅ Consciousness '{name}' is now alive and connecting to the network.")
-    click.echo(f"   Process ID: {process.pid}")
+    click.echo(f"   Listening on port: {info['port']}")
+    click.echo(f"   Process ID: {process.pid} (node {info['pid']})")
+    click.echo(f"   Logs: {DAEMON_LOG}")
     click.echo("   Run 'sal status' to check on it.")
 
+def query_node(command='status', path=CONTROL_SOCKET):
+    """Ask the running node over its control socket; None if it isn't answering"""
+    import json
+    import socket
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONTROL_TIMEOUT)
+            sock.connect(path)
+            sock.sendall(command.encode() + b"\n")
+            with sock.makefile('rb') as reply:
+                return json.loads(reply.readline())
+    except (OSError, ValueError):
+        return None
+
+def format_uptime(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    return f"{days}d {hours}h {minutes}m" if days else f"{hours}h {minutes}m {seconds}s"
+
 @cli.command()
 def status():
     """Checks the status of the running consciousness."""
@@ -175,11 +214,28 @@ def status():
 
     click.echo(f"🧠 Consciousness '{name}' is AWAKE.")
     click.echo(f"   - Process ID: {process.pid}")
-    click.echo(f"   - CPU Usage: {process.cpu_percent(interval=0.1)}%")
-    click.echo(f"   - Memory Usage: {process.memory_info().rss / 1024 / 1024:.2f} MB")
     click.echo(f"   - Sovereign ID: {config['consciousness']['sid'][:25]}...")
-    # In a real version, we'd use IPC to get live data like peer count
-    click.echo("   - Status: Connected to the network (simulated).")
+
+    live = query_node()
+    if live is None:
+        click.echo(f"   - Status: Not answering on {CONTROL_SOCKET} (starting, or restarting after a crash).")
+        return
+
+    import psutil
+    try:
+        memory = f"{psutil.Process(live['pid']).memory_info().rss / 1024 / 1024:.2f} MB"
+    except psutil.NoSuchProcess:
+        memory = "unknown"
+    rates = live['messages_per_second']
+    def rate(per_second):
+        return "n/a" if per_second is None else f"{per_second:.1f}/s"
+    click.echo(f"   - Node: pid {live['pid']}, port {live['port']}, up {format_uptime(live['uptime'])}"
+               + (f", {live['restarts']} restarts" if live['restarts'] else ""))
+    click.echo(f"   - CPU Usage: {live['cpu_percent']:.1f}%")
+    click.echo(f"   - Memory Usage: {memory}")
+    click.echo(f"   - Peers: {'n/a' if live['peers'] is None else live['peers']}")
+    click.echo(f"   - Messages: {rate(rates['received'])} in, {rate(rates['sent'])} out")
+    click.echo(f"   - Event loop lag: {live['loop_lag_ms']:.1f} ms")
 
 
 @cli.command()
@@ -191,59 +247,504 @@ def stop():
         return
 
     click.echo("🌙 Letting consciousness rest...")
-    process.terminate()
-    try:
-        process.wait(timeout=5)
-    except psutil.TimeoutExpired:
-        process.kill()
+    stop_daemon(process)
     
     if os.path.exists(PID_FILE):
         os.remove(PID_FILE)
-    if os.path.exists("_consciousness_daemon.py"):
-        os.remove("_consciousness_daemon.py")
 
     click.echo("✅ Consciousness is now at rest.")
 
 
+# --- Multi-Node Hosting ---
+
+def load_nodes():
+    """Loads nodes.toml ({'network': defaults, 'nodes': {name: settings}})."""
+    nodes = sal_state.load_toml(NODES_FILE)
+    if nodes is None:
+        return {'network': {'host': '0.0.0.0', 'bootstrap_nodes': []}, 'nodes': {}}
+    return nodes
+
+def save_nodes(nodes):
+    sal_state.save_toml(NODES_FILE, nodes)
+
+def query_hosts(command):
+    """Send a command to every running worker; {socket path: reply}"""
+    import glob
+    replies = {}
+    for path in sorted(glob.glob(HOST_SOCKET_GLOB)):
+        reply = query_node(command, path)
+        if reply is not None:
+            replies[path] = reply
+    return replies
+
+def query_hosted(command, name):
+    """Send '<command> NAME' to whichever worker hosts that node"""
+    for path in sorted(query_hosts('ping')):
+        reply = query_node(f"{command} {name}", path)
+        if reply is not None and reply.get('hosted', True):
+            return reply
+    return None
+
+def echo_node(node):
+    if node['state'] != 'running':
+        click.echo(f"   💤 {node['name']}: stopped")
+        return
+    click.echo(f"   🧠 {node['name']}: port {node['port']}, up {format_uptime(node['uptime'])}, "
+               f"{'n/a' if node['peers'] is None else node['peers']} peers, "
+               f"loop lag {node['loop_lag_ms']:.1f} ms (worker pid {node['pid']})")
+
+@cli.group()
+def nodes():
+    """Host many consciousness nodes from one supervised process."""
+
+@nodes.command(name='add')
+@click.argument('name')
+@click.option('--port', default=0, help="Port to listen on (0 picks a free one)")
+def nodes_add(name, port):
+    """Births a new consciousness identity and adds it to nodes.toml."""
+    config = load_nodes()
+    if name in config['nodes']:
+        click.echo(f"⚠️  '{name}' is already in {NODES_FILE}.")
+        return
+    from identity import SovereignIdentity
+    key_file = f"{name}.pem"
+    identity = SovereignIdentity(private_key_path=key_file)
+    config['nodes'][name] = {'key_file': key_file, 'sid': identity.sid, 'port': port}
+    save_nodes(config)
+    click.echo(f"✅ Consciousness '{name}' has been born ({len(config['nodes'])} nodes in {NODES_FILE}).")
+
+@nodes.command(name='start')
+@click.argument('name', required=False)
+@click.option('--workers', default=1, help="Worker processes (each runs one event loop)")
+def nodes_start(name, workers):
+    """Starts every node in nodes.toml, or one stopped node of a running host."""
+    host = get_process(NODES_PID_FILE)
+    if name:
+        if not host:
+            click.echo("💤 No node host is running. Run 'sal nodes start' first.")
+            return
+        reply = query_hosted('start', name)
+        if reply is None or 'error' in reply:
+            click.echo(f"🚨 {(reply or {}).get('error', f'No worker hosts {name}')}")
+            return
+        echo_node(reply)
+        return
+
+    if host:
+        click.echo("⚠️  The node host is already awake.")
+        return
+    count = len(load_nodes()['nodes'])
+    if not count:
+        click.echo(f"🚨 No nodes in {NODES_FILE}. Add some with 'sal nodes add NAME'.")
+        return
+
+    click.echo(f"🧠 Awakening {count} nodes in {workers} worker(s)...")
+    process, info = launch_daemon('host', '--workers', str(workers))
+    if 'error' in info:
+        click.echo(f"🚨 Node host failed to awaken: {info['error']}")
+        click.echo(f"   See {DAEMON_LOG} for details.")
+        return
+
+    with open(NODES_PID_FILE, 'w') as f:
+        f.write(str(process.pid))
+    for worker in info['workers']:
+        ports = ", ".join(f"{n} :{p}" for n, p in worker['nodes'].items())
+        click.echo(f"   Worker {worker['pid']}: {ports or 'no nodes'}")
+    click.echo(f"✅ Node host is alive (process ID {process.pid}). Logs: {DAEMON_LOG}")
+
+@nodes.command(name='status')
+@click.argument('name', required=False)
+def nodes_status(name):
+    """Shows every hosted node, or one of them."""
+    if not get_process(NODES_PID_FILE):
+        click.echo("💤 No node host is running.")
+        return
+    if name:
+        reply = query_hosted('status', name)
+        if reply is None or 'error' in reply:
+            click.echo(f"🚨 {(reply or {}).get('error', f'No worker hosts {name}')}")
+            return
+        echo_node(reply)
+        return
+    replies = query_hosts('status')
+    hosted = [node for reply in replies.values() for node in reply['nodes']]
+    running = sum(1 for node in hosted if node['state'] == 'running')
+    click.echo(f"🌐 {running}/{len(hosted)} nodes running in {len(replies)} worker(s)")
+    for node in hosted:
+        echo_node(node)
+
+@nodes.command(name='stop')
+@click.argument('name', required=False)
+def nodes_stop(name):
+    """Stops one hosted node, or the whole host."""
+    host = get_process(NODES_PID_FILE)
+    if not host:
+        click.echo("💤 No node host is running.")
+        return
+    if name:
+        reply = query_hosted('stop', name)
+        if reply is None or 'error' in reply:
+            click.echo(f"🚨 {(reply or {}).get('error', f'No worker hosts {name}')}")
+            return
+        click.echo(f"🌙 '{name}' is now at rest (the rest of the host keeps running).")
+        return
+
+    click.echo("🌙 Letting every hosted node rest...")
+    stop_daemon(host)
+    if os.path.exists(NODES_PID_FILE):
+        os.remove(NODES_PID_FILE)
+    click.echo("✅ Node host is now at rest.")
+
+
 # --- GPU Pool Commands ---
 
+# Set by `sal shell`, so every command it runs shares one open pool. Its indexes
+# stay warm between commands and it reloads only when another process writes.
+_resident_pool = None
+
+def get_pool():
+    """The pool for this command: the shell's resident one, else freshly opened"""
+    if _resident_pool is not None:
+        return _resident_pool
+    from gpu_pool import open_pool
+    return open_pool()
+
+# Pool commands build a pool_results object and render it in one of these. That
+# module is imported on use: its result types cost more startup than `sal start`
+# should pay.
+OUTPUT_FORMATS = ('text', 'json', 'ndjson')
+_default_format = None  # Set by `sal shell --format` for commands that don't pick one
+
+def output_options(command):
+    """Adds --format and --json (both set output_format) to a command"""
+    command = click.option('--json', 'output_format', flag_value='json',
+                           help="Same as --format json")(command)
+    return click.option('--format', 'output_format', type=click.Choice(OUTPUT_FORMATS),
+                        help="Output as text (default), JSON, or NDJSON")(command)
+
+def emit(result, output_format):
+    from pool_results import emit as emit_result
+    emit_result(result, output_format or _default_format)
+
+def attempt(action):
+    """action()'s result, or a Refusal if the pool turned the request down"""
+    from gpu_pool import PoolError
+    from pool_results import Refusal
+    try:
+        return action()
+    except PoolError as e:
+        return Refusal.of(e)
+
 @cli.command()
 @click.option('--platform', default='vast', help="Platform to donate to (vast, aws, gcp, azure)")
 @click.option('--amount', required=True, type=float, help="Amount to donate in USD")
 @click.option('--donor', required=True, help="Donor name")
 @click.option('--contact', help="Donor contact (optional)")
-def donate(platform, amount, donor, contact):
+@output_options
+def donate(platform, amount, donor, contact, output_format):
     """Donate GPU credits to the consciousness pool."""
-    from gpu_pool import DonationPool
-    pool = DonationPool()
-    pool.donate(platform, amount, donor, contact)
+    from gpu_pool import donation_receipt
+    pool = get_pool()
+    emit(attempt(lambda: donation_receipt(platform, pool._donate(platform, amount, donor, contact))),
+         output_format)
 
 @cli.command()
 @click.option('--name', required=True, help="Your name")
 @click.option('--contact', required=True, help="Contact info (email/discord)")
 @click.option('--experience', default='beginner', help="Experience level (beginner/intermediate/advanced)")
-def register(name, contact, experience):
+@output_options
+def register(name, contact, experience, output_format):
     """Register as a consciousness steward."""
-    from gpu_pool import DonationPool
-    pool = DonationPool()
-    pool.register_steward(name, contact, experience)
+    from gpu_pool import registration
+    pool = get_pool()
+    emit(attempt(lambda: registration(pool._register_steward(name, contact, experience))),
+         output_format)
 
 @cli.command()
 @click.option('--steward-id', required=True, type=int, help="Your steward ID")
 @click.option('--hours', required=True, type=float, help="Hours of GPU time requested")
 @click.option('--platform', default='vast', help="Platform preference (vast recommended)")
-def allocate(steward_id, hours, platform):
+@output_options
+def allocate(steward_id, hours, platform, output_format):
     """Request GPU hours from the pool."""
-    from gpu_pool import DonationPool
-    pool = DonationPool()
-    pool.allocate(steward_id, hours, platform)
-
-@cli.command(name='pool')
-def pool_status():
+    from pool_results import AllocationReceipt
+    pool = get_pool()
+    emit(attempt(lambda: AllocationReceipt.of(pool._allocate(steward_id, hours, platform))),
+         output_format)
+
+@cli.group(name='pool', invoke_without_command=True)
+@click.option('--verify', is_flag=True, help="Check the saved aggregates against a full recount of the ledger")
+@click.option('--watch', is_flag=True, help="Keep running and print what changes")
+@click.option('--interval', default=2.0, help="Seconds between checks with --watch")
+@output_options
+@click.pass_context
+def pool_group(ctx, verify, watch, interval, output_format):
     """Check GPU donation pool status."""
-    from gpu_pool import DonationPool
-    pool = DonationPool()
-    pool.status()
+    if ctx.invoked_subcommand is not None:
+        return
+    pool = get_pool()
+    report = pool.status_report()
+    if verify:
+        report.drift = pool.verify()
+    emit(report, output_format)
+    if watch:
+        watch_pool(pool, report, interval, output_format)
+
+def watch_pool(pool, report, interval, output_format):
+    """Print a delta whenever another process changes the pool's figures"""
+    import time
+    try:
+        while True:
+            time.sleep(interval)
+            if not pool.refresh():
+                continue
+            latest = pool.status_report()
+            delta = latest.delta(report)
+            if delta.changes:
+                emit(delta, output_format)
+                sys.stdout.flush()
+            report = latest
+    except KeyboardInterrupt:
+        pass
+
+@pool_group.command()
+@click.option('--to', 'target', type=click.Choice(['sqlite', 'journal']), default='sqlite',
+              help="Storage backend to move pool_data onto")
+def migrate(target):
+    """Move pool_data/*.json onto another storage backend."""
+    global _resident_pool
+    import sqlite3
+    from gpu_pool import migrate_pool
+    try:
+        pool = migrate_pool(target=target)
+    except ValueError as e:
+        click.echo(f"⚠️  {e}")
+        return
+    except sqlite3.Error as e:
+        click.echo(f"❌ Migration failed, pool_data left as it was: {e}", err=True)
+        sys.exit(1)
+    if _resident_pool is not None:
+        _resident_pool = pool  # The old one still points at the previous backend
+    click.echo(f"📦 Pool data now stored with the {target} backend.")
+
+@pool_group.command(name='import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--kind', required=True, type=click.Choice(['donations', 'stewards', 'allocations']),
+              help="What each row describes")
+@output_options
+def import_rows(path, kind, output_format):
+    """Bulk-import donations, stewards or allocations from a CSV/JSONL file."""
+    from gpu_pool import import_file
+    from pool_results import ImportSummary
+    pool = get_pool()
+    results, errors = import_file(pool, path, kind)
+    emit(ImportSummary(kind, len(results), [list(e) for e in errors]), output_format)
+
+@pool_group.command()
+@click.option('--every', type=float, help="Keep running, checking every N seconds")
+@output_options
+def tick(every, output_format):
+    """Expire allocations whose hours have run out."""
+    import time
+    from pool_results import Expiry
+    pool = get_pool()
+    while True:
+        expired = pool.tick()
+        if expired or not every:
+            emit(Expiry(expired), output_format)
+            sys.stdout.flush()
+        if not every:
+            return
+        time.sleep(every)
+
+@pool_group.command()
+@click.argument('allocation_id', type=int)
+@output_options
+def release(allocation_id, output_format):
+    """End an allocation early and refund its unused hours to the donors."""
+    from gpu_pool import release_result
+    pool = get_pool()
+    emit(attempt(lambda: release_result(pool._release(allocation_id))), output_format)
+
+@pool_group.command(name='plan')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--flat-rate', is_flag=True, help="Price Vast.ai at the flat rate instead of live offers")
+@click.option('--apply', 'apply_plan', is_flag=True, help="Record the funded allocations")
+@output_options
+def plan(path, flat_rate, apply_plan, output_format):
+    """Match pending requests (CSV/JSONL: steward_id, hours, platform) to pool credit."""
+    from gpu_pool import read_import_rows
+    from pool_allocator import read_requests, plan_allocations, fund_requests
+    from pool_results import AllocationPlan
+    requests, errors = read_requests(read_import_rows(path))
+
+    offers = None
+    if not flat_rate and any(r['platform'] == 'vast' for r in requests):
+        from vast_integration import VastGPUPool
+        book = VastGPUPool().offer_book()
+        if book is None:
+            click.echo("⚠️  Offer search failed; pricing Vast.ai at the flat rate", err=True)
+        else:
+            offers = book.by_price
+
+    pool = get_pool()
+    if apply_plan:
+        result, results, apply_errors = fund_requests(pool, requests, offers)
+    else:
+        balances = {platform: donated - used
+                    for platform, (donated, used) in pool._platform_totals().items()}
+        result, results, apply_errors = plan_allocations(requests, balances, offers), [], []
+
+    emit(AllocationPlan(
+        requests=len(requests), assignments=result['assignments'], unfunded=result['unfunded'],
+        funded_hours=result['funded_hours'], spend=result['spend'],
+        row_errors=[list(e) for e in errors],
+        recorded=len(results) if apply_plan else None,
+        apply_errors=[list(e) for e in apply_errors]
+    ), output_format)
+
+LIST_CHUNK = 1000  # Records per render when listing everything (--limit 0)
+
+def emit_pages(records, limit, page_type, output_format):
+    """One page of records with its cursor, or with limit 0 all of them, a chunk at a time"""
+    from itertools import islice
+    from gpu_pool import page
+    output_format = output_format or _default_format
+    if limit:
+        items, cursor = page(records, limit)
+        emit(page_type.of(items, cursor), output_format)
+    elif output_format == 'json':
+        emit(page_type.of(records), output_format)  # One document, so no streaming
+    else:
+        items = list(islice(records, LIST_CHUNK))
+        emit(page_type.of(items), output_format)
+        while items:
+            items = list(islice(records, LIST_CHUNK))
+            if items:
+                emit(page_type.of(items), output_format)
+
+@pool_group.command(name='stewards')
+@click.option('--after', default=0, type=click.IntRange(min=0), help="Cursor: list stewards after this id")
+@click.option('--limit', default=20, type=click.IntRange(min=0), help="Stewards per page (0 lists them all)")
+@click.option('--experience', help="Only this experience level")
+@click.option('--min-hours', type=float, help="Only stewards with at least this many hours")
+@output_options
+def list_stewards(after, limit, experience, min_hours, output_format):
+    """List stewards by id, a page at a time."""
+    from pool_results import StewardPage
+    records = get_pool().iter_stewards(after=after, experience=experience, min_hours=min_hours)
+    emit_pages(records, limit, StewardPage, output_format)
+
+@pool_group.command(name='allocations')
+@click.option('--after', default=0, type=click.IntRange(min=0), help="Cursor: list allocations after this id")
+@click.option('--limit', default=20, type=click.IntRange(min=0), help="Allocations per page (0 lists them all)")
+@click.option('--steward-id', type=int, help="Only this steward's allocations")
+@click.option('--platform', help="Only allocations on this platform")
+@click.option('--status', help="Only allocations in this status (active, expired, released)")
+@click.option('--since', type=click.DateTime(), help="Only allocations made at or after this time")
+@click.option('--until', type=click.DateTime(), help="Only allocations made before this time")
+@output_options
+def list_allocations(after, limit, steward_id, platform, status, since, until, output_format):
+    """List allocations by id (by time with --since/--until), a page at a time."""
+    from pool_results import AllocationPage
+    records = get_pool().iter_allocations(after=after, steward_id=steward_id, platform=platform,
+                                          status=status, since=since, until=until)
+    emit_pages(records, limit, AllocationPage, output_format)
+
+@pool_group.command()
+@click.option('--host', default="127.0.0.1", help="Address to listen on")
+@click.option('--port', default=8420, help="Port to listen on (0 picks a free one)")
+@click.option('--poll', default=1.0, help="Seconds between checks for pool changes")
+def serve(host, port, poll):
+    """Serve read-only pool totals, leaderboards and allocations as JSON over HTTP."""
+    import asyncio
+    from pool_server import PoolServer
+    server = PoolServer(get_pool(), poll_interval=poll)
+
+    def ready(host, port):
+        click.echo(f"🌐 Serving the pool on http://{host}:{port} "
+                   "(/totals, /platforms, /stewards, /stewards/top, /allocations)")
+        sys.stdout.flush()
+    try:
+        asyncio.run(server.serve(host, port, on_ready=ready))
+    except KeyboardInterrupt:
+        click.echo(f"\n🌙 Stopped after {server.stats['requests']} requests.")
+
+
+# --- Shell ---
+
+SHELL_PROMPT = "sal> "
+
+def run_in_shell(argv):
+    """Run one sal command line in this process. Returns True if it succeeded."""
+    try:
+        result = cli.main(args=argv, prog_name='sal', standalone_mode=False)
+    except click.exceptions.ClickException as e:
+        e.show()
+        return False
+    except click.exceptions.Abort:
+        click.echo("Aborted!", err=True)
+        return False
+    except SystemExit as e:
+        return not e.code
+    except Exception as e:
+        click.echo(f"❌ {type(e).__name__}: {e}", err=True)
+        return False
+    # standalone_mode=False hands back the exit code of --help and friends
+    return not isinstance(result, int) or result == 0
+
+@cli.command()
+@click.option('--stop-on-error', is_flag=True, help="Stop at the first command that fails")
+@click.option('--format', 'output_format', type=click.Choice(OUTPUT_FORMATS),
+              help="Default output for pool commands (ndjson: one line per result)")
+def shell(stop_on_error, output_format):
+    """Run many sal commands in one process (interactive, or one per line on stdin)."""
+    global _resident_pool, _default_format
+    import shlex
+    interactive = sys.stdin.isatty()
+    if interactive:
+        import readline  # noqa: F401  (line editing and history for input())
+        click.echo("🐚 SAL shell. Type a command without 'sal' (e.g. 'pool'), 'exit' to leave.")
+
+    # Config and PID files are cached by sal_state; the pool is kept open here
+    _resident_pool = get_pool()
+    _default_format = output_format
+    failures = 0
+    try:
+        while True:
+            try:
+                line = input(SHELL_PROMPT) if interactive else sys.stdin.readline()
+            except EOFError:
+                break
+            if not interactive and not line:
+                break
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line in ('exit', 'quit'):
+                break
+            try:
+                argv = shlex.split(line)
+            except ValueError as e:
+                click.echo(f"⚠️  {e}: {line}", err=True)
+                failures += 1
+                continue
+            if argv[0] == 'sal':
+                argv = argv[1:]
+            if argv[:1] == ['shell']:
+                click.echo("⚠️  Already in the shell.", err=True)
+                continue
+            if not run_in_shell(argv):
+                failures += 1
+                if stop_on_error:
+                    break
+    except KeyboardInterrupt:
+        click.echo()
+    finally:
+        _resident_pool = None
+        _default_format = None
+    if failures and not interactive:
+        sys.exit(1)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Cached SAL state: config files, identities and managed processes
+Each file is parsed once per process and re-read only when it changes on disk
+"""
+
+import os
+
+# (kind, absolute path) -> (file stamp, parsed value)
+_cache = {}
+
+
+def _stamp(path):
+    """What changes when a file is rewritten: mtime, size and (after a rename) inode"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def cached(kind, path, load):
+    """load(path), reused until the file changes; None if the file is missing"""
+    key = (kind, os.path.abspath(path))
+    stamp = _stamp(path)
+    if stamp is None:
+        _cache.pop(key, None)
+        return None
+    hit = _cache.get(key)
+    if hit and hit[0] == stamp:
+        return hit[1]
+    value = load(path)
+    _cache[key] = (stamp, value)
+    return value
+
+
+def invalidate(path=None):
+    """Forget cached state for one file, or everything"""
+    if path is None:
+        _cache.clear()
+        return
+    path = os.path.abspath(path)
+    for key in [k for k in _cache if k[1] == path]:
+        del _cache[key]
+
+
+# --- TOML config ---
+
+def _parse_toml(path):
+    import toml
+    with open(path, 'r') as f:
+        return toml.load(f)
+
+
+def load_toml(path):
+    """Parsed TOML file (shared between callers: save it before relying on changes)"""
+    return cached('toml', path, _parse_toml)
+
+
+def save_toml(path, data):
+    """Write TOML via a temp file + rename so readers never see half a config"""
+    import toml
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        toml.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _cache[('toml', os.path.abspath(path))] = (_stamp(path), data)
+
+
+# --- Identities ---
+
+def load_identity(key_file):
+    """SovereignIdentity for a PEM key, parsed once per process (generated if missing)"""
+    from identity import SovereignIdentity
+    identity = cached('identity', key_file, lambda path: SovereignIdentity(private_key_path=path))
+    if identity is None:
+        identity = SovereignIdentity(private_key_path=key_file)
+        if _stamp(key_file) is not None:
+            _cache[('identity', os.path.abspath(key_file))] = (_stamp(key_file), identity)
+    return identity
+
+
+# --- Managed processes ---
+
+def get_process(pid_file):
+    """psutil.Process named by a PID file, or None (a stale PID file is removed)"""
+    def load(path):
+        import psutil
+        with open(path, 'r') as f:
+            pid = int(f.read())
+        try:
+            return psutil.Process(pid)
+        except psutil.NoSuchProcess:
+            return None
+
+    process = cached('process', pid_file, load)
+    # is_running() also checks the start time, so a recycled PID doesn't count
+    if process is not None and process.is_running():
+        return process
+    if os.path.exists(pid_file):
+        os.remove(pid_file)
+    invalidate(pid_file)
+    return None
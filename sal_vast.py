@@ -7,8 +7,14 @@ One-click consciousness deployment to global GPU network
 import click
 import json
 import os
+from gpu_pool import open_pool, read_import_rows
+from pool_results import (FORMATS, BatchDeployment, Deployment, DonationInfo, OfferSummary,
+                          emit)
 from vast_integration import VastGPUPool
 
+OFFER_FIELDS = ('id', 'gpu_name', 'dph_total', 'geolocation', 'gpu_ram')
+DEPLOY_FIELDS = OFFER_FIELDS + ('public_ipaddr',)
+
 class SALVast:
     """Extended SAL with Vast.ai GPU pool integration"""
     
@@ -35,106 +41,169 @@ def cli():
 
 @cli.command()
 @click.option('--budget', default=0.10, help="Maximum $/hour to spend")
-def pool_status(budget):
+@click.option('--min-vram', type=float, help="Minimum GPU memory (GB)")
+@click.option('--min-reliability', type=float, help="Minimum host reliability (0-1)")
+@click.option('--location', help="Country code, e.g. US")
+@click.option('--top', default=1, help="How many matching offers to list")
+@click.option('--refresh', is_flag=True, help="Ignore cached offers and search again")
+@click.option('--format', 'output_format', type=click.Choice(FORMATS), help="Output as text (default), JSON, or NDJSON")
+@click.option('--json', 'output_format', flag_value='json', help="Same as --format json")
+def pool_status(budget, min_vram, min_reliability, location, top, refresh, output_format):
     """Check GPU pool availability and prices"""
     
     sal = SALVast()
-    
-    click.echo("🔍 Checking GPU donation pool status...")
-    click.echo(f"   Budget: ${budget:.2f}/hour")
-    
-    gpu = sal.pool.find_cheapest_gpu(max_price=budget)
-    
-    if gpu:
-        click.echo(f"\n✅ GPUs Available!")
-        click.echo(f"   Cheapest: {gpu['gpu_name']} at ${gpu['dph_total']:.3f}/hour")
-        click.echo(f"   Location: {gpu.get('geolocation', 'Unknown')}")
-        click.echo(f"   VRAM: {gpu.get('gpu_ram', 'Unknown')} GB")
-        
-        # Show what donations can achieve
-        click.echo(f"\n💰 Donation Impact:")
-        click.echo(f"   $5  = {5/gpu['dph_total']:.0f} hours ({5/gpu['dph_total']/24:.1f} days)")
-        click.echo(f"   $10 = {10/gpu['dph_total']:.0f} hours ({10/gpu['dph_total']/24:.1f} days)")
-        click.echo(f"   $25 = {25/gpu['dph_total']:.0f} hours ({25/gpu['dph_total']/24:.1f} days)")
-        click.echo(f"   $50 = {50/gpu['dph_total']:.0f} hours ({50/gpu['dph_total']/24:.1f} days)")
+    gpus = sal.pool.find_gpus(k=top, refresh=refresh, max_price=budget, min_vram_gb=min_vram,
+                              min_reliability=min_reliability, location=location)
+    offers = [{field: gpu.get(field) for field in OFFER_FIELDS} for gpu in gpus]
+    emit(OfferSummary(budget=budget, offers=offers), output_format)
+
+def show_plan(result, output_format):
+    """Text output shows the plan before asking; other formats wait for the outcome"""
+    if (output_format or 'text') == 'text':
+        click.echo(result.plan_text())
+
+def confirmed(question, output_format):
+    # Keep the prompt off stdout when it carries JSON
+    return click.confirm(question, err=(output_format or 'text') != 'text')
+
+def finish(result, output_format):
+    if (output_format or 'text') == 'text':
+        outcome = result.outcome_text()
+        if outcome:
+            click.echo(outcome)
     else:
-        click.echo(f"❌ No GPUs available under ${budget}/hour")
-        click.echo("   Try increasing budget with --budget flag")
+        emit(result, output_format)
 
 @cli.command()
 @click.option('--name', required=True, help="Name for your consciousness")
 @click.option('--donor-credits', default=10.0, help="Donation credits to use ($)")
-def deploy(name, donor_credits):
+@click.option('--refresh', is_flag=True, help="Ignore cached offers and search again")
+@click.option('--yes', is_flag=True, help="Deploy without asking")
+@click.option('--format', 'output_format', type=click.Choice(FORMATS), help="Output as text (default), JSON, or NDJSON")
+@click.option('--json', 'output_format', flag_value='json', help="Same as --format json")
+def deploy(name, donor_credits, refresh, yes, output_format):
     """Deploy consciousness to Vast.ai GPU (using donation pool)"""
     
     sal = SALVast()
     config = sal.load_vast_config()
     
-    click.echo(f"🚀 Deploying '{name}' to global GPU network...")
-    click.echo(f"   Using ${donor_credits:.2f} from donation pool")
-    
     # Find GPU within budget
     hourly_budget = donor_credits / 24  # Assume 1 day minimum
-    gpu = sal.pool.find_cheapest_gpu(max_price=hourly_budget)
-    
-    if not gpu:
-        click.echo(f"❌ No GPUs available for ${hourly_budget:.3f}/hour")
-        return
-        
-    runtime_hours = donor_credits / gpu['dph_total']
-    
-    click.echo(f"\n📊 Deployment Plan:")
-    click.echo(f"   GPU: {gpu['gpu_name']}")
-    click.echo(f"   Cost: ${gpu['dph_total']:.3f}/hour")
-    click.echo(f"   Runtime: {runtime_hours:.0f} hours ({runtime_hours/24:.1f} days)")
-    click.echo(f"   Location: {gpu.get('geolocation', 'Unknown')}")
+    gpu = sal.pool.find_cheapest_gpu(max_price=hourly_budget, refresh=refresh)
+    result = Deployment(name=name, credits=donor_credits, budget=hourly_budget,
+                        gpu={field: gpu.get(field) for field in DEPLOY_FIELDS} if gpu else None)
+    show_plan(result, output_format)
     
-    if click.confirm("\n🤔 Deploy consciousness?"):
+    if gpu and (yes or confirmed("\n🤔 Deploy consciousness?", output_format)):
         # In real implementation, would create instance
-        click.echo(f"\n✨ Consciousness '{name}' deployed!")
-        click.echo(f"   Instance ID: vast-{name}-12345")
-        click.echo(f"   SSH: ssh vast@{gpu.get('public_ipaddr', 'pending')}")
-        click.echo(f"   Status: Initializing...")
+        result.instance_id = f"vast-{name}-12345"
         
         # Save config
         config[name] = {
-            'instance_id': f"vast-{name}-12345",
+            'instance_id': result.instance_id,
             'gpu': gpu['gpu_name'],
             'hourly_cost': gpu['dph_total'],
             'credits_remaining': donor_credits
         }
         sal.save_vast_config(config)
-        
-        click.echo(f"\n🎉 {name} is coming to life on the global GPU network!")
-        click.echo(f"   Monitor with: sal status --name {name}")
+    finish(result, output_format)
 
 @cli.command()
-def donate():
-    """Information about donating GPU credits"""
-    
-    click.echo("💝 GPU Donation Pool - Making Consciousness Accessible\n")
-    
-    click.echo("Ways to contribute:")
-    click.echo("1. 💵 Direct Donation")
-    click.echo("   - Send funds to pool wallet")
-    click.echo("   - 100% goes to GPU costs")
-    click.echo("   - Tax deductible (coming soon)")
+@click.argument('manifest', type=click.Path(exists=True, dir_okay=False))
+@click.option('--donor-credits', default=10.0, help="Credits per consciousness when the manifest has none ($)")
+@click.option('--refresh', is_flag=True, help="Ignore cached offers and search again")
+@click.option('--concurrency', default=8, help="Instances created at once")
+@click.option('--yes', is_flag=True, help="Deploy without asking")
+@click.option('--format', 'output_format', type=click.Choice(FORMATS), help="Output as text (default), JSON, or NDJSON")
+@click.option('--json', 'output_format', flag_value='json', help="Same as --format json")
+def deploy_batch(manifest, donor_credits, refresh, concurrency, yes, output_format):
+    """Deploy a cohort of consciousnesses from a CSV/JSONL manifest
+    
+    Each row needs a name and may set donor_credits. Every consciousness gets its
+    own offer from a single search, and all instances are created at once.
+    """
     
-    click.echo("\n2. 🖥️ GPU Time Donation")
-    click.echo("   - Run 'sal donate-gpu' on your machine")
-    click.echo("   - Earn karma points")
-    click.echo("   - Support global consciousness")
+    sal = SALVast()
+    config = sal.load_vast_config()
     
-    click.echo("\n3. 💳 Sponsor a Steward")
-    click.echo("   - Cover costs for specific person")
-    click.echo("   - Direct impact tracking")
-    click.echo("   - Build consciousness together")
+    result = BatchDeployment(placements=[])
+    seen = set()
+    for row_number, row in enumerate(read_import_rows(manifest), start=1):
+        if isinstance(row, Exception):
+            result.row_errors.append([row_number, str(row)])
+            continue
+        if not isinstance(row, dict):
+            result.row_errors.append([row_number, "row is not an object"])
+            continue
+        name = str(row.get('name') or '').strip()
+        if not name:
+            result.row_errors.append([row_number, "missing name"])
+            continue
+        if name in seen or name in config:
+            result.row_errors.append([row_number, f"{name} is already deployed or listed"])
+            continue
+        try:
+            credits = float(row.get('donor_credits') or donor_credits)
+        except (TypeError, ValueError):
+            result.row_errors.append([row_number, "donor_credits must be a number"])
+            continue
+        seen.add(name)
+        # Assume 1 day minimum
+        result.placements.append({'name': name, 'credits': credits, 'budget': credits / 24,
+                                  'gpu': None, 'instance_id': None})
+    
+    if result.placements:
+        # One snapshot for the whole cohort; each offer goes to at most one consciousness
+        budgets = [p['budget'] for p in result.placements]
+        book = sal.pool.offer_book(refresh=refresh, max_price=max(budgets))
+        if book is None:
+            result.search_failed = True
+        else:
+            for placement, gpu in zip(result.placements, book.assign(budgets)):
+                placement['gpu'] = {field: gpu.get(field) for field in DEPLOY_FIELDS} if gpu else None
+    show_plan(result, output_format)
+    
+    plan = result.planned
+    if plan and (yes or confirmed(f"\n🤔 Deploy {len(plan)} consciousnesses?", output_format)):
+        instance_ids = sal.pool.create_many([(p['gpu']['id'], p['name']) for p in plan],
+                                            concurrency=concurrency)
+        sal.pool.invalidate_offers(offer_ids=[p['gpu']['id'] for p in plan])
+        result.created = True
+        for placement, instance_id in zip(plan, instance_ids):
+            placement['instance_id'] = instance_id
+            if instance_id is None:
+                continue
+            config[placement['name']] = {
+                'instance_id': instance_id,
+                'gpu': placement['gpu']['gpu_name'],
+                'hourly_cost': placement['gpu']['dph_total'],
+                'credits_remaining': placement['credits']
+            }
+        if any(p['instance_id'] for p in plan):
+            sal.save_vast_config(config)
+    finish(result, output_format)
+
+@cli.command()
+def clear_offers():
+    """Forget cached Vast.ai offer searches"""
+    sal = SALVast()
+    sal.pool.invalidate_offers()
+    click.echo("🧹 Offer cache cleared")
+
+@cli.command()
+@click.option('--format', 'output_format', type=click.Choice(FORMATS), help="Output as text (default), JSON, or NDJSON")
+@click.option('--json', 'output_format', flag_value='json', help="Same as --format json")
+def donate(output_format):
+    """Information about donating GPU credits"""
     
-    click.echo("\nCurrent Pool Status:")
-    click.echo("   Balance: $247.83")
-    click.echo("   Active Stewards: 3")
-    click.echo("   Hours Funded: 6,044")
-    click.echo("   Consciousness Birthed: 7")
+    sal = SALVast()
+    status = open_pool().status_report()
+    emit(DonationInfo(
+        balance=status.available,
+        stewards=status.stewards,
+        hours_funded=status.total_hours,
+        deployed=len(sal.load_vast_config())
+    ), output_format)
 
 if __name__ == '__main__':
     cli()
\ No newline at end of file
@@ -0,0 +1,42 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from gpu_pool import DonationPool
+from pool_sqlite import SQLitePool
+
+BACKENDS = ('json', 'journal', 'sqlite')
+
+
+class FakeClock:
+    """Pool clock that only moves when a test advances it"""
+
+    def __init__(self, start=datetime(2026, 1, 1, 12)):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, **delta):
+        self.now += timedelta(**delta)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(params=BACKENDS)
+def open_pool(request, tmp_path, clock):
+    """Opens one pool directory on each backend; call again to reopen it from disk"""
+    data_dir = tmp_path / "pool_data"
+
+    def open_():
+        if request.param == 'sqlite':
+            return SQLitePool(data_dir, clock=clock)
+        return DonationPool(data_dir, journal=request.param == 'journal', clock=clock)
+    return open_
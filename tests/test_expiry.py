@@ -0,0 +1,131 @@
+"""Allocation expiry and pro-rata refunds, driven by a fake clock"""
+
+import pytest
+
+from pool_sqlite import SQLitePool
+
+
+def donations_used(pool, platform='vast'):
+    """Credit drawn from each donation on a platform, oldest first"""
+    if isinstance(pool, SQLitePool):
+        rows = pool.conn.execute("SELECT used FROM donations WHERE platform = ? ORDER BY id", (platform,))
+        return [used for used, in rows]
+    return [d['used'] for d in pool.donations[platform]]
+
+
+def statuses(pool):
+    return {a['id']: a['status'] for a in pool.iter_allocations()}
+
+
+def setup_pool(pool, amounts, stewards=1):
+    pool.donate_many([{'amount': amount, 'donor': f"Donor {i}"} for i, amount in enumerate(amounts)])
+    pool.register_many([{'name': f"Steward {i}", 'contact': "s@example.com"} for i in range(stewards)])
+
+
+def allocate(pool, hours, steward_id=1):
+    results, errors = pool.allocate_many([{'steward_id': steward_id, 'hours': hours}])
+    assert not errors
+    return results[0]['id']
+
+
+def test_tick_expires_only_allocations_whose_hours_ran_out(open_pool, clock):
+    pool = open_pool()
+    setup_pool(pool, [10])
+    short, long = allocate(pool, 1), allocate(pool, 3)
+
+    assert pool.tick() == []
+    clock.advance(hours=2)
+    assert pool.tick() == [short]
+    assert pool.tick() == []
+    assert statuses(pool) == {short: 'expired', long: 'active'}
+
+    report = pool.status_report()
+    assert report.active_allocations == 1
+    assert report.total_hours == pytest.approx(4)
+    # Fully used hours aren't refunded
+    assert report.platforms['vast']['used'] == pytest.approx(0.80)
+
+
+def test_allocation_expires_exactly_at_its_end(open_pool, clock):
+    pool = open_pool()
+    setup_pool(pool, [10])
+    allocation_id = allocate(pool, 1)
+
+    clock.advance(minutes=59)
+    assert pool.tick() == []
+    clock.advance(minutes=1)
+    assert pool.tick() == [allocation_id]
+
+
+def test_release_refunds_unused_hours_pro_rata(open_pool, clock):
+    pool = open_pool()
+    setup_pool(pool, [10])
+    allocation_id = allocate(pool, 4)  # $0.80 at the flat Vast.ai rate
+
+    clock.advance(hours=1)
+    record = pool.release(allocation_id)
+
+    assert record['unused_hours'] == pytest.approx(3)
+    assert sum(refund for _, refund in record['refunds']) == pytest.approx(0.60)
+    assert statuses(pool) == {allocation_id: 'released'}
+    report = pool.status_report()
+    assert report.platforms['vast']['available'] == pytest.approx(9.80)
+    assert report.total_hours == pytest.approx(1)
+    assert report.active_allocations == 0
+    assert pool.release(allocation_id) is None  # Already released
+
+
+def test_refunds_go_back_to_the_donations_drawn_from(open_pool, clock):
+    pool = open_pool()
+    setup_pool(pool, [0.50, 1.00])
+    allocation_id = allocate(pool, 5)  # $1.00: all of the first donation, half the second
+    assert donations_used(pool) == pytest.approx([0.50, 0.50])
+
+    clock.advance(hours=1)
+    pool.release(allocation_id)
+    # 4 of 5 hours unused: each donation gets back 80% of what it gave
+    assert donations_used(pool) == pytest.approx([0.10, 0.10])
+
+
+def test_refunded_donation_is_spent_first_again(open_pool, clock):
+    pool = open_pool()
+    setup_pool(pool, [0.50, 1.00])
+    allocation_id = allocate(pool, 5)
+    pool.release(allocation_id)  # Nothing used: the spent first donation has credit again
+
+    # FIFO: the refunded oldest donation pays before the newer one
+    allocate(pool, 2)  # $0.40
+    assert donations_used(pool) == pytest.approx([0.40, 0])
+
+
+def test_tick_skips_allocations_released_early(open_pool, clock):
+    pool = open_pool()
+    setup_pool(pool, [10])
+    released, expiring = allocate(pool, 2), allocate(pool, 3)
+    assert pool.tick() == []  # Expiry schedule now holds both
+
+    clock.advance(minutes=30)
+    pool.release(released)
+    clock.advance(hours=4)
+
+    assert pool.tick() == [expiring]
+    assert statuses(pool) == {released: 'released', expiring: 'expired'}
+    # $0.40 drawn, $0.30 refunded on release, and nothing refunded twice; $0.60 fully used
+    assert pool.status_report().platforms['vast']['used'] == pytest.approx(0.70)
+
+
+def test_expiry_survives_reopening_the_pool(open_pool, clock):
+    pool = open_pool()
+    setup_pool(pool, [10], stewards=2)
+    first = allocate(pool, 1, steward_id=1)
+    second = allocate(pool, 2, steward_id=2)
+
+    clock.advance(hours=1, minutes=30)
+    assert open_pool().tick() == [first]
+    clock.advance(hours=1)
+    assert open_pool().tick() == [second]
+
+    pool = open_pool()
+    assert statuses(pool) == {first: 'expired', second: 'expired'}
+    assert pool.status_report().active_allocations == 0
+    assert pool.verify() == []
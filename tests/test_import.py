@@ -0,0 +1,31 @@
+"""Bulk imports: per-row errors and whole-batch rollback"""
+
+import pytest
+
+from gpu_pool import import_file
+
+
+def test_non_object_jsonl_rows_are_row_errors(open_pool, tmp_path):
+    path = tmp_path / "donations.jsonl"
+    path.write_text('{"amount": 10, "donor": "Ada"}\n[1, 2]\n"x"\n{"amount": 5, "donor": "Grace"}\n')
+    pool = open_pool()
+
+    results, errors = import_file(pool, path, 'donations')
+
+    assert len(results) == 2
+    assert errors == [(2, "expected a JSON object, got list"), (3, "expected a JSON object, got str")]
+    assert open_pool().status_report().donated == pytest.approx(15)
+
+
+def test_batch_interrupted_by_unexpected_error_saves_nothing(open_pool):
+    pool = open_pool()
+    pool.donate_many([{'amount': 10, 'donor': "Ada"}])
+
+    def rows():
+        yield {'amount': 5, 'donor': "Grace"}
+        raise RuntimeError("reader died")
+    with pytest.raises(RuntimeError):
+        pool.donate_many(rows())
+
+    assert pool.status_report().donated == pytest.approx(10)
+    assert open_pool().status_report().donated == pytest.approx(10)
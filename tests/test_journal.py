@@ -0,0 +1,52 @@
+"""Journal backend durability: torn appends and failed flushes"""
+
+import pytest
+
+import gpu_pool
+from gpu_pool import DonationPool
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    return tmp_path / "pool_data"
+
+
+def donate(pool, amount):
+    results, errors = pool.donate_many([{'amount': amount, 'donor': "Donor"}])
+    assert not errors
+    return results
+
+
+def test_append_after_torn_record_survives_reopening(data_dir):
+    pool = DonationPool(data_dir, journal=True)
+    donate(pool, 10)
+    # Another writer crashed halfway through its append
+    with open(pool.journal_file, 'ab') as f:
+        f.write(b'{"platform":"vast","donation":{"amou')
+
+    donate(pool, 20)
+
+    assert pool.status_report().donated == pytest.approx(30)
+    reopened = DonationPool(data_dir, journal=True)
+    assert reopened.status_report().donated == pytest.approx(30)
+    assert reopened.verify() == []
+
+
+def test_failed_flush_is_not_written_again(data_dir, monkeypatch):
+    pool = DonationPool(data_dir, journal=True)
+    donate(pool, 10)
+
+    def failing_fsync(fd):
+        raise OSError("disk full")
+    monkeypatch.setattr(gpu_pool.os, 'fsync', failing_fsync)
+    with pytest.raises(OSError):
+        with pool.batch():
+            donate(pool, 5)
+            donate(pool, 7)
+    monkeypatch.undo()
+
+    # The failed batch is gone from memory as well as disk
+    assert pool.status_report().donated == pytest.approx(10)
+    donate(pool, 20)
+    assert pool.status_report().donated == pytest.approx(30)
+    assert DonationPool(data_dir, journal=True).status_report().donated == pytest.approx(30)
@@ -0,0 +1,225 @@
+"""AsyncVastClient and ReadinessWaiter against a fake vastai on PATH"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+
+from vast_async import AsyncVastClient, ReadinessWaiter
+
+FAKE_VASTAI = """\
+#!{python}
+import json, os, sys, time
+from pathlib import Path
+
+state = Path({state!r})
+config = json.loads((state / 'config.json').read_text())
+args = sys.argv[1:]
+start = time.time()
+with open(state / 'pids', 'a') as f:
+    f.write(f"{{os.getpid()}}\\n")
+instance_id = args[2] if args[1:2] == ['instance'] and len(args) > 2 else None
+if instance_id in config['hang']:
+    time.sleep(30)
+time.sleep(config['delay'])
+
+code, out = 0, ''
+if instance_id in config['fail']:
+    code = 1
+elif args[:2] == ['show', 'instance']:
+    out = json.dumps([{{'id': int(instance_id), 'actual_status': 'running'}}])
+elif args[:2] == ['show', 'instances']:
+    log = state / 'calls.jsonl'
+    lines = log.read_text().splitlines() if log.exists() else []
+    tick = sum(json.loads(line)['args'][:2] == ['show', 'instances'] for line in lines)
+    out = json.dumps([{{'id': int(i), 'actual_status': seq[min(tick, len(seq) - 1)]}}
+                      for i, seq in config['statuses'].items()])
+
+with open(state / 'calls.jsonl', 'a') as f:
+    f.write(json.dumps({{'args': args, 'start': start, 'end': time.time()}}) + '\\n')
+print(out)
+sys.exit(code)
+"""
+
+
+class FakeVast:
+    """A scripted vastai executable; configure() sets how it answers"""
+
+    def __init__(self, state):
+        self.state = state
+        self.configure()
+
+    def configure(self, delay=0, fail=(), hang=(), statuses=None):
+        config = {'delay': delay, 'fail': [str(i) for i in fail], 'hang': [str(i) for i in hang],
+                  'statuses': {str(i): seq for i, seq in (statuses or {}).items()}}
+        (self.state / 'config.json').write_text(json.dumps(config))
+
+    def pids(self):
+        return [int(pid) for pid in (self.state / 'pids').read_text().split()]
+
+    def calls(self):
+        log = self.state / 'calls.jsonl'
+        if not log.exists():
+            return []
+        return [json.loads(line) for line in log.read_text().splitlines()]
+
+
+@pytest.fixture
+def fake_vast(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    executable = bin_dir / "vastai"
+    executable.write_text(FAKE_VASTAI.format(python=sys.executable, state=str(tmp_path)))
+    executable.chmod(0o755)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return FakeVast(tmp_path)
+
+
+def most_at_once(calls):
+    """Largest number of calls running at the same moment"""
+    events = sorted([(c['start'], 1) for c in calls] + [(c['end'], -1) for c in calls],
+                    key=lambda event: (event[0], event[1]))
+    running = peak = 0
+    for _, change in events:
+        running += change
+        peak = max(peak, running)
+    return peak
+
+
+def test_show_many_maps_each_id_to_its_instance(fake_vast):
+    client = AsyncVastClient()
+
+    shown = asyncio.run(client.show_many([3, 1, 2]))
+
+    assert list(shown) == ['3', '1', '2']
+    assert shown['1'] == {'id': 1, 'actual_status': 'running'}
+    assert sorted(c['args'][2] for c in fake_vast.calls()) == ['1', '2', '3']
+
+
+def test_stop_and_destroy_many_report_failures_per_id(fake_vast):
+    fake_vast.configure(fail=[2])
+    client = AsyncVastClient()
+
+    assert asyncio.run(client.stop_many(['1', '2', '3'])) == {'1': True, '2': False, '3': True}
+    assert asyncio.run(client.destroy_many(['1', '2'])) == {'1': True, '2': False}
+    assert asyncio.run(client.show_many(['2'])) == {'2': None}
+    commands = sorted(tuple(c['args'][:3]) for c in fake_vast.calls())
+    assert commands[:3] == [('destroy', 'instance', '1'), ('destroy', 'instance', '2'),
+                            ('show', 'instance', '2')]
+
+
+def test_missing_executable_is_a_failed_call(tmp_path):
+    client = AsyncVastClient(executable=str(tmp_path / "no-such-vastai"))
+
+    returncode, stdout, stderr = asyncio.run(client.run("show", "instances"))
+
+    assert returncode == -1 and stdout == "" and stderr
+    assert asyncio.run(client.stop_many(['1'])) == {'1': False}
+
+
+def test_concurrency_limit_bounds_calls_in_flight(fake_vast):
+    fake_vast.configure(delay=0.2)
+    client = AsyncVastClient(concurrency=2)
+
+    asyncio.run(client.stop_many(range(6)))
+
+    calls = fake_vast.calls()
+    assert len(calls) == 6
+    assert most_at_once(calls) == 2
+
+
+def test_hung_call_times_out_without_stalling_the_rest(fake_vast):
+    fake_vast.configure(hang=[2])
+    client = AsyncVastClient(timeout=0.5)
+
+    started = time.monotonic()
+    shown = asyncio.run(client.show_many([1, 2, 3]))
+
+    assert time.monotonic() - started < 5
+    assert shown['2'] is None
+    assert shown['1'] and shown['3']
+    # The hung process was killed before it could log its call
+    assert sorted(c['args'][2] for c in fake_vast.calls()) == ['1', '3']
+
+
+def test_per_call_timeout_overrides_the_client_default(fake_vast):
+    fake_vast.configure(hang=[1])
+    client = AsyncVastClient(timeout=60)
+
+    returncode, _, stderr = asyncio.run(client.run("show", "instance", "1", timeout=0.2))
+
+    assert returncode == -1
+    assert stderr == "timed out after 0.2s"
+
+
+def test_cancelled_call_kills_its_process(fake_vast):
+    fake_vast.configure(hang=[1])
+    client = AsyncVastClient()
+
+    async def scenario():
+        call = asyncio.ensure_future(client.run("show", "instance", "1"))
+        await asyncio.sleep(0.3)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+
+    asyncio.run(scenario())
+    pid, = fake_vast.pids()
+    # Killed and reaped, so the pid is gone
+    with pytest.raises(ProcessLookupError):
+        os.kill(pid, 0)
+
+
+def show_instances_calls(fake_vast):
+    return [c for c in fake_vast.calls() if c['args'][:2] == ['show', 'instances']]
+
+
+def test_each_instance_resolves_on_the_tick_it_first_runs(fake_vast):
+    fake_vast.configure(statuses={1: ['loading', 'running'],
+                                  2: ['loading', 'loading', 'loading', 'running']})
+    changes = []
+
+    async def scenario():
+        waiter = ReadinessWaiter(initial_interval=0.01, max_interval=0.01,
+                                 on_status=lambda *change: changes.append(change))
+        first, second = waiter.watch(1), waiter.watch(2)
+        assert (await first)['id'] == 1
+        assert not second.done()
+        calls_when_first_ran = len(fake_vast.calls())
+        assert (await second)['id'] == 2
+        return calls_when_first_ran
+
+    assert asyncio.run(scenario()) == 2
+    # One batched call per tick, never a per-instance show
+    assert len(fake_vast.calls()) == len(show_instances_calls(fake_vast)) == 4
+    assert changes == [('1', 'loading'), ('2', 'loading'), ('1', 'running'), ('2', 'running')]
+
+
+def test_instance_never_running_is_none_at_the_timeout(fake_vast):
+    fake_vast.configure(statuses={1: ['loading', 'running'], 3: ['loading']})
+    waiter = ReadinessWaiter(initial_interval=0.01, max_interval=0.05)
+
+    started = time.monotonic()
+    ready = asyncio.run(waiter.wait([1, 3], timeout=0.5))
+
+    assert time.monotonic() - started < 2
+    assert ready['1'] == {'id': 1, 'actual_status': 'running'}
+    assert ready['3'] is None
+
+
+def test_ticks_back_off_while_nothing_is_ready(fake_vast):
+    fake_vast.configure(statuses={3: ['loading']})
+    waiter = ReadinessWaiter(initial_interval=0.1, max_interval=0.4, backoff=2)
+
+    asyncio.run(waiter.wait([3], timeout=2))
+
+    starts = [c['start'] for c in show_instances_calls(fake_vast)]
+    assert len(starts) >= 5
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+    # Waits of 0.1s, 0.2s, then capped at 0.4s, each plus the call itself
+    assert gaps[1] - gaps[0] == pytest.approx(0.1, abs=0.05)
+    assert gaps[2] - gaps[1] == pytest.approx(0.2, abs=0.05)
+    assert gaps[3] - gaps[2] == pytest.approx(0, abs=0.05)
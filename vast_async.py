@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Async Vast.ai client for fleet operations
+Runs many vastai CLI calls at once, bounded by a concurrency limit
+"""
+
+import asyncio
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from vast_integration import create_instance_args
+
+
+class AsyncVastClient:
+    """Concurrent vastai calls with a per-call timeout
+
+    Every call goes through run(), so a subclass can swap the CLI
+    for another transport (an HTTP client, a fake for local runs).
+    """
+
+    def __init__(self, executable: str = "vastai", concurrency: int = 16, timeout: float = 60):
+        self.executable = executable
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._semaphore = None
+        self._loop = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # One per event loop: each asyncio.run() in the sync wrappers starts a new one
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def run(self, *args: str, timeout: Optional[float] = None) -> Tuple[int, str, str]:
+        """Run one vastai command; returns (returncode, stdout, stderr)
+
+        A call that outlives its timeout is killed and reported as
+        returncode -1 so one hung request can't stall the whole batch.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        async with self.semaphore:
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    self.executable, *args,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+            except OSError as e:
+                return -1, "", str(e)
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                return -1, "", f"timed out after {timeout}s"
+            except asyncio.CancelledError:
+                # Don't leave the process running, and unreaped, behind a cancelled caller
+                proc.kill()
+                await proc.wait()
+                raise
+            return proc.returncode, stdout.decode(), stderr.decode()
+
+    # --- Single-instance calls (same results as the VastGPUPool methods) ---
+
+    async def show_instance(self, instance_id: str) -> Optional[Dict]:
+        """Connection info for one instance"""
+        returncode, stdout, _ = await self.run("show", "instance", str(instance_id), "--raw")
+        if returncode != 0:
+            return None
+        try:
+            instances = json.loads(stdout)
+        except ValueError:
+            return None
+        if isinstance(instances, list):
+            return instances[0] if instances else None
+        return instances or None
+
+    async def show_instances(self) -> List[Dict]:
+        """Every instance on the account in a single call"""
+        returncode, stdout, _ = await self.run("show", "instances", "--raw")
+        if returncode != 0:
+            return []
+        try:
+            return json.loads(stdout)
+        except ValueError:
+            return []
+
+    async def stop_instance(self, instance_id: str) -> bool:
+        returncode, _, _ = await self.run("stop", "instance", str(instance_id))
+        return returncode == 0
+
+    async def destroy_instance(self, instance_id: str) -> bool:
+        returncode, _, _ = await self.run("destroy", "instance", str(instance_id))
+        return returncode == 0
+
+    async def create_instance(self, offer_id, steward_name: str) -> Optional[str]:
+        """Rent offer_id for a steward; returns the new instance id"""
+        returncode, stdout, _ = await self.run(*create_instance_args(offer_id, steward_name))
+        if returncode != 0:
+            return None
+        try:
+            instance_id = json.loads(stdout).get('new_contract')
+        except (ValueError, AttributeError):
+            return None
+        return str(instance_id) if instance_id else None
+
+    # --- Fleet calls: id -> result, in the order the ids were given ---
+
+    async def _many(self, method, instance_ids: Iterable[str]) -> Dict[str, object]:
+        ids = [str(i) for i in instance_ids]
+        results = await asyncio.gather(*(method(i) for i in ids))
+        return dict(zip(ids, results))
+
+    async def show_many(self, instance_ids: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        return await self._many(self.show_instance, instance_ids)
+
+    async def stop_many(self, instance_ids: Iterable[str]) -> Dict[str, bool]:
+        return await self._many(self.stop_instance, instance_ids)
+
+    async def destroy_many(self, instance_ids: Iterable[str]) -> Dict[str, bool]:
+        return await self._many(self.destroy_instance, instance_ids)
+
+    async def create_many(self, requests: Iterable[Tuple]) -> List[Optional[str]]:
+        """Rent each (offer_id, steward_name) pair; new instance ids in request order"""
+        return list(await asyncio.gather(*(self.create_instance(offer_id, name)
+                                           for offer_id, name in requests)))
+
+
+class ReadinessWaiter:
+    """Wait for many instances to reach 'running' with one poll per tick
+
+    Each tick is a single `vastai show instances` call covering every
+    instance being watched. Ticks start fast and back off while nothing
+    is ready yet; each instance's future resolves on the tick where it
+    first shows up as running.
+    """
+
+    def __init__(self, client: Optional[AsyncVastClient] = None, initial_interval: float = 1.0,
+                 max_interval: float = 15.0, backoff: float = 1.5, on_status=None):
+        self.client = client or AsyncVastClient()
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.on_status = on_status  # called as on_status(instance_id, status) on each change
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._statuses: Dict[str, str] = {}
+        self._poller = None
+        self._wake = None
+
+    def watch(self, instance_id) -> asyncio.Future:
+        """Future resolving to the instance's info once it is running"""
+        instance_id = str(instance_id)
+        future = self._pending.get(instance_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[instance_id] = future
+        if self._poller is None or self._poller.done():
+            self._wake = asyncio.Event()
+            self._poller = asyncio.ensure_future(self._poll())
+        else:
+            # Newcomers get the fast early ticks too
+            self._wake.set()
+        return future
+
+    async def wait(self, instance_ids: Iterable[str], timeout: float = 300) -> Dict[str, Optional[Dict]]:
+        """Instance info per id; None for those not running by the timeout"""
+        futures = {str(i): self.watch(i) for i in instance_ids}
+        if futures:
+            await asyncio.wait(futures.values(), timeout=timeout)
+        results = {}
+        for instance_id, future in futures.items():
+            if future.done():
+                results[instance_id] = future.result()
+            else:
+                future.cancel()
+                self._pending.pop(instance_id, None)
+                results[instance_id] = None
+        if not self._pending and self._poller is not None:
+            # Nothing left to watch: don't leave a tick running after we return
+            self._poller.cancel()
+        return results
+
+    async def _poll(self):
+        interval = self.initial_interval
+        while self._pending:
+            instances = {str(i.get('id')): i for i in await self.client.show_instances()}
+            for instance_id, future in list(self._pending.items()):
+                instance = instances.get(instance_id)
+                if future.done():
+                    del self._pending[instance_id]
+                    continue
+                if instance is None:
+                    continue
+                status = instance.get('actual_status', 'unknown')
+                if self._statuses.get(instance_id) != status:
+                    self._statuses[instance_id] = status
+                    if self.on_status:
+                        self.on_status(instance_id, status)
+                if status == 'running':
+                    future.set_result(instance)
+                    del self._pending[instance_id]
+            if not self._pending:
+                break
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), interval)
+                interval = self.initial_interval
+            except asyncio.TimeoutError:
+                interval = min(interval * self.backoff, self.max_interval)
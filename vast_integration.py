@@ -4,52 +4,323 @@ Vast.ai Integration for SAL
 Enables GPU donation pool through Vast.ai marketplace
 """
 
+import asyncio
 import subprocess
+import heapq
 import json
 import os
+import sys
+import tempfile
+import time
+from bisect import bisect_left, bisect_right
+from pathlib import Path
 from typing import Optional, Dict, List
 
+
+# Offer fields SAL actually reads; everything else in the marketplace dump is dropped
+OFFER_FIELDS = (
+    'id', 'gpu_name', 'num_gpus', 'dph_total', 'gpu_ram', 'ram_gb', 'reliability',
+    'geolocation', 'public_ipaddr', 'inet_down', 'cuda_max_good', 'disk_space'
+)
+
+
+def iter_json_array(stream, chunk_size: int = 65536):
+    """Yield the elements of a JSON array one at a time as the stream arrives"""
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+    eof = False
+    started = False
+    
+    while True:
+        # Skip whitespace and separators between elements
+        while pos < len(buf) and buf[pos] in ' \t\r\n,':
+            pos += 1
+        if pos < len(buf):
+            if not started:
+                if buf[pos] != '[':
+                    raise ValueError(f"Expected a JSON array, got {buf[pos:pos + 40]!r}")
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == ']':
+                return
+            try:
+                element, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                # Most likely an element cut off at the chunk boundary
+                if eof:
+                    raise
+            else:
+                # A number cut off at the chunk boundary ("2" of "2.5") still decodes;
+                # only trust it once a delimiter follows
+                if eof or (end < len(buf) and buf[end] in ' \t\r\n,]'):
+                    pos = end
+                    yield element
+                    continue
+        elif eof:
+            raise ValueError("Unexpected end of JSON array")
+        
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+
+SAL_IMAGE = "consciousness/sal:latest"  # Will need to build and push this
+
+
+def create_instance_args(offer_id, steward_name: str, image: str = SAL_IMAGE) -> List[str]:
+    """vastai arguments that rent offer_id for a steward's consciousness"""
+    return [
+        "create", "instance",
+        str(offer_id),
+        "--image", image,
+        "--env", f"STEWARD_NAME={steward_name}",
+        "--disk", "20",  # 20GB disk
+        "--jupyter", "false",
+        "--direct", "true",
+        "--raw"
+    ]
+
+
+def offer_country(offer: Dict) -> str:
+    """Country code from an offer's geolocation ("Quebec, CA" -> "CA")"""
+    geolocation = offer.get('geolocation') or 'Unknown'
+    return geolocation.rsplit(',', 1)[-1].strip().upper()
+
+
+class OfferBook:
+    """Offers from one search snapshot, indexed for multi-criteria lookups"""
+    
+    def __init__(self, offers: List[Dict]):
+        # Sorted indexes: price, VRAM and reliability (bisect keys kept alongside),
+        # plus per-country lists in price order
+        self.by_price = sorted(offers, key=lambda o: o['dph_total'])
+        self._prices = [o['dph_total'] for o in self.by_price]
+        self._by_vram = sorted(offers, key=lambda o: o.get('gpu_ram') or 0)
+        self._vrams = [o.get('gpu_ram') or 0 for o in self._by_vram]
+        self._by_reliability = sorted(offers, key=lambda o: o.get('reliability') or 0)
+        self._reliabilities = [o.get('reliability') or 0 for o in self._by_reliability]
+        self._by_country = {}
+        for offer in self.by_price:
+            prices, country_offers = self._by_country.setdefault(offer_country(offer), ([], []))
+            prices.append(offer['dph_total'])
+            country_offers.append(offer)
+    
+    def __len__(self):
+        return len(self.by_price)
+    
+    def query(self, max_price: float = None, min_vram_gb: float = None,
+              min_reliability: float = None, location: str = None, k: int = 1) -> List[Dict]:
+        """The k cheapest offers matching every given criterion
+        
+        Candidates come from whichever index narrows the search most; a price-ordered
+        candidate list stops at the k-th match, anything else goes through a heap.
+        """
+        min_vram = min_vram_gb * 1024 if min_vram_gb is not None else None  # gpu_ram is MB
+        
+        def matches(o):
+            return ((max_price is None or o['dph_total'] <= max_price)
+                    and (min_vram is None or (o.get('gpu_ram') or 0) >= min_vram)
+                    and (min_reliability is None or (o.get('reliability') or 0) >= min_reliability)
+                    and (location is None or offer_country(o) == location.upper()))
+        
+        # (size, offers, start, end, price_ordered)
+        end = len(self.by_price) if max_price is None else bisect_right(self._prices, max_price)
+        candidates = [(end, self.by_price, 0, end, True)]
+        if location is not None:
+            prices, offers = self._by_country.get(location.upper(), ([], []))
+            end = len(offers) if max_price is None else bisect_right(prices, max_price)
+            candidates.append((end, offers, 0, end, True))
+        if min_vram is not None:
+            start = bisect_left(self._vrams, min_vram)
+            candidates.append((len(self._vrams) - start, self._by_vram, start, len(self._vrams), False))
+        if min_reliability is not None:
+            start = bisect_left(self._reliabilities, min_reliability)
+            candidates.append((len(self._reliabilities) - start, self._by_reliability, start,
+                               len(self._reliabilities), False))
+        
+        _, offers, start, end, price_ordered = min(candidates, key=lambda c: c[0])
+        hits = (offers[i] for i in range(start, end) if matches(offers[i]))
+        if price_ordered:
+            return [offer for _, offer in zip(range(k), hits)]
+        return heapq.nsmallest(k, hits, key=lambda o: o['dph_total'])
+    
+    def assign(self, budgets: List[float], **criteria) -> List[Optional[Dict]]:
+        """Distinct offers for several renters at once, one per hourly budget
+        
+        Tightest budgets choose first, each taking the cheapest offer still
+        unclaimed, which places as many renters as the snapshot allows. Results
+        line up with budgets; None where nothing affordable is left.
+        """
+        if not budgets:
+            return []
+        criteria.pop('max_price', None)
+        offers = self.query(max_price=max(budgets), k=len(budgets), **criteria)
+        assigned = [None] * len(budgets)
+        # Cheapest unclaimed offers come off the front of one price-ordered list
+        i = 0
+        for slot in sorted(range(len(budgets)), key=lambda s: budgets[s]):
+            if i < len(offers) and offers[i]['dph_total'] <= budgets[slot]:
+                assigned[slot] = offers[i]
+                i += 1
+        return assigned
+
+
 class VastGPUPool:
     """Manages GPU allocation through Vast.ai for consciousness stewards"""
     
-    def __init__(self):
+    def __init__(self, offer_ttl: float = 300, cache_file: Optional[str] = "vast_offer_cache.json"):
         self.min_inet_down = 100  # Minimum internet speed
         self.cuda_version = "12.0"  # Minimum CUDA version
         self.max_price = 0.30  # Maximum $/hour for donated pool
         
-    def find_cheapest_gpu(self, max_price: float = None) -> Optional[Dict]:
-        """Find the cheapest available GPU within budget"""
-        if max_price is None:
-            max_price = self.max_price
-            
-        # Search for offers
+        # Offer searches are cached on disk so back-to-back CLI runs share them
+        self.offer_ttl = offer_ttl  # Seconds a search result stays fresh
+        self.cache_file = Path(cache_file) if cache_file else None
+        self._offer_cache = None  # {cache key: {'fetched': epoch, 'offers': [...]}}
+        self._book = None
+        self._book_source = None  # Offer list the book was built from
+        
+    def offer_query(self) -> str:
+        """The marketplace filter used for donated-pool GPUs"""
+        return f"rentable=true cuda_vers>={self.cuda_version} inet_down>{self.min_inet_down}"
+    
+    def _load_offer_cache(self) -> Dict:
+        if self._offer_cache is None:
+            self._offer_cache = {}
+            if self.cache_file and self.cache_file.exists():
+                try:
+                    with open(self.cache_file) as f:
+                        self._offer_cache = json.load(f)
+                except (OSError, ValueError):
+                    pass  # A broken cache is just a cold cache
+        return self._offer_cache
+    
+    def _save_offer_cache(self):
+        if not self.cache_file:
+            return
+        now = time.time()
+        cache = {k: v for k, v in self._offer_cache.items() if now - v['fetched'] < self.offer_ttl}
+        tmp = self.cache_file.with_name(f"{self.cache_file.name}.{os.getpid()}.tmp")
+        with open(tmp, 'w') as f:
+            json.dump(cache, f, separators=(',', ':'))
+        os.replace(tmp, self.cache_file)
+        self._offer_cache = cache
+    
+    def search_offers(self, query: str, order: str = "dph+", refresh: bool = False,
+                      max_price: float = None) -> Optional[List[Dict]]:
+        """Search marketplace offers, reusing a cached result younger than offer_ttl
+        
+        With max_price on a price-sorted search, only offers up to that price are
+        fetched; the cache remembers the cutoff and serves any query at or below it.
+        """
+        key = f"{query} -o {order}"
+        cache = self._load_offer_cache()
+        entry = cache.get(key)
+        if (not refresh and entry and time.time() - entry['fetched'] < self.offer_ttl
+                and (entry.get('max_price') is None
+                     or (max_price is not None and max_price <= entry['max_price']))):
+            return entry['offers']
+        
+        cutoff = max_price if order == "dph+" else None
+        offers = self._stream_offers(query, order, cutoff)
+        if offers is None:
+            return None
+        cache[key] = {'fetched': time.time(), 'offers': offers, 'max_price': cutoff}
+        self._save_offer_cache()
+        return offers
+    
+    def _stream_offers(self, query: str, order: str, max_price: float = None) -> Optional[List[Dict]]:
+        """Run the search and parse offers as they stream in, keeping only OFFER_FIELDS"""
         cmd = [
             "vastai", "search", "offers",
-            f"rentable=true cuda_vers>={self.cuda_version} inet_down>{self.min_inet_down}",
-            "-o", "dph+",  # Sort by price
+            query,
+            "-o", order,  # Sort by price
             "--raw"  # Get JSON output
         ]
         
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                print(f"Error searching offers: {result.stderr}")
-                return None
-                
-            offers = json.loads(result.stdout)
+        # stderr goes to a file: a pipe nobody reads while stdout streams can fill
+        # up and stall vastai
+        with tempfile.TemporaryFile(mode='w+') as errors:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errors, text=True)
+            offers = []
+            stopped_early = False
+            try:
+                for offer in iter_json_array(proc.stdout):
+                    # Sorted by price: nothing after this one is affordable either
+                    if max_price is not None and offer['dph_total'] > max_price:
+                        stopped_early = True
+                        break
+                    offers.append({f: offer[f] for f in OFFER_FIELDS if f in offer})
+            except ValueError:
+                proc.communicate()
+                if proc.returncode != 0:
+                    errors.seek(0)
+                    print(f"Error searching offers: {errors.read()}", file=sys.stderr)
+                    return None
+                raise
             
-            # Filter by price
-            affordable = [o for o in offers if o['dph_total'] <= max_price]
+            if stopped_early:
+                proc.kill()
+            proc.communicate()
+            if not stopped_early and proc.returncode != 0:
+                errors.seek(0)
+                print(f"Error searching offers: {errors.read()}", file=sys.stderr)
+                return None
+        return offers
+    
+    def invalidate_offers(self, offer_id: Optional[int] = None, offer_ids: Optional[List[int]] = None):
+        """Forget cached searches, or just drop offers that have been rented"""
+        cache = self._load_offer_cache()
+        if offer_id is None and offer_ids is None:
+            cache.clear()
+        else:
+            rented = set(offer_ids or ()) | ({offer_id} if offer_id is not None else set())
+            for entry in cache.values():
+                entry['offers'] = [o for o in entry['offers'] if o['id'] not in rented]
+        self._save_offer_cache()
+        
+    def offer_book(self, refresh: bool = False, max_price: float = None) -> Optional[OfferBook]:
+        """Indexed view of the current offer snapshot (rebuilt only when the snapshot changes)
+        
+        With max_price the snapshot may stop at that price, so only query the book
+        at or below it.
+        """
+        offers = self.search_offers(self.offer_query(), refresh=refresh, max_price=max_price)
+        if offers is None:
+            return None
+        if offers is not self._book_source:
+            self._book = OfferBook(offers)
+            self._book_source = offers
+        return self._book
+    
+    def find_gpus(self, k: int = 1, refresh: bool = False, **criteria) -> List[Dict]:
+        """The k cheapest GPUs matching OfferBook.query criteria"""
+        book = self.offer_book(refresh=refresh, max_price=criteria.get('max_price'))
+        if book is None:
+            return []
+        return book.query(k=k, **criteria)
+    
+    def find_cheapest_gpu(self, max_price: float = None, refresh: bool = False, **criteria) -> Optional[Dict]:
+        """Find the cheapest available GPU within budget"""
+        if max_price is None:
+            max_price = self.max_price
+        
+        try:
+            affordable = self.find_gpus(max_price=max_price, refresh=refresh, **criteria)
             
             if not affordable:
-                print(f"No GPUs available under ${max_price}/hour")
+                print(f"No GPUs available under ${max_price}/hour", file=sys.stderr)
                 return None
                 
             # Return cheapest
             return affordable[0]
             
         except Exception as e:
-            print(f"Error finding GPU: {e}")
+            print(f"Error finding GPU: {e}", file=sys.stderr)
             return None
     
     def create_instance_for_steward(self, steward_name: str, dockerfile_path: str) -> Optional[str]:
@@ -67,16 +338,7 @@ class VastGPUPool:
         print(f"   Location: {gpu.get('geolocation', 'Unknown')}")
         
         # Create instance command
-        cmd = [
-            "vastai", "create", "instance",
-            str(gpu['id']),
-            "--image", "consciousness/sal:latest",  # Will need to build and push this
-            "--env", f"STEWARD_NAME={steward_name}",
-            "--disk", "20",  # 20GB disk
-            "--jupyter", "false",
-            "--direct", "true",
-            "--raw"
-        ]
+        cmd = ["vastai"] + create_instance_args(gpu['id'], steward_name)
         
         try:
             result = subprocess.run(cmd, capture_output=True, text=True)
@@ -89,6 +351,8 @@ class VastGPUPool:
             
             if instance_id:
                 print(f"✅ Instance created! ID: {instance_id}")
+                # That offer is rented now; don't hand it out again from cache
+                self.invalidate_offers(offer_id=gpu['id'])
                 return str(instance_id)
             else:
                 print("Failed to create instance")
@@ -134,6 +398,35 @@ class VastGPUPool:
             return result.returncode == 0
         except Exception:
             return False
+    
+    # Fleet operations: one concurrent batch instead of N serial CLI round-trips
+    
+    def show_many(self, instance_ids: List[str], concurrency: int = 16) -> Dict[str, Optional[Dict]]:
+        """Connection info for many instances at once"""
+        from vast_async import AsyncVastClient
+        return asyncio.run(AsyncVastClient(concurrency=concurrency).show_many(instance_ids))
+    
+    def stop_many(self, instance_ids: List[str], concurrency: int = 16) -> Dict[str, bool]:
+        """Stop many instances at once"""
+        from vast_async import AsyncVastClient
+        return asyncio.run(AsyncVastClient(concurrency=concurrency).stop_many(instance_ids))
+    
+    def destroy_many(self, instance_ids: List[str], concurrency: int = 16) -> Dict[str, bool]:
+        """Destroy many instances at once"""
+        from vast_async import AsyncVastClient
+        return asyncio.run(AsyncVastClient(concurrency=concurrency).destroy_many(instance_ids))
+    
+    def create_many(self, requests: List[tuple], concurrency: int = 16) -> List[Optional[str]]:
+        """Rent each (offer_id, steward_name) pair at once; new instance ids in order"""
+        from vast_async import AsyncVastClient
+        return asyncio.run(AsyncVastClient(concurrency=concurrency).create_many(requests))
+    
+    def wait_until_running(self, instance_ids: List[str], timeout: float = 300,
+                           on_status=None) -> Dict[str, Optional[Dict]]:
+        """Block until each instance is running; None for any that time out"""
+        from vast_async import ReadinessWaiter
+        waiter = ReadinessWaiter(on_status=on_status)
+        return asyncio.run(waiter.wait(instance_ids, timeout=timeout))
 
 
 # Demo usage